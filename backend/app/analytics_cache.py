@@ -0,0 +1,109 @@
+"""
+NYOS Analytics Cache
+
+Per-process cache for small values most analytics endpoints start from
+(e.g. the latest manufacturing date) and for whole serialized analytics
+responses. Entries are stamped with the import version and dropped by
+bump() whenever imported data is committed.
+"""
+
+import functools
+import threading
+from typing import Any, Dict, Tuple
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+
+_import_version = 0
+_kpi_cache: Dict[str, Tuple[Any, int]] = {}
+
+# Serialized JSON bodies keyed by (route, params, import version); the TTL
+# bounds staleness for data written by other workers
+_response_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+_response_lock = threading.Lock()
+
+_MISS = object()
+
+
+def import_version() -> int:
+    return _import_version
+
+
+def bump():
+    """Invalidate every cached value (call after committing imported data)"""
+    global _import_version
+    with _response_lock:
+        _import_version += 1
+        _kpi_cache.clear()
+        _response_cache.clear()
+
+
+def _get(key: str):
+    entry = _kpi_cache.get(key)
+    if entry is not None and entry[1] == _import_version:
+        return entry[0]
+    return _MISS
+
+
+def _set(key: str, value: Any, version: int):
+    # Skip the store if an import landed while the value was being loaded
+    if version == _import_version:
+        _kpi_cache[key] = (value, version)
+
+
+_max_date_query = select(func.max(models.Batch.manufacturing_date))
+
+
+async def get_max_date(db: AsyncSession):
+    """Latest batch manufacturing date (None when there are no batches)"""
+    value = _get("max_date")
+    if value is _MISS:
+        version = _import_version
+        value = (await db.execute(_max_date_query)).scalar()
+        _set("max_date", value, version)
+    return value
+
+
+def get_max_date_sync(db: Session):
+    """get_max_date for sync Session routes"""
+    value = _get("max_date")
+    if value is _MISS:
+        version = _import_version
+        value = db.execute(_max_date_query).scalar()
+        _set("max_date", value, version)
+    return value
+
+
+def cached_response(route):
+    """Serve an analytics route from the response cache between imports
+
+    The wrapped route's result is serialized once per import version; hits
+    return the stored bytes without running any query. The ``db`` dependency
+    is not part of the key.
+    """
+
+    @functools.wraps(route)
+    async def wrapper(**kwargs):
+        version = _import_version
+        params = tuple(sorted((k, v) for k, v in kwargs.items() if k != "db"))
+        key = (route.__name__, params, version)
+
+        with _response_lock:
+            body = _response_cache.get(key)
+        if body is not None:
+            return Response(
+                content=body, media_type="application/json", headers={"X-Cache": "HIT"}
+            )
+
+        response = ORJSONResponse(jsonable_encoder(await route(**kwargs)))
+        with _response_lock:
+            if version == _import_version:
+                _response_cache[key] = response.body
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
@@ -5,3 +5,15 @@ load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./nyos.db")
+
+# Raise on lazy relationship loads (development aid for spotting N+1 queries)
+STRICT_LOADING = os.getenv("STRICT_LOADING", "").lower() in ("1", "true", "yes")
+
+# Opt-in LLMLingua-2 compression of the data context (needs the optional
+# llmlingua package; its model is loaded on the first prompt)
+PROMPT_COMPRESSION = os.getenv("PROMPT_COMPRESSION", "").lower() in ("1", "true", "yes")
+PROMPT_COMPRESSION_RATE = float(os.getenv("PROMPT_COMPRESSION_RATE", "0.33"))
+
+# Optional LongLLMLingua model for question-aware chat context trimming
+# (e.g. "NousResearch/Llama-2-7b-hf"); empty uses the built-in line filter
+QUERY_COMPRESSION_MODEL = os.getenv("QUERY_COMPRESSION_MODEL", "")
@@ -1,15 +1,42 @@
 import os
+import asyncio
+import anyio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from sqlalchemy import text
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import engine, Base
+from app.db import async_engine
+from app.middleware import etag_middleware
 from app.routers import chat, data, analytics, reports, generation
+from app.services.summary_service import (
+    refresh_summary_tables_async,
+    run_summary_refresh_loop,
+)
+
+THREADPOOL_SIZE = 64
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync (def) routes run in anyio's worker pool; the default 40 threads
+    # queue up behind slow report/export requests
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Summary tables may predate this process (pre-loaded DB): rebuild once on boot
+    await refresh_summary_tables_async()
+    refresh_task = asyncio.create_task(run_summary_refresh_loop())
+    yield
+    refresh_task.cancel()
+    await async_engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="NYOS APR",
     description="Pharmaceutical Quality Analysis Assistant - Advanced Analytics",
     version="2.0.0",
+    lifespan=lifespan,
+    # orjson renders the large analytics payloads several times faster
+    default_response_class=ORJSONResponse,
 )
 
 ALLOWED_ORIGINS = os.getenv(
@@ -17,6 +44,9 @@ ALLOWED_ORIGINS = os.getenv(
     "http://localhost:5173,http://localhost:5174,http://localhost:3000"
 ).split(",")
 
+# Registered before CORS so 304 replies still get the CORS headers
+app.middleware("http")(etag_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -34,6 +64,14 @@ app.include_router(generation.router)
 
 @app.get("/health")
 async def health():
+    # Connectivity only: the schema is managed by Alembic (see entrypoint.sh)
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return ORJSONResponse(
+            status_code=503, content={"status": "unhealthy", "database": str(e)}
+        )
     return {"status": "healthy"}
 
 
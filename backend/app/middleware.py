@@ -0,0 +1,53 @@
+import hashlib
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+# GET endpoints whose JSON only changes after imports / new conversations
+ETAG_PATH_PREFIXES = ("/analytics/",)
+ETAG_PATHS = ("/chat/conversations", "/chat/conversations/full")
+ETAG_CACHE_CONTROL = "private, max-age=30, must-revalidate"
+# The conversation list changes under the user's own actions: always revalidate
+ETAG_REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _cache_control_for(path: str) -> Optional[str]:
+    if path in ETAG_PATHS:
+        return ETAG_REVALIDATE_CACHE_CONTROL
+    if path.startswith(ETAG_PATH_PREFIXES):
+        return ETAG_CACHE_CONTROL
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def etag_middleware(request: Request, call_next):
+    """Tag dashboard responses with a body hash and answer revalidations with 304"""
+    response = await call_next(request)
+
+    cache_control = _cache_control_for(request.url.path)
+    if request.method != "GET" or response.status_code != 200 or not cache_control:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+    headers = dict(response.headers)
+    headers["ETag"] = etag
+    headers["Cache-Control"] = cache_control
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        headers.pop("content-length", None)
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=response.media_type,
+    )
@@ -7,11 +7,24 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     Boolean,
+    Index,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 import enum
 from app.db import Base
+from app.config import STRICT_LOADING
+
+# Relationships must be eager-loaded where they are traversed; STRICT_LOADING
+# turns any remaining lazy load into an error
+RELATIONSHIP_LAZY = "raise" if STRICT_LOADING else "select"
+
+
+def normalize_label(value):
+    """Case/whitespace-insensitive form of a free-text status or severity"""
+    if value is None:
+        return None
+    return value.strip().lower()
 
 
 class DataType(str, enum.Enum):
@@ -67,6 +80,17 @@ class Batch(Base):
     comments = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Date-range scans (anomalies, drift, period comparison) that read
+        # yield and press straight from the index
+        Index(
+            "ix_batch_date_yield_press",
+            "manufacturing_date",
+            "yield_percent",
+            "tablet_press_id",
+        ),
+    )
+
 
 class QCResult(Base):
     """Extended QC lab results with full CQAs"""
@@ -106,6 +130,12 @@ class QCResult(Base):
     analyst = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_qc_date", "test_date"),
+        # Assay/dissolution spec filter behind the QC pass rate
+        Index("ix_qc_specs", "assay_percent", "dissolution_mean"),
+    )
+
 
 class Complaint(Base):
     """Customer complaints with investigation tracking"""
@@ -115,7 +145,7 @@ class Complaint(Base):
     complaint_id = Column(String(50), unique=True, index=True)
     complaint_date = Column(DateTime)
     batch_id = Column(String(50))
-    category = Column(String(50))
+    category = Column(String(50), index=True)
     description = Column(Text)
     severity = Column(String(20))
     market = Column(String(50))
@@ -126,8 +156,25 @@ class Complaint(Base):
     regulatory_reportable = Column(String(10))
     capa_reference = Column(String(50))
     status = Column(String(20), default="open")
+    # Lowercased copies of status/severity for index-friendly counters
+    status_norm = Column(String(20), default="open", index=True)
+    severity_norm = Column(String(20), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_complaint_date_status_sev", "complaint_date", "status", "severity"),
+    )
+
+    @validates("status")
+    def _set_status_norm(self, key, value):
+        self.status_norm = normalize_label(value)
+        return value
+
+    @validates("severity")
+    def _set_severity_norm(self, key, value):
+        self.severity_norm = normalize_label(value)
+        return value
+
 
 class CAPA(Base):
     """CAPA records with full tracking"""
@@ -136,7 +183,7 @@ class CAPA(Base):
     id = Column(Integer, primary_key=True, index=True)
     capa_id = Column(String(50), unique=True, index=True)
     capa_type = Column(String(30))
-    source = Column(String(50))
+    source = Column(String(50), index=True)
     source_reference = Column(String(50))
     open_date = Column(DateTime)
     problem_statement = Column(Text)
@@ -151,10 +198,20 @@ class CAPA(Base):
     actual_completion_date = Column(DateTime)
     days_to_close = Column(Integer)
     status = Column(String(20), default="open")
+    # Lowercased status, with every "Closed - ..." variant collapsed to "closed"
+    status_norm = Column(String(20), default="open")
     effectiveness_verified = Column(String(10))
     num_actions = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_capa_status", "status_norm"),)
+
+    @validates("status")
+    def _set_status_norm(self, key, value):
+        status = normalize_label(value)
+        self.status_norm = "closed" if status and "closed" in status else status
+        return value
+
 
 class Equipment(Base):
     """Equipment calibration records"""
@@ -164,7 +221,7 @@ class Equipment(Base):
     calibration_id = Column(String(50), index=True)
     equipment_id = Column(String(50), index=True)
     equipment_name = Column(String(100))
-    equipment_type = Column(String(50))
+    equipment_type = Column(String(50), index=True)
     location = Column(String(50))
     criticality = Column(String(20))
     parameter = Column(String(50))
@@ -179,6 +236,11 @@ class Equipment(Base):
     calibrated_by = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Recent calibration failures: equality on result, range on date
+        Index("ix_equipment_result_date", "result", "actual_date"),
+    )
+
 
 class Environmental(Base):
     """Environmental monitoring records"""
@@ -219,6 +281,10 @@ class RawMaterial(Base):
     disposition = Column(String(20))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_rm_supplier_disposition", "supplier_id", "disposition"),
+    )
+
 
 class Stability(Base):
     """Stability testing data"""
@@ -266,7 +332,11 @@ class Conversation(Base):
     title = Column(String(255), default="Nouvelle conversation")
     created_at = Column(DateTime, default=datetime.utcnow)
     messages = relationship(
-        "ChatMessage", back_populates="conversation", cascade="all, delete-orphan"
+        "ChatMessage",
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        order_by="ChatMessage.created_at",
+        lazy=RELATIONSHIP_LAZY,
     )
 
 
@@ -277,7 +347,9 @@ class ChatMessage(Base):
     role = Column(String(20))
     content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
-    conversation = relationship("Conversation", back_populates="messages")
+    conversation = relationship(
+        "Conversation", back_populates="messages", lazy=RELATIONSHIP_LAZY
+    )
 
 
 class UploadedFile(Base):
@@ -287,6 +359,9 @@ class UploadedFile(Base):
     data_type = Column(String(50))
     records_count = Column(Integer)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
+    file_reports = relationship(
+        "FileReport", back_populates="uploaded_file", lazy=RELATIONSHIP_LAZY
+    )
 
 
 class Report(Base):
@@ -326,7 +401,9 @@ class FileReport(Base):
     error_message = Column(Text, nullable=True)
     generated_at = Column(DateTime, default=datetime.utcnow)
     
-    uploaded_file = relationship("UploadedFile", backref="file_reports")
+    uploaded_file = relationship(
+        "UploadedFile", back_populates="file_reports", lazy=RELATIONSHIP_LAZY
+    )
 
 
 class MonthlyReport(Base):
@@ -384,3 +461,84 @@ class APRReport(Base):
     generated_at = Column(DateTime, default=datetime.utcnow)
     approved_by = Column(String(100), nullable=True)
     approved_at = Column(DateTime, nullable=True)
+
+
+class YearlyBatchStats(Base):
+    """Per-year batch rollup backing /analytics/yearly-summary (refreshed after imports)"""
+
+    __tablename__ = "mv_yearly_batch_stats"
+    year = Column(Integer, primary_key=True)
+    batch_count = Column(Integer)
+    avg_yield = Column(Float)
+    avg_hardness = Column(Float)
+    complaints = Column(Integer)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SupplierStats(Base):
+    """Per-supplier delivery dispositions backing /analytics/supplier-performance"""
+
+    __tablename__ = "mv_supplier_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    supplier_id = Column(String(50))
+    supplier_name = Column(String(100))
+    deliveries = Column(Integer)
+    approved = Column(Integer)
+    rejected = Column(Integer)
+    pending = Column(Integer)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class FullStats(Base):
+    """Single-row get_full_stats payload for the Gemini summary/report prompts"""
+
+    __tablename__ = "mv_full_stats"
+    id = Column(Integer, primary_key=True)
+    payload = Column(Text)  # JSON string of the unfiltered stats dict
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PressStats(Base):
+    """Per-tablet-press rollup backing /analytics/equipment-analysis"""
+
+    __tablename__ = "mv_press_stats"
+    tablet_press_id = Column(String(50), primary_key=True)
+    batches = Column(Integer)
+    avg_yield = Column(Float)
+    avg_hardness = Column(Float)
+    # Raw moments so the hardness standard deviation can be derived on read
+    hardness_n = Column(Integer)
+    hardness_sum = Column(Float)
+    hardness_sq_sum = Column(Float)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class GlobalKPIs(Base):
+    """Single-row dashboard counters backing /analytics/overview"""
+
+    __tablename__ = "mv_global_kpis"
+    id = Column(Integer, primary_key=True)
+    min_date = Column(DateTime)
+    max_date = Column(DateTime)
+    # Production
+    total_batches = Column(Integer)
+    avg_yield = Column(Float)
+    min_yield = Column(Float)
+    max_yield = Column(Float)
+    recent_batches = Column(Integer)
+    recent_yield = Column(Float)
+    # Quality
+    total_qc = Column(Integer)
+    qc_pass_count = Column(Integer)
+    quality_score = Column(Float)
+    # Compliance
+    total_complaints = Column(Integer)
+    open_complaints = Column(Integer)
+    critical_complaints = Column(Integer)
+    total_capas = Column(Integer)
+    open_capas = Column(Integer)
+    overdue_capas = Column(Integer)
+    # Equipment
+    total_calibrations = Column(Integer)
+    failed_calibrations = Column(Integer)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
@@ -1,107 +1,73 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case, extract
-from app.db import get_db
-from app import models
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, and_, or_
+from app.db import get_async_db
+from app import models, analytics_cache
 from datetime import datetime, timedelta
 from typing import Optional
-import numpy as np
+import math
+import heapq
+from itertools import islice
 from collections import defaultdict
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Max rows returned by /analytics/anomalies (and fetched per source)
+ANOMALY_LIMIT = 50
+
+
+def refreshed_at_iso(refreshed_at):
+    """Timestamp of the summary-table refresh a response was served from"""
+    return refreshed_at.isoformat() if refreshed_at else None
+
 
 @router.get("/overview")
-async def get_analytics_overview(db: Session = Depends(get_db)):
-    """Get comprehensive analytics overview for dashboard"""
+@analytics_cache.cached_response
+async def get_analytics_overview(db: AsyncSession = Depends(get_async_db)):
+    """Get comprehensive analytics overview for dashboard
 
-    # Date range
-    max_date = db.query(func.max(models.Batch.manufacturing_date)).scalar()
-    min_date = db.query(func.min(models.Batch.manufacturing_date)).scalar()
+    Counters are read from the mv_global_kpis summary row, refreshed after
+    every data import (see services/summary_service.py).
+    """
 
-    if not max_date:
+    kpis = (await db.execute(select(models.GlobalKPIs))).scalars().first()
+
+    if not kpis or not kpis.max_date:
         return {
             "has_data": False,
             "message": "No data available. Please import data first.",
         }
 
-    # Global stats
-    total_batches = db.query(models.Batch).count()
-    total_qc = db.query(models.QCResult).count()
-
-    # Yield statistics
-    avg_yield = db.query(func.avg(models.Batch.yield_percent)).scalar() or 0
-    min_yield = db.query(func.min(models.Batch.yield_percent)).scalar() or 0
-    max_yield = db.query(func.max(models.Batch.yield_percent)).scalar() or 0
-
-    # Recent month stats
-    month_ago = max_date - timedelta(days=30)
-    recent_batches = (
-        db.query(models.Batch)
-        .filter(models.Batch.manufacturing_date >= month_ago)
-        .count()
-    )
-    recent_yield = (
-        db.query(func.avg(models.Batch.yield_percent))
-        .filter(models.Batch.manufacturing_date >= month_ago)
-        .scalar()
-        or 0
-    )
+    min_date, max_date = kpis.min_date, kpis.max_date
 
-    # Quality metrics - use actual specs not overall_result field
-    # Pharma specs: Assay 95-105%, Dissolution >80%
-    qc_pass_count = (
-        db.query(models.QCResult)
-        .filter(
-            models.QCResult.assay_percent >= 95,
-            models.QCResult.assay_percent <= 105,
-            models.QCResult.dissolution_mean >= 80,
-        )
-        .count()
-    )
-    qc_pass_rate = (qc_pass_count / total_qc * 100) if total_qc > 0 else 0
+    total_batches = kpis.total_batches or 0
+    avg_yield = kpis.avg_yield or 0
+    min_yield = kpis.min_yield or 0
+    max_yield = kpis.max_yield or 0
+    recent_batches = kpis.recent_batches or 0
+    recent_yield = kpis.recent_yield or 0
 
-    # Complaints
-    total_complaints = db.query(models.Complaint).count()
-    open_complaints = (
-        db.query(models.Complaint)
-        .filter(func.lower(models.Complaint.status) == "open")
-        .count()
-    )
+    total_qc = kpis.total_qc or 0
+    qc_pass_count = kpis.qc_pass_count or 0
+    qc_pass_rate = (qc_pass_count / total_qc * 100) if total_qc > 0 else 0
 
-    # Complaints by severity
-    critical_complaints = (
-        db.query(models.Complaint)
-        .filter(func.lower(models.Complaint.severity) == "critical")
-        .count()
-    )
+    total_complaints = kpis.total_complaints or 0
+    open_complaints = kpis.open_complaints or 0
+    critical_complaints = kpis.critical_complaints or 0
 
-    # CAPAs - count all non-closed as open
-    total_capas = db.query(models.CAPA).count()
-    open_capas = (
-        db.query(models.CAPA)
-        .filter(~func.lower(models.CAPA.status).like("%closed%"))
-        .count()
-    )
-    overdue_capas = (
-        db.query(models.CAPA)
-        .filter(func.lower(models.CAPA.status) == "overdue")
-        .count()
-    )
+    total_capas = kpis.total_capas or 0
+    open_capas = kpis.open_capas or 0
+    overdue_capas = kpis.overdue_capas or 0
 
-    # Equipment
-    total_calibrations = db.query(models.Equipment).count()
-    failed_calibrations = (
-        db.query(models.Equipment).filter(models.Equipment.result == "Fail").count()
-    )
+    total_calibrations = kpis.total_calibrations or 0
+    failed_calibrations = kpis.failed_calibrations or 0
 
-    # Calculate quality score (0-100)
-    quality_score = calculate_quality_score(
-        qc_pass_rate, avg_yield, open_complaints, open_capas, failed_calibrations
-    )
+    # Quality score (0-100) is computed with the rest of the summary row
+    quality_score = kpis.quality_score or 0
 
     return {
         "has_data": True,
+        "refreshed_at": refreshed_at_iso(kpis.refreshed_at),
         "period": {
             "start": min_date.isoformat() if min_date else None,
             "end": max_date.isoformat() if max_date else None,
@@ -148,48 +114,12 @@ async def get_analytics_overview(db: Session = Depends(get_db)):
     }
 
 
-def calculate_quality_score(
-    qc_pass_rate, avg_yield, open_complaints, open_capas, failed_calibrations
-):
-    """Calculate overall quality score 0-100
-
-    Weights optimized for pharmaceutical manufacturing:
-    - QC pass rate: most important (40%)
-    - Yield: important for efficiency (25%)
-    - Complaints/CAPAs: normalized for long-term data (20%)
-    - Equipment calibration: safety critical (15%)
-    """
-    score = 100
-
-    # QC pass rate impact (max -40) - most critical
-    if qc_pass_rate < 100:
-        score -= (100 - qc_pass_rate) * 4  # 4 points per %
-
-    # Yield impact (max -25)
-    if avg_yield < 98:
-        score -= (98 - avg_yield) * 5  # 5 points per % below 98
-
-    # Open complaints impact (max -10) - scaled for realistic numbers
-    # Typical pharma: <10 open complaints is good, >50 is concerning
-    complaint_penalty = min(open_complaints / 5, 10)
-    score -= complaint_penalty
-
-    # Open CAPAs impact (max -10) - scaled for realistic numbers
-    # Having some CAPAs open is normal; >100 is concerning
-    capa_penalty = min(open_capas / 25, 10)
-    score -= capa_penalty
-
-    # Failed calibrations impact (max -15)
-    score -= min(failed_calibrations, 15)
-
-    return max(0, min(100, round(score, 1)))
-
-
 @router.get("/drift-detection")
-async def detect_drifts(db: Session = Depends(get_db), window_days: int = 90):
+@analytics_cache.cached_response
+async def detect_drifts(db: AsyncSession = Depends(get_async_db), window_days: int = 90):
     """Detect drift trends in key parameters"""
 
-    max_date = db.query(func.max(models.Batch.manufacturing_date)).scalar()
+    max_date = await analytics_cache.get_max_date(db)
     if not max_date:
         return {"drifts": [], "message": "No data available"}
 
@@ -211,32 +141,37 @@ async def detect_drifts(db: Session = Depends(get_db), window_days: int = 90):
         ("weight", models.Batch.weight, "Weight (mg)", 5),
     ]
 
-    for param_id, column, label, threshold in params:
-        # Current period stats
-        current_avg = (
-            db.query(func.avg(column))
-            .filter(models.Batch.manufacturing_date >= window_start)
-            .scalar()
+    # Window averages for every parameter: one query per period
+    current_avgs = (
+        await db.execute(
+            select(*[func.avg(column) for _, column, _, _ in params]).where(
+                models.Batch.manufacturing_date >= window_start
+            )
         )
-
-        # Previous period stats
-        prev_avg = (
-            db.query(func.avg(column))
-            .filter(
+    ).one()
+    prev_avgs = (
+        await db.execute(
+            select(*[func.avg(column) for _, column, _, _ in params]).where(
                 models.Batch.manufacturing_date >= comparison_start,
                 models.Batch.manufacturing_date < window_start,
             )
-            .scalar()
         )
+    ).one()
 
+    # Per-press window averages for every parameter, fetched once per request
+    press_avgs = await get_press_window_averages(
+        db, [column for _, column, _, _ in params], window_start, comparison_start
+    )
+
+    for i, ((param_id, column, label, threshold), current_avg, prev_avg) in enumerate(
+        zip(params, current_avgs, prev_avgs)
+    ):
         if current_avg and prev_avg:
             change = current_avg - prev_avg
             change_pct = (change / prev_avg) * 100 if prev_avg != 0 else 0
 
             # Check by equipment
-            equipment_drifts = analyze_equipment_drift(
-                db, column, window_start, comparison_start, threshold
-            )
+            equipment_drifts = analyze_equipment_drift(press_avgs, i, threshold)
 
             if abs(change) > threshold or equipment_drifts:
                 drifts.append(
@@ -263,35 +198,45 @@ async def detect_drifts(db: Session = Depends(get_db), window_days: int = 90):
     }
 
 
-def analyze_equipment_drift(db, column, current_start, prev_start, threshold):
-    """Analyze drift by equipment"""
-    equipment_drifts = []
+async def get_press_window_averages(db, columns, current_start, prev_start):
+    """Current/previous window averages of each column, for every press
 
-    # Get unique presses
-    presses = db.query(models.Batch.tablet_press_id).distinct().all()
+    A single grouped query using conditional aggregation; returns
+    ``{press: [(current_avg, prev_avg), ...]}`` in ``columns`` order.
+    """
+    in_current = models.Batch.manufacturing_date >= current_start
+    in_prev = and_(
+        models.Batch.manufacturing_date >= prev_start,
+        models.Batch.manufacturing_date < current_start,
+    )
 
-    for (press,) in presses:
-        if not press:
-            continue
+    aggregates = []
+    for column in columns:
+        aggregates.append(func.avg(case((in_current, column))))
+        aggregates.append(func.avg(case((in_prev, column))))
 
-        current_avg = (
-            db.query(func.avg(column))
-            .filter(
-                models.Batch.manufacturing_date >= current_start,
-                models.Batch.tablet_press_id == press,
-            )
-            .scalar()
+    presses = await db.execute(
+        select(models.Batch.tablet_press_id, *aggregates)
+        .where(
+            models.Batch.tablet_press_id.isnot(None),
+            models.Batch.manufacturing_date >= prev_start,
         )
+        .group_by(models.Batch.tablet_press_id)
+    )
 
-        prev_avg = (
-            db.query(func.avg(column))
-            .filter(
-                models.Batch.manufacturing_date >= prev_start,
-                models.Batch.manufacturing_date < current_start,
-                models.Batch.tablet_press_id == press,
-            )
-            .scalar()
-        )
+    return {
+        press: list(zip(avgs[::2], avgs[1::2]))
+        for press, *avgs in presses
+        if press
+    }
+
+
+def analyze_equipment_drift(press_avgs, column_index, threshold):
+    """Analyze drift by equipment for one column of get_press_window_averages"""
+    equipment_drifts = []
+
+    for press, avgs in press_avgs.items():
+        current_avg, prev_avg = avgs[column_index]
 
         if current_avg and prev_avg:
             change = current_avg - prev_avg
@@ -309,28 +254,11 @@ def analyze_equipment_drift(db, column, current_start, prev_start, threshold):
 
 
 @router.get("/supplier-performance")
-async def get_supplier_performance(db: Session = Depends(get_db)):
+@analytics_cache.cached_response
+async def get_supplier_performance(db: AsyncSession = Depends(get_async_db)):
     """Analyze supplier quality performance"""
 
-    # Get raw materials with supplier info
-    suppliers = (
-        db.query(
-            models.RawMaterial.supplier_id,
-            models.RawMaterial.supplier_name,
-            func.count(models.RawMaterial.id).label("deliveries"),
-            func.sum(
-                case((models.RawMaterial.disposition.like("Released%"), 1), else_=0)
-            ).label("approved"),
-            func.sum(
-                case((models.RawMaterial.disposition == "Rejected", 1), else_=0)
-            ).label("rejected"),
-            func.sum(
-                case((models.RawMaterial.disposition.like("Pending%"), 1), else_=0)
-            ).label("pending"),
-        )
-        .group_by(models.RawMaterial.supplier_id, models.RawMaterial.supplier_name)
-        .all()
-    )
+    suppliers = (await db.execute(select(models.SupplierStats))).scalars().all()
 
     result = []
     for s in suppliers:
@@ -356,6 +284,9 @@ async def get_supplier_performance(db: Session = Depends(get_db)):
     result.sort(key=lambda x: x["approval_rate"])
 
     return {
+        "refreshed_at": refreshed_at_iso(
+            suppliers[0].refreshed_at if suppliers else None
+        ),
         "total_suppliers": len(result),
         "suppliers": result,
         "at_risk": len([s for s in result if s["status"] == "critical"]),
@@ -363,8 +294,9 @@ async def get_supplier_performance(db: Session = Depends(get_db)):
 
 
 @router.get("/period-comparison")
+@analytics_cache.cached_response
 async def compare_periods(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     period1_start: Optional[str] = None,
     period1_end: Optional[str] = None,
     period2_start: Optional[str] = None,
@@ -372,7 +304,7 @@ async def compare_periods(
 ):
     """Compare two time periods"""
 
-    max_date = db.query(func.max(models.Batch.manufacturing_date)).scalar()
+    max_date = await analytics_cache.get_max_date(db)
     if not max_date:
         return {"error": "No data available"}
 
@@ -388,54 +320,51 @@ async def compare_periods(
     p2_start = datetime.strptime(period2_start, "%Y-%m-%d")
     p2_end = datetime.strptime(period2_end, "%Y-%m-%d")
 
-    def get_period_stats(start, end):
-        batches = (
-            db.query(models.Batch)
-            .filter(
-                models.Batch.manufacturing_date >= start,
-                models.Batch.manufacturing_date <= end,
+    # Both periods in one pass per table: CASE buckets each row into its period
+    date_col = models.Batch.manufacturing_date
+    in_p1 = and_(date_col >= p1_start, date_col <= p1_end)
+    in_p2 = and_(date_col >= p2_start, date_col <= p2_end)
+    batch_stats = (
+        await db.execute(
+            select(
+                func.sum(case((in_p1, 1), else_=0)),
+                func.sum(case((in_p2, 1), else_=0)),
+                func.avg(case((in_p1, models.Batch.yield_percent))),
+                func.avg(case((in_p2, models.Batch.yield_percent))),
+                func.avg(case((in_p1, models.Batch.hardness))),
+                func.avg(case((in_p2, models.Batch.hardness))),
+            ).where(
+                date_col >= min(p1_start, p2_start),
+                date_col <= max(p1_end, p2_end),
             )
-            .count()
         )
-
-        avg_yield = (
-            db.query(func.avg(models.Batch.yield_percent))
-            .filter(
-                models.Batch.manufacturing_date >= start,
-                models.Batch.manufacturing_date <= end,
-            )
-            .scalar()
-            or 0
-        )
-
-        avg_hardness = (
-            db.query(func.avg(models.Batch.hardness))
-            .filter(
-                models.Batch.manufacturing_date >= start,
-                models.Batch.manufacturing_date <= end,
+    ).one()
+
+    complaint_date = models.Complaint.complaint_date
+    in_p1 = and_(complaint_date >= p1_start, complaint_date <= p1_end)
+    in_p2 = and_(complaint_date >= p2_start, complaint_date <= p2_end)
+    complaint_stats = (
+        await db.execute(
+            select(
+                func.sum(case((in_p1, 1), else_=0)),
+                func.sum(case((in_p2, 1), else_=0)),
+            ).where(
+                complaint_date >= min(p1_start, p2_start),
+                complaint_date <= max(p1_end, p2_end),
             )
-            .scalar()
-            or 0
-        )
-
-        complaints = (
-            db.query(models.Complaint)
-            .filter(
-                models.Complaint.complaint_date >= start,
-                models.Complaint.complaint_date <= end,
-            )
-            .count()
         )
+    ).one()
 
+    def period_stats(i):
         return {
-            "batches": batches,
-            "avg_yield": round(avg_yield, 2),
-            "avg_hardness": round(avg_hardness, 2),
-            "complaints": complaints,
+            "batches": batch_stats[i] or 0,
+            "avg_yield": round(batch_stats[2 + i] or 0, 2),
+            "avg_hardness": round(batch_stats[4 + i] or 0, 2),
+            "complaints": complaint_stats[i] or 0,
         }
 
-    period1_stats = get_period_stats(p1_start, p1_end)
-    period2_stats = get_period_stats(p2_start, p2_end)
+    period1_stats = period_stats(0)
+    period2_stats = period_stats(1)
 
     # Calculate changes
     def calc_change(curr, prev):
@@ -474,27 +403,56 @@ async def compare_periods(
 
 
 @router.get("/anomalies")
-async def detect_anomalies(db: Session = Depends(get_db), days: int = 30):
+@analytics_cache.cached_response
+async def detect_anomalies(db: AsyncSession = Depends(get_async_db), days: int = 30):
     """Detect anomalies in recent data"""
 
-    max_date = db.query(func.max(models.Batch.manufacturing_date)).scalar()
+    max_date = await analytics_cache.get_max_date(db)
     if not max_date:
         return {"anomalies": [], "message": "No data available"}
 
     cutoff = max_date - timedelta(days=days)
-    anomalies = []
+
+    # Each source is filtered in SQL and fetched already in response order
+    # (critical first, then by date) so LIMIT keeps exactly the rows that can
+    # make the top ANOMALY_LIMIT; the totals come from COUNT aggregates.
 
     # Check for low yield batches
+    low_yield_filter = and_(
+        models.Batch.manufacturing_date >= cutoff,
+        models.Batch.yield_percent < 95,
+    )
+    low_yield_critical = models.Batch.yield_percent < 90
+
+    low_yield_total, low_yield_critical_count = (
+        await db.execute(
+            select(
+                func.count(models.Batch.id),
+                func.sum(case((low_yield_critical, 1), else_=0)),
+            ).where(low_yield_filter)
+        )
+    ).one()
+
     low_yield = (
-        db.query(models.Batch)
-        .filter(
-            models.Batch.manufacturing_date >= cutoff, models.Batch.yield_percent < 95
+        await db.execute(
+            select(
+                models.Batch.batch_id,
+                models.Batch.manufacturing_date,
+                models.Batch.yield_percent,
+                models.Batch.tablet_press_id,
+            )
+            .where(low_yield_filter)
+            .order_by(
+                case((low_yield_critical, 0), else_=1),
+                models.Batch.manufacturing_date,
+            )
+            .limit(ANOMALY_LIMIT)
         )
-        .all()
-    )
+    ).all()
 
+    low_yield_anomalies = []
     for batch in low_yield:
-        anomalies.append(
+        low_yield_anomalies.append(
             {
                 "type": "low_yield",
                 "severity": "warning" if batch.yield_percent >= 90 else "critical",
@@ -512,14 +470,50 @@ async def detect_anomalies(db: Session = Depends(get_db), days: int = 30):
 
     # Check for QC failures - only flag if values are actually out of spec
     # Pharma specs: Assay 95-105%, Dissolution >80%
+    # (0 means "not measured" in imported data, as in the per-row checks below)
+    qc = models.QCResult
+    assay_oos = and_(
+        qc.assay_percent != 0, or_(qc.assay_percent < 95, qc.assay_percent > 105)
+    )
+    dissolution_low = and_(qc.dissolution_mean != 0, qc.dissolution_mean < 80)
+    cu_oos = and_(qc.cu_av > 15, qc.cu_av < 50)
+    impurity_high = qc.impurity_total > 0.5
+    qc_filter = and_(
+        qc.test_date >= cutoff,
+        or_(assay_oos, dissolution_low, cu_oos, impurity_high),
+    )
+    qc_critical = or_(
+        and_(assay_oos, or_(qc.assay_percent < 90, qc.assay_percent > 110)),
+        and_(dissolution_low, qc.dissolution_mean < 70),
+        and_(cu_oos, qc.cu_av > 25),
+        qc.impurity_total > 1.0,
+    )
+
+    qc_total, qc_critical_count = (
+        await db.execute(
+            select(
+                func.count(qc.id), func.sum(case((qc_critical, 1), else_=0))
+            ).where(qc_filter)
+        )
+    ).one()
+
     qc_issues = (
-        db.query(models.QCResult)
-        .filter(
-            models.QCResult.test_date >= cutoff,
+        await db.execute(
+            select(
+                qc.batch_id,
+                qc.test_date,
+                qc.assay_percent,
+                qc.dissolution_mean,
+                qc.cu_av,
+                qc.impurity_total,
+            )
+            .where(qc_filter)
+            .order_by(case((qc_critical, 0), else_=1), qc.test_date)
+            .limit(ANOMALY_LIMIT)
         )
-        .all()
-    )
+    ).all()
 
+    qc_anomalies = []
     for qc in qc_issues:
         # Check actual values against pharmaceutical specifications
         issues = []
@@ -547,7 +541,7 @@ async def detect_anomalies(db: Session = Depends(get_db), days: int = 30):
             is_critical = is_critical or qc.impurity_total > 1.0
 
         if issues:
-            anomalies.append(
+            qc_anomalies.append(
                 {
                     "type": "qc_failure",
                     "severity": "critical" if is_critical else "warning",
@@ -559,16 +553,32 @@ async def detect_anomalies(db: Session = Depends(get_db), days: int = 30):
             )
 
     # Check for equipment calibration failures
+    cal_filter = and_(
+        models.Equipment.actual_date >= cutoff,
+        models.Equipment.result == "Fail",
+    )
+
+    cal_total = (
+        await db.execute(select(func.count(models.Equipment.id)).where(cal_filter))
+    ).scalar()
+
     cal_failures = (
-        db.query(models.Equipment)
-        .filter(
-            models.Equipment.actual_date >= cutoff, models.Equipment.result == "Fail"
+        await db.execute(
+            select(
+                models.Equipment.equipment_id,
+                models.Equipment.equipment_name,
+                models.Equipment.actual_date,
+                models.Equipment.parameter,
+            )
+            .where(cal_filter)
+            .order_by(models.Equipment.actual_date)
+            .limit(ANOMALY_LIMIT)
         )
-        .all()
-    )
+    ).all()
 
+    cal_anomalies = []
     for eq in cal_failures:
-        anomalies.append(
+        cal_anomalies.append(
             {
                 "type": "calibration_failure",
                 "severity": "warning",
@@ -580,99 +590,86 @@ async def detect_anomalies(db: Session = Depends(get_db), days: int = 30):
             }
         )
 
-    # Sort by severity and date
+    # Each source is already in (severity, date) order: merge, don't re-sort
     severity_order = {"critical": 0, "warning": 1}
-    anomalies.sort(
-        key=lambda x: (severity_order.get(x["severity"], 2), x.get("date", "") or "")
+    anomalies = list(
+        islice(
+            heapq.merge(
+                low_yield_anomalies,
+                qc_anomalies,
+                cal_anomalies,
+                key=lambda x: (
+                    severity_order.get(x["severity"], 2),
+                    x.get("date", "") or "",
+                ),
+            ),
+            ANOMALY_LIMIT,
+        )
     )
 
+    total = low_yield_total + qc_total + cal_total
+    critical = (low_yield_critical_count or 0) + (qc_critical_count or 0)
+
     return {
         "period": f"Derniers {days} jours",
-        "total": len(anomalies),
-        "critical": len([a for a in anomalies if a["severity"] == "critical"]),
-        "warning": len([a for a in anomalies if a["severity"] == "warning"]),
-        "anomalies": anomalies[:50],  # Limit to 50
+        "total": total,
+        "critical": critical,
+        "warning": total - critical,
+        "anomalies": anomalies,
     }
 
 
 @router.get("/yearly-summary")
-async def get_yearly_summary(db: Session = Depends(get_db)):
+@analytics_cache.cached_response
+async def get_yearly_summary(db: AsyncSession = Depends(get_async_db)):
     """Get yearly summary for trend analysis"""
 
-    batches = (
-        db.query(
-            extract("year", models.Batch.manufacturing_date).label("year"),
-            func.count(models.Batch.id).label("batch_count"),
-            func.avg(models.Batch.yield_percent).label("avg_yield"),
-            func.avg(models.Batch.hardness).label("avg_hardness"),
-        )
-        .group_by(extract("year", models.Batch.manufacturing_date))
-        .order_by("year")
-        .all()
-    )
-
-    complaints_by_year = (
-        db.query(
-            extract("year", models.Complaint.complaint_date).label("year"),
-            func.count(models.Complaint.id).label("count"),
+    years = (
+        (
+            await db.execute(
+                select(models.YearlyBatchStats).order_by(models.YearlyBatchStats.year)
+            )
         )
-        .group_by(extract("year", models.Complaint.complaint_date))
+        .scalars()
         .all()
     )
 
-    complaints_dict = {int(c.year): c.count for c in complaints_by_year}
-
     return {
+        "refreshed_at": refreshed_at_iso(years[0].refreshed_at if years else None),
         "years": [
             {
-                "year": int(b.year),
-                "batches": b.batch_count,
-                "avg_yield": round(b.avg_yield, 2) if b.avg_yield else 0,
-                "avg_hardness": round(b.avg_hardness, 2) if b.avg_hardness else 0,
-                "complaints": complaints_dict.get(int(b.year), 0),
+                "year": y.year,
+                "batches": y.batch_count,
+                "avg_yield": round(y.avg_yield, 2) if y.avg_yield else 0,
+                "avg_hardness": round(y.avg_hardness, 2) if y.avg_hardness else 0,
+                "complaints": y.complaints or 0,
             }
-            for b in batches
-            if b.year
-        ]
+            for y in years
+        ],
     }
 
 
 @router.get("/equipment-analysis")
-async def get_equipment_analysis(db: Session = Depends(get_db)):
+@analytics_cache.cached_response
+async def get_equipment_analysis(db: AsyncSession = Depends(get_async_db)):
     """Analyze equipment performance"""
 
-    # By tablet press - get basic stats (SQLite doesn't support stddev)
-    presses = (
-        db.query(
-            models.Batch.tablet_press_id,
-            func.count(models.Batch.id).label("batch_count"),
-            func.avg(models.Batch.yield_percent).label("avg_yield"),
-            func.avg(models.Batch.hardness).label("avg_hardness"),
-        )
-        .group_by(models.Batch.tablet_press_id)
-        .all()
-    )
+    presses = (await db.execute(select(models.PressStats))).scalars().all()
 
     equipment_stats = []
     for p in presses:
-        if not p.tablet_press_id:
-            continue
-
-        # Calculate standard deviation in Python
-        hardness_values = (
-            db.query(models.Batch.hardness)
-            .filter(models.Batch.tablet_press_id == p.tablet_press_id)
-            .filter(models.Batch.hardness.isnot(None))
-            .all()
-        )
-        hardness_list = [h[0] for h in hardness_values if h[0] is not None]
-        hardness_std = float(np.std(hardness_list)) if len(hardness_list) > 1 else 0.0
+        # Population standard deviation from the stored raw moments
+        hardness_std = 0.0
+        if p.hardness_n and p.hardness_n > 1:
+            mean = p.hardness_sum / p.hardness_n
+            variance = p.hardness_sq_sum / p.hardness_n - mean * mean
+            hardness_std = math.sqrt(max(variance, 0.0))
 
         equipment_stats.append(
             {
                 "equipment_id": p.tablet_press_id,
                 "type": "Tablet Press",
-                "batches": p.batch_count,
+                "batches": p.batches,
                 "avg_yield": round(p.avg_yield, 2) if p.avg_yield else 0,
                 "avg_hardness": round(p.avg_hardness, 2) if p.avg_hardness else 0,
                 "hardness_variability": round(hardness_std, 2),
@@ -683,6 +680,7 @@ async def get_equipment_analysis(db: Session = Depends(get_db)):
     equipment_stats.sort(key=lambda x: x["avg_yield"])
 
     return {
+        "refreshed_at": refreshed_at_iso(presses[0].refreshed_at if presses else None),
         "equipment": equipment_stats,
         "lowest_yield": equipment_stats[0] if equipment_stats else None,
         "highest_variability": (
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func
 from app.db import get_db
 from app.schemas import ChatRequest, ChatResponse
 from app.services.gemini_service import (
@@ -17,17 +19,58 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.get("/conversations")
-async def get_conversations(db: Session = Depends(get_db)):
+def get_conversations(db: Session = Depends(get_db)):
+    # Message count and last activity come from the same grouped query
+    convs = (
+        db.query(
+            models.Conversation.id,
+            models.Conversation.title,
+            models.Conversation.created_at,
+            func.count(models.ChatMessage.id).label("message_count"),
+            func.max(models.ChatMessage.created_at).label("last_message_at"),
+        )
+        .outerjoin(models.ChatMessage)
+        .group_by(models.Conversation.id)
+        .order_by(models.Conversation.created_at.desc())
+        .all()
+    )
+    return [
+        {
+            "id": c.id,
+            "title": c.title,
+            "created_at": c.created_at,
+            "message_count": c.message_count,
+            "last_message_at": c.last_message_at,
+        }
+        for c in convs
+    ]
+
+
+@router.get("/conversations/full")
+def get_conversations_full(db: Session = Depends(get_db)):
+    """All conversations with their messages, in two queries whatever the count"""
     convs = (
         db.query(models.Conversation)
+        .options(selectinload(models.Conversation.messages))
         .order_by(models.Conversation.created_at.desc())
         .all()
     )
-    return [{"id": c.id, "title": c.title, "created_at": c.created_at} for c in convs]
+    return [
+        {
+            "id": c.id,
+            "title": c.title,
+            "created_at": c.created_at,
+            "messages": [
+                {"role": m.role, "content": m.content, "created_at": m.created_at}
+                for m in c.messages
+            ],
+        }
+        for c in convs
+    ]
 
 
 @router.post("/conversations")
-async def create_conversation(db: Session = Depends(get_db)):
+def create_conversation(db: Session = Depends(get_db)):
     conv = models.Conversation(title="Nouvelle conversation")
     db.add(conv)
     db.commit()
@@ -36,7 +79,7 @@ async def create_conversation(db: Session = Depends(get_db)):
 
 
 @router.delete("/conversations/{conv_id}")
-async def delete_conversation(conv_id: int, db: Session = Depends(get_db)):
+def delete_conversation(conv_id: int, db: Session = Depends(get_db)):
     conv = (
         db.query(models.Conversation).filter(models.Conversation.id == conv_id).first()
     )
@@ -46,36 +89,43 @@ async def delete_conversation(conv_id: int, db: Session = Depends(get_db)):
     return {"status": "deleted"}
 
 
-@router.post("/{conv_id}", response_model=ChatResponse)
-async def chat(conv_id: int, request: ChatRequest, db: Session = Depends(get_db)):
+def _record_user_turn(db: Session, conv_id: int, message: str) -> int:
+    """Store the user's message, creating/titling the conversation; returns its id
+
+    Conversation + user turn in one transaction, durable even if Gemini fails.
+    """
     conv = (
         db.query(models.Conversation).filter(models.Conversation.id == conv_id).first()
     )
     if not conv:
-        conv = models.Conversation(title=request.message[:50])
+        conv = models.Conversation(title=message[:50])
         db.add(conv)
-        db.commit()
-        db.refresh(conv)
+        db.flush()  # Get the ID
         conv_id = conv.id
 
     if conv.title == "Nouvelle conversation":
-        conv.title = request.message[:50] + ("..." if len(request.message) > 50 else "")
-        db.commit()
+        conv.title = message[:50] + ("..." if len(message) > 50 else "")
 
-    db.add(
-        models.ChatMessage(
-            conversation_id=conv_id, role="user", content=request.message
-        )
-    )
+    db.add(models.ChatMessage(conversation_id=conv_id, role="user", content=message))
     db.commit()
+    return conv_id
 
-    response = await chat_with_gemini(request.message, db)
 
+def _record_assistant_turn(db: Session, conv_id: int, response: str):
     db.add(
         models.ChatMessage(conversation_id=conv_id, role="assistant", content=response)
     )
     db.commit()
 
+
+@router.post("/{conv_id}", response_model=ChatResponse)
+async def chat(conv_id: int, request: ChatRequest, db: Session = Depends(get_db)):
+    # The Session work (and its commits) runs in the threadpool; only the
+    # Gemini call is awaited on the event loop
+    conv_id = await run_in_threadpool(_record_user_turn, db, conv_id, request.message)
+    response = await chat_with_gemini(request.message, db)
+    await run_in_threadpool(_record_assistant_turn, db, conv_id, response)
+
     return ChatResponse(response=response)
 
 
@@ -124,7 +174,7 @@ async def get_report(
 
 
 @router.get("/reports/history")
-async def get_report_history(
+def get_report_history(
     db: Session = Depends(get_db),
     limit: int = Query(20, description="Max number of reports to return")
 ):
@@ -149,7 +199,7 @@ async def get_report_history(
 
 
 @router.get("/reports/{report_id}")
-async def get_saved_report(report_id: int, db: Session = Depends(get_db)):
+def get_saved_report(report_id: int, db: Session = Depends(get_db)):
     """Get a specific saved report"""
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if not report:
@@ -168,7 +218,7 @@ async def get_saved_report(report_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/reports/{report_id}")
-async def delete_saved_report(report_id: int, db: Session = Depends(get_db)):
+def delete_saved_report(report_id: int, db: Session = Depends(get_db)):
     """Delete a saved report"""
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if report:
@@ -178,7 +228,7 @@ async def delete_saved_report(report_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{conv_id}/history")
-async def get_history(conv_id: int, db: Session = Depends(get_db)):
+def get_history(conv_id: int, db: Session = Depends(get_db)):
     messages = (
         db.query(models.ChatMessage)
         .filter(models.ChatMessage.conversation_id == conv_id)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text
 from app.db import get_db
-from app import models
+from app import models, analytics_cache
 from app.schemas import DashboardStats, UploadResponse
-from app.services.gemini_service import analyze_trends
+from app.services.gemini_service import analyze_trends, bust_context_cache
 from app.services.report_service import generate_file_report
+from app.services.summary_service import refresh_summary_tables
 from datetime import datetime, timedelta
 import pandas as pd
 import io
@@ -51,17 +52,17 @@ def safe_date(val):
 
 
 @router.get("/dashboard", response_model=DashboardStats)
-async def get_dashboard(db: Session = Depends(get_db)):
-    total_batches = db.query(models.Batch).count()
+def get_dashboard(db: Session = Depends(get_db)):
+    total_batches = db.query(func.count(models.Batch.id)).scalar()
 
     # Get date range from actual data
-    max_date = db.query(func.max(models.Batch.manufacturing_date)).scalar()
+    max_date = analytics_cache.get_max_date_sync(db)
     if max_date:
         month_ago = max_date - timedelta(days=30)
         batches_month = (
-            db.query(models.Batch)
+            db.query(func.count(models.Batch.id))
             .filter(models.Batch.manufacturing_date >= month_ago)
-            .count()
+            .scalar()
         )
     else:
         batches_month = 0
@@ -70,21 +71,23 @@ async def get_dashboard(db: Session = Depends(get_db)):
 
     # Case-insensitive status queries for complaints (Open, open, OPEN)
     complaints_open = (
-        db.query(models.Complaint)
-        .filter(func.lower(models.Complaint.status) == "open")
-        .count()
+        db.query(func.count(models.Complaint.id))
+        .filter(models.Complaint.status_norm == "open")
+        .scalar()
     )
 
     # CAPAs: count all non-closed statuses as "open"
     capas_open = (
-        db.query(models.CAPA)
-        .filter(~func.lower(models.CAPA.status).like("%closed%"))
-        .count()
+        db.query(func.count(models.CAPA.id))
+        .filter(models.CAPA.status_norm != "closed")
+        .scalar()
     )
 
     # Equipment due for calibration
     equipment_due = (
-        db.query(models.Equipment).filter(models.Equipment.result == "Fail").count()
+        db.query(func.count(models.Equipment.id))
+        .filter(models.Equipment.result == "Fail")
+        .scalar()
     )
 
     return DashboardStats(
@@ -98,7 +101,7 @@ async def get_dashboard(db: Session = Depends(get_db)):
 
 
 @router.get("/batches")
-async def get_batches(db: Session = Depends(get_db), limit: int = 100, offset: int = 0):
+def get_batches(db: Session = Depends(get_db), limit: int = 100, offset: int = 0):
     batches = (
         db.query(models.Batch)
         .order_by(models.Batch.manufacturing_date.desc())
@@ -110,7 +113,7 @@ async def get_batches(db: Session = Depends(get_db), limit: int = 100, offset: i
 
 
 @router.get("/trends/{parameter}")
-async def get_trends(parameter: str, days: int = 30, db: Session = Depends(get_db)):
+def get_trends(parameter: str, days: int = 30, db: Session = Depends(get_db)):
     valid_params = [
         "hardness",
         "yield_percent",
@@ -124,11 +127,11 @@ async def get_trends(parameter: str, days: int = 30, db: Session = Depends(get_d
         raise HTTPException(
             status_code=400, detail=f"Paramètre invalide. Valides: {valid_params}"
         )
-    return await analyze_trends(db, parameter, days)
+    return analyze_trends(db, parameter, days)
 
 
 @router.get("/complaints")
-async def get_complaints(db: Session = Depends(get_db), status: str = None):
+def get_complaints(db: Session = Depends(get_db), status: str = None):
     query = db.query(models.Complaint)
     if status:
         query = query.filter(models.Complaint.status == status)
@@ -136,7 +139,7 @@ async def get_complaints(db: Session = Depends(get_db), status: str = None):
 
 
 @router.get("/capas")
-async def get_capas(db: Session = Depends(get_db), status: str = None):
+def get_capas(db: Session = Depends(get_db), status: str = None):
     query = db.query(models.CAPA)
     if status:
         query = query.filter(models.CAPA.status == status)
@@ -144,12 +147,12 @@ async def get_capas(db: Session = Depends(get_db), status: str = None):
 
 
 @router.get("/equipment")
-async def get_equipment(db: Session = Depends(get_db)):
+def get_equipment(db: Session = Depends(get_db)):
     return db.query(models.Equipment).order_by(models.Equipment.next_due_date).all()
 
 
 @router.get("/environmental")
-async def get_environmental(db: Session = Depends(get_db), limit: int = 100):
+def get_environmental(db: Session = Depends(get_db), limit: int = 100):
     return (
         db.query(models.Environmental)
         .order_by(models.Environmental.monitoring_date.desc())
@@ -159,7 +162,7 @@ async def get_environmental(db: Session = Depends(get_db), limit: int = 100):
 
 
 @router.get("/stability")
-async def get_stability(db: Session = Depends(get_db)):
+def get_stability(db: Session = Depends(get_db)):
     return (
         db.query(models.Stability)
         .order_by(models.Stability.test_date.desc())
@@ -169,7 +172,7 @@ async def get_stability(db: Session = Depends(get_db)):
 
 
 @router.get("/raw-materials")
-async def get_raw_materials(db: Session = Depends(get_db), limit: int = 100):
+def get_raw_materials(db: Session = Depends(get_db), limit: int = 100):
     return (
         db.query(models.RawMaterial)
         .order_by(models.RawMaterial.receipt_date.desc())
@@ -179,7 +182,7 @@ async def get_raw_materials(db: Session = Depends(get_db), limit: int = 100):
 
 
 @router.get("/batch-releases")
-async def get_batch_releases(db: Session = Depends(get_db), limit: int = 100):
+def get_batch_releases(db: Session = Depends(get_db), limit: int = 100):
     return (
         db.query(models.BatchRelease)
         .order_by(models.BatchRelease.release_date.desc())
@@ -189,7 +192,7 @@ async def get_batch_releases(db: Session = Depends(get_db), limit: int = 100):
 
 
 @router.post("/upload", response_model=UploadResponse)
-async def upload_data(
+def upload_data(
     file: UploadFile = File(...),
     data_type: str = "batch",
     db: Session = Depends(get_db),
@@ -201,7 +204,8 @@ async def upload_data(
             status_code=400, detail="Seuls les fichiers CSV sont acceptés"
         )
 
-    contents = await file.read()
+    # Plain def: the parse/insert loop and summary refresh run in the threadpool
+    contents = file.file.read()
     # Store contents for report generation later
     file_contents = contents
     df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
@@ -573,6 +577,19 @@ async def upload_data(
     db.add(upload_record)
     db.commit()
     db.refresh(upload_record)  # Get the ID
+
+    # Keep the dashboard summary tables in step with the imported data, then
+    # invalidate: a request in between would cache the old mv_* rows under
+    # the new version
+    refresh_summary_tables(db)
+    analytics_cache.bump()
+    bust_context_cache()
+
+    # SQLite doesn't gather planner statistics on its own: refresh them so the
+    # analytics indexes get picked once the tables have grown
+    if db.bind.dialect.name == "sqlite":
+        db.execute(text("ANALYZE"))
+        db.commit()
     
     # Trigger file report generation in background
     if generate_report and background_tasks:
@@ -615,7 +632,7 @@ async def trigger_file_report_generation(
 
 
 @router.get("/uploads")
-async def get_uploads(db: Session = Depends(get_db)):
+def get_uploads(db: Session = Depends(get_db)):
     return (
         db.query(models.UploadedFile)
         .order_by(models.UploadedFile.uploaded_at.desc())
@@ -624,37 +641,39 @@ async def get_uploads(db: Session = Depends(get_db)):
 
 
 @router.get("/stats/summary")
-async def get_summary_stats(db: Session = Depends(get_db)):
+def get_summary_stats(db: Session = Depends(get_db)):
     """Get comprehensive statistics for AI analysis"""
     return {
         "batches": {
-            "total": db.query(models.Batch).count(),
+            "total": db.query(func.count(models.Batch.id)).scalar(),
             "avg_yield": db.query(func.avg(models.Batch.yield_percent)).scalar() or 0,
             "avg_hardness": db.query(func.avg(models.Batch.hardness)).scalar() or 0,
         },
         "qc": {
-            "total_tests": db.query(models.QCResult).count(),
-            "pass_rate": db.query(models.QCResult)
+            "total_tests": db.query(func.count(models.QCResult.id)).scalar(),
+            "pass_rate": db.query(func.count(models.QCResult.id))
             .filter(models.QCResult.overall_result == "Pass")
-            .count()
-            / max(db.query(models.QCResult).count(), 1)
+            .scalar()
+            / max(db.query(func.count(models.QCResult.id)).scalar(), 1)
             * 100,
         },
         "complaints": {
-            "total": db.query(models.Complaint).count(),
-            "open": db.query(models.Complaint)
+            "total": db.query(func.count(models.Complaint.id)).scalar(),
+            "open": db.query(func.count(models.Complaint.id))
             .filter(models.Complaint.status == "open")
-            .count(),
+            .scalar(),
         },
         "capas": {
-            "total": db.query(models.CAPA).count(),
-            "open": db.query(models.CAPA).filter(models.CAPA.status == "open").count(),
+            "total": db.query(func.count(models.CAPA.id)).scalar(),
+            "open": db.query(func.count(models.CAPA.id))
+            .filter(models.CAPA.status == "open")
+            .scalar(),
         },
         "equipment": {
-            "calibrations": db.query(models.Equipment).count(),
-            "failures": db.query(models.Equipment)
+            "calibrations": db.query(func.count(models.Equipment.id)).scalar(),
+            "failures": db.query(func.count(models.Equipment.id))
             .filter(models.Equipment.result == "Fail")
-            .count(),
+            .scalar(),
         },
         "stability": {
             "studies": db.query(
@@ -167,7 +167,7 @@ async def generate_data_async(
 # ============== API Endpoints ==============
 
 @router.get("/data-types", response_model=List[DataTypeInfo])
-async def list_data_types():
+def list_data_types():
     """
     List all available data types that can be generated.
     
@@ -337,7 +337,7 @@ async def generate_and_download_custom(request: CustomGenerationRequest):
 
 
 @router.post("/month/preview", response_model=GenerationResponse)
-async def preview_month_generation(request: MonthGenerationRequest):
+def preview_month_generation(request: MonthGenerationRequest):
     """
     Preview monthly data generation without downloading.
     
@@ -454,7 +454,7 @@ async def generate_single_data_type(
 
 
 @router.get("/scenarios")
-async def list_hidden_scenarios():
+def list_hidden_scenarios():
     """
     List the hidden scenarios embedded in the generated data.
     
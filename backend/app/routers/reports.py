@@ -114,7 +114,7 @@ class GenerateAPRRequest(BaseModel):
 # ============================================================================
 
 @router.get("/files", response_model=List[FileReportResponse])
-async def list_file_reports(
+def list_file_reports(
     db: Session = Depends(get_db),
     year: Optional[int] = None,
     data_type: Optional[str] = None,
@@ -135,7 +135,7 @@ async def list_file_reports(
 
 
 @router.get("/files/{report_id}", response_model=FileReportResponse)
-async def get_file_report(report_id: int, db: Session = Depends(get_db)):
+def get_file_report(report_id: int, db: Session = Depends(get_db)):
     """Get a specific file report by ID"""
     report = db.query(models.FileReport).filter(models.FileReport.id == report_id).first()
     if not report:
@@ -144,7 +144,7 @@ async def get_file_report(report_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/files/{report_id}/full")
-async def get_file_report_full(report_id: int, db: Session = Depends(get_db)):
+def get_file_report_full(report_id: int, db: Session = Depends(get_db)):
     """Get a file report with all details including metrics and anomalies"""
     report = db.query(models.FileReport).filter(models.FileReport.id == report_id).first()
     if not report:
@@ -172,7 +172,7 @@ async def get_file_report_full(report_id: int, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/monthly", response_model=List[MonthlyReportResponse])
-async def list_monthly_reports(
+def list_monthly_reports(
     db: Session = Depends(get_db),
     year: Optional[int] = None,
     status: Optional[str] = None
@@ -189,7 +189,7 @@ async def list_monthly_reports(
 
 
 @router.get("/monthly/{year}/{month}", response_model=MonthlyReportResponse)
-async def get_monthly_report(year: int, month: int, db: Session = Depends(get_db)):
+def get_monthly_report(year: int, month: int, db: Session = Depends(get_db)):
     """Get a specific monthly report"""
     if month < 1 or month > 12:
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
@@ -204,7 +204,7 @@ async def get_monthly_report(year: int, month: int, db: Session = Depends(get_db
 
 
 @router.get("/monthly/{year}/{month}/full")
-async def get_monthly_report_full(year: int, month: int, db: Session = Depends(get_db)):
+def get_monthly_report_full(year: int, month: int, db: Session = Depends(get_db)):
     """Get a monthly report with all details including metrics and trends"""
     if month < 1 or month > 12:
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
@@ -270,13 +270,13 @@ async def generate_monthly(
 # ============================================================================
 
 @router.get("/apr", response_model=List[APRReportResponse])
-async def list_apr_reports(db: Session = Depends(get_db)):
+def list_apr_reports(db: Session = Depends(get_db)):
     """List all APR reports"""
     return db.query(models.APRReport).order_by(models.APRReport.year.desc()).all()
 
 
 @router.get("/apr/{year}", response_model=APRReportResponse)
-async def get_apr_report(year: int, db: Session = Depends(get_db)):
+def get_apr_report(year: int, db: Session = Depends(get_db)):
     """Get a specific APR report by year"""
     report = db.query(models.APRReport).filter(models.APRReport.year == year).first()
     if not report:
@@ -285,7 +285,7 @@ async def get_apr_report(year: int, db: Session = Depends(get_db)):
 
 
 @router.get("/apr/{year}/full")
-async def get_apr_report_full(year: int, db: Session = Depends(get_db)):
+def get_apr_report_full(year: int, db: Session = Depends(get_db)):
     """Get complete APR with all sections and metadata"""
     report = db.query(models.APRReport).filter(models.APRReport.year == year).first()
     if not report:
@@ -324,7 +324,7 @@ async def get_apr_report_full(year: int, db: Session = Depends(get_db)):
 
 
 @router.get("/apr/{year}/export")
-async def export_apr_markdown(year: int, db: Session = Depends(get_db)):
+def export_apr_markdown(year: int, db: Session = Depends(get_db)):
     """Export APR as a formatted Markdown document"""
     report = db.query(models.APRReport).filter(models.APRReport.year == year).first()
     if not report:
@@ -420,7 +420,7 @@ async def export_apr_markdown(year: int, db: Session = Depends(get_db)):
 
 
 @router.get("/apr/{year}/pdf")
-async def export_apr_pdf(year: int, db: Session = Depends(get_db)):
+def export_apr_pdf(year: int, db: Session = Depends(get_db)):
     """Export APR as a professionally formatted PDF document with logo"""
     from app.services.pdf_service import generate_apr_pdf
     
@@ -495,7 +495,7 @@ async def generate_apr(
 
 
 @router.post("/apr/{year}/approve")
-async def approve_apr(year: int, approved_by: str, db: Session = Depends(get_db)):
+def approve_apr(year: int, approved_by: str, db: Session = Depends(get_db)):
     """Mark an APR as approved"""
     report = db.query(models.APRReport).filter(models.APRReport.year == year).first()
     if not report:
@@ -516,13 +516,13 @@ async def approve_apr(year: int, approved_by: str, db: Session = Depends(get_db)
 # ============================================================================
 
 @router.get("/status/{year}", response_model=ReportHierarchyStatus)
-async def get_hierarchy_status(year: int, db: Session = Depends(get_db)):
+def get_hierarchy_status(year: int, db: Session = Depends(get_db)):
     """Get the status of all reports in the hierarchy for a year"""
     return get_report_hierarchy_status(db, year)
 
 
 @router.get("/status")
-async def get_all_years_status(db: Session = Depends(get_db)):
+def get_all_years_status(db: Session = Depends(get_db)):
     """Get status for all years with data"""
     # Find all years with file reports
     years = db.query(models.FileReport.period_year).distinct().all()
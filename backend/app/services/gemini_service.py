@@ -1,60 +1,382 @@
-import google.generativeai as genai
-from app.config import GOOGLE_API_KEY
+from app.config import (
+    PROMPT_COMPRESSION,
+    PROMPT_COMPRESSION_RATE,
+    QUERY_COMPRESSION_MODEL,
+)
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app import models
+from sqlalchemy import Numeric, and_, cast, func, select
+from app import models, analytics_cache
+from app.db import SessionLocal
+from app.services.genai_client import (
+    FULL_MODEL,
+    LITE_MODEL,
+    gemini_errors,
+    get_model,
+    request_options,
+)
 from datetime import datetime, timedelta
 from typing import Optional
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import json
+import orjson
+import re
+import threading
+from collections import Counter
+import numpy as np
+import time
+from string import Template
+
+try:
+    from llmlingua import PromptCompressor
+except ImportError:  # optional: pulls in torch and a ~500MB encoder
+    PromptCompressor = None
+
+LLMLINGUA_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+_compressor = None
+_query_compressor = None
+_compressor_lock = threading.Lock()
+
+# Question-aware trimming of the chat context: per-row sections are filtered
+# down to rows naming an identifier (batch, press, date) from the question
+QUERY_TRIM_MIN_QUESTION_LENGTH = 20
+_ROW_SECTIONS = ("RECENT BATCHES", "RECENT QC RESULTS")
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Rendered data contexts, keyed by date range: {(start, end): (fingerprint, context, ts)}
+CONTEXT_CACHE_TTL_SECONDS = 60
+_context_cache = {}
+_context_cache_lock = threading.Lock()
+
+
+def bust_context_cache():
+    """Drop cached data contexts (call after data imports/mutations)"""
+    with _context_cache_lock:
+        _context_cache.clear()
+
+
+def _data_fingerprint(db: Session) -> tuple:
+    """Cheap one-round-trip signature of the tables rendered in the context"""
+    return tuple(
+        db.execute(
+            select(
+                select(func.max(models.Batch.id)).scalar_subquery(),
+                select(func.max(models.QCResult.id)).scalar_subquery(),
+                select(func.count(models.Complaint.id)).scalar_subquery(),
+                select(func.count(models.CAPA.id)).scalar_subquery(),
+                select(func.count(models.Equipment.id)).scalar_subquery(),
+            )
+        ).one()
+    )
+
+
+def _get_compressor():
+    global _compressor
+    if _compressor is None:
+        with _compressor_lock:
+            if _compressor is None:
+                _compressor = PromptCompressor(LLMLINGUA_MODEL, use_llmlingua2=True)
+    return _compressor
+
+
+def _strip_layout(context: str) -> str:
+    """Drop the indentation used to lay out the DATA CONTEXT block"""
+    return "\n".join(line.strip() for line in context.strip().splitlines())
+
+
+def compress_context(context: str) -> str:
+    """Shrink the DATA CONTEXT block before it is sent to Gemini
 
-genai.configure(api_key=GOOGLE_API_KEY)
+    Opt-in (PROMPT_COMPRESSION) and only with llmlingua installed: LLMLingua-2
+    drops low-information tokens while keeping line structure. Applied last,
+    after trim_context_for_question, which relies on intact row prefixes.
+    Instructions and SYSTEM_PROMPT are never passed through here.
+    """
+    if PROMPT_COMPRESSION and PromptCompressor is not None:
+        result = _get_compressor().compress_prompt(
+            context,
+            rate=PROMPT_COMPRESSION_RATE,
+            force_tokens=["\n", "-", ":"],
+        )
+        return result["compressed_prompt"]
+    return context
+
+
+def _get_query_compressor():
+    global _query_compressor
+    if _query_compressor is None:
+        with _compressor_lock:
+            if _query_compressor is None:
+                _query_compressor = PromptCompressor(QUERY_COMPRESSION_MODEL)
+    return _query_compressor
+
+
+def _identifier_terms(text: str) -> set:
+    """Tokens that name specific rows: batch ids, press ids, dates and years"""
+    return {
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if any(ch.isdigit() for ch in token) or "-" in token
+    }
+
+
+def trim_context_for_question(context: str, question: str) -> str:
+    """Drop context rows unrelated to the user's question (chat only)
+
+    Headers and aggregate lines are always kept. Short or generic questions,
+    and questions whose identifiers match no row, get the full context.
+    With QUERY_COMPRESSION_MODEL set and llmlingua installed, LongLLMLingua
+    does question-aware compression instead.
+    """
+    if len(question) < QUERY_TRIM_MIN_QUESTION_LENGTH:
+        return context
+
+    if QUERY_COMPRESSION_MODEL and PromptCompressor is not None:
+        result = _get_query_compressor().compress_prompt(
+            context.split("\n"),
+            question=question,
+            rate=0.25,
+            dynamic_context_compression_ratio=0.4,
+        )
+        return result["compressed_prompt"]
+
+    terms = _identifier_terms(question)
+    if not terms:
+        return context
+
+    kept = []
+    matched = False
+    in_rows = False
+    for line in context.split("\n"):
+        if line.startswith(_ROW_SECTIONS):
+            in_rows = True
+        elif not line.startswith("- "):
+            in_rows = False
+        elif in_rows:
+            line_terms = _identifier_terms(line)
+            if not any(lt.startswith(term) for term in terms for lt in line_terms):
+                continue
+            matched = True
+        kept.append(line)
+
+    return "\n".join(kept) if matched else context
 
 
 def get_data_context(db: Session, start_date: datetime = None, end_date: datetime = None) -> str:
-    """Build comprehensive context from all data sources with optional date filtering"""
-    
-    # Base queries
-    batch_query = db.query(models.Batch)
-    qc_query = db.query(models.QCResult)
-    complaint_query = db.query(models.Complaint)
-    capa_query = db.query(models.CAPA)
-    equipment_query = db.query(models.Equipment)
-    
-    # Apply date filters if provided
-    if start_date:
-        batch_query = batch_query.filter(models.Batch.manufacturing_date >= start_date)
-        qc_query = qc_query.filter(models.QCResult.test_date >= start_date)
-        complaint_query = complaint_query.filter(models.Complaint.complaint_date >= start_date)
-        capa_query = capa_query.filter(models.CAPA.open_date >= start_date)
-        equipment_query = equipment_query.filter(models.Equipment.actual_date >= start_date)
-    
-    if end_date:
-        batch_query = batch_query.filter(models.Batch.manufacturing_date <= end_date)
-        qc_query = qc_query.filter(models.QCResult.test_date <= end_date)
-        complaint_query = complaint_query.filter(models.Complaint.complaint_date <= end_date)
-        capa_query = capa_query.filter(models.CAPA.open_date <= end_date)
-        equipment_query = equipment_query.filter(models.Equipment.actual_date <= end_date)
-    
-    batches = batch_query.order_by(models.Batch.manufacturing_date.desc()).limit(50).all()
-    qc_results = qc_query.order_by(models.QCResult.test_date.desc()).limit(50).all()
-    complaints = complaint_query.all()
-    capas = capa_query.all()
-    equipment = equipment_query.limit(50).all()
-
-    # Calculate statistics
-    total_batches = batch_query.count()
-    avg_yield_query = db.query(func.avg(models.Batch.yield_percent))
-    avg_hardness_query = db.query(func.avg(models.Batch.hardness))
-    
+    """Data context for the LLM, reused across chat turns while the data is unchanged"""
+    key = (start_date, end_date)
+    fingerprint = _data_fingerprint(db)
+
+    with _context_cache_lock:
+        cached = _context_cache.get(key)
+    if (
+        cached
+        and cached[0] == fingerprint
+        and time.monotonic() - cached[2] < CONTEXT_CACHE_TTL_SECONDS
+    ):
+        return cached[1]
+
+    context = _strip_layout(build_data_context(db, start_date, end_date))
+    with _context_cache_lock:
+        _context_cache[key] = (fingerprint, context, time.monotonic())
+    return context
+
+
+def _period_filter(column, start_date: datetime = None, end_date: datetime = None) -> list:
+    conditions = []
     if start_date:
-        avg_yield_query = avg_yield_query.filter(models.Batch.manufacturing_date >= start_date)
-        avg_hardness_query = avg_hardness_query.filter(models.Batch.manufacturing_date >= start_date)
+        conditions.append(column >= start_date)
     if end_date:
-        avg_yield_query = avg_yield_query.filter(models.Batch.manufacturing_date <= end_date)
-        avg_hardness_query = avg_hardness_query.filter(models.Batch.manufacturing_date <= end_date)
-    
-    avg_yield = avg_yield_query.scalar() or 0
-    avg_hardness = avg_hardness_query.scalar() or 0
+        conditions.append(column <= end_date)
+    return conditions
+
+
+def _label_or(column, default: str):
+    """SQL twin of ``value or default`` for grouping free-text columns"""
+    return func.coalesce(func.nullif(column, ""), default)
+
+
+def _grouped_counts(db: Session, label, *filters, limit: int = None) -> dict:
+    """{label: count} for a GROUP BY, largest groups first"""
+    count = func.count()
+    query = db.query(label, count).filter(*filters).group_by(label).order_by(count.desc())
+    if limit:
+        query = query.limit(limit)
+    return dict(query.all())
+
+
+def _sql_str(column):
+    """Text column rendered the way an f-string renders it (None -> 'None')"""
+    return func.coalesce(column, "None")
+
+
+def _sql_date(column, postgres: bool):
+    """Date part of a timestamp column as YYYY-MM-DD (NULL stays NULL)"""
+    if postgres:
+        return func.to_char(column, "YYYY-MM-DD")
+    return func.strftime("%Y-%m-%d", column)
+
+
+def _sql_decimal(column, postgres: bool):
+    """Float column as text with one decimal, NULL rendered as 0.0"""
+    value = func.coalesce(column, 0)
+    if postgres:
+        # numeric keeps its scale when cast to text: round(95, 1) -> '95.0'
+        return func.round(cast(value, Numeric), 1)
+    return func.printf("%.1f", value)
+
+
+# Not closed, and not blank: rows with an empty status count as neither
+_CAPA_OPEN = and_(models.CAPA.status != "", models.CAPA.status_norm != "closed")
+
+
+def _rendered_rows(
+    db: Session,
+    template: str,
+    columns: tuple,
+    sort_key,
+    filters: list,
+    postgres: bool,
+    limit: int = 15,
+) -> str:
+    """Newest `limit` rows formatted with `template` in SQL, newest first.
+
+    Saves hydrating the rows and formatting them one by one in Python: only
+    the finished lines are fetched. They are joined here rather than with
+    group_concat, whose concatenation order SQLite leaves undefined.
+    """
+    lines = db.execute(
+        select((func.format if postgres else func.printf)(template, *columns))
+        .where(*filters)
+        .order_by(sort_key.desc())
+        .limit(limit)
+    ).scalars()
+    return "".join(lines)
+
+
+def build_data_context(db: Session, start_date: datetime = None, end_date: datetime = None) -> str:
+    """Build comprehensive context from all data sources with optional date filtering
+
+    Counters and histograms are aggregated in SQL; only the rows actually
+    rendered are fetched.
+    """
+    batch_filter = _period_filter(models.Batch.manufacturing_date, start_date, end_date)
+    qc_filter = _period_filter(models.QCResult.test_date, start_date, end_date)
+    complaint_filter = _period_filter(
+        models.Complaint.complaint_date, start_date, end_date
+    )
+    capa_filter = _period_filter(models.CAPA.open_date, start_date, end_date)
+    equipment_filter = _period_filter(models.Equipment.actual_date, start_date, end_date)
+
+    total_batches, avg_yield, avg_hardness = (
+        db.query(
+            func.count(models.Batch.id),
+            func.avg(models.Batch.yield_percent),
+            func.avg(models.Batch.hardness),
+        )
+        .filter(*batch_filter)
+        .one()
+    )
+    avg_yield = avg_yield or 0
+    avg_hardness = avg_hardness or 0
+    # Rendered rows come back from the database as one preformatted string
+    postgres = db.bind.dialect.name == "postgresql"
+    recent_batches = _rendered_rows(
+        db,
+        "- %s: %s, Press: %s, Hardness: %skp, Yield: %s%%\n",
+        (
+            _sql_str(models.Batch.batch_id),
+            func.coalesce(_sql_date(models.Batch.manufacturing_date, postgres), "N/A"),
+            func.coalesce(func.nullif(models.Batch.tablet_press_id, ""), "N/A"),
+            _sql_decimal(models.Batch.hardness, postgres),
+            _sql_decimal(models.Batch.yield_percent, postgres),
+        ),
+        models.Batch.manufacturing_date,
+        batch_filter,
+        postgres,
+    )
+
+    qc_total = db.query(func.count(models.QCResult.id)).filter(*qc_filter).scalar()
+    recent_qc = _rendered_rows(
+        db,
+        "- %s: Assay=%s%%, Dissolution=%s%%, Result: %s\n",
+        (
+            _sql_str(models.QCResult.batch_id),
+            _sql_decimal(models.QCResult.assay_percent, postgres),
+            _sql_decimal(models.QCResult.dissolution_mean, postgres),
+            _sql_str(models.QCResult.overall_result),
+        ),
+        models.QCResult.test_date,
+        qc_filter,
+        postgres,
+    )
+
+    # One GROUP BY per table; counters and histograms fold in a single pass
+    complaint_keys = (
+        _label_or(models.Complaint.category, "Other"),
+        _label_or(models.Complaint.severity, "Unknown"),
+        models.Complaint.status == "open",
+        models.Complaint.status_norm == "open",
+    )
+    complaint_groups = (
+        db.query(*complaint_keys, func.count())
+        .filter(*complaint_filter)
+        .group_by(*complaint_keys)
+        .all()
+    )
+    complaints_total = complaints_open_exact = complaints_open = 0
+    by_category, by_severity = Counter(), Counter()
+    for category, severity, open_exact, open_norm, count in complaint_groups:
+        complaints_total += count
+        complaints_open_exact += count if open_exact else 0
+        complaints_open += count if open_norm else 0
+        by_category[category] += count
+        by_severity[severity] += count
+
+    capa_keys = (
+        _label_or(models.CAPA.source, "Other"),
+        models.CAPA.status == "open",
+        _CAPA_OPEN,
+        models.CAPA.risk_score == "Critical",
+    )
+    capa_groups = (
+        db.query(*capa_keys, func.count())
+        .filter(*capa_filter)
+        .group_by(*capa_keys)
+        .all()
+    )
+    capas_total = capas_open_exact = capas_open = capas_critical = 0
+    by_source = Counter()
+    for source, open_exact, not_closed, critical, count in capa_groups:
+        capas_total += count
+        capas_open_exact += count if open_exact else 0
+        capas_open += count if not_closed else 0
+        capas_critical += count if critical else 0
+        by_source[source] += count
+
+    # Calibration stats cover a 50-record sample, as rendered below
+    equipment = (
+        db.query(models.Equipment.result, models.Equipment.equipment_type)
+        .filter(*equipment_filter)
+        .limit(50)
+        .subquery()
+    )
+    equipment_keys = (
+        _label_or(equipment.c.equipment_type, "Other"),
+        equipment.c.result == "Fail",
+    )
+    equipment_groups = (
+        db.query(*equipment_keys, func.count())
+        .select_from(equipment)
+        .group_by(*equipment_keys)
+        .all()
+    )
+    equipment_total = equipment_failures = 0
+    by_type = Counter()
+    for equipment_type, failed, count in equipment_groups:
+        equipment_total += count
+        equipment_failures += count if failed else 0
+        by_type[equipment_type] += count
 
     # Build period string
     period_str = "2020-2025 (6 years of APR data)"
@@ -65,7 +387,8 @@ def get_data_context(db: Session, start_date: datetime = None, end_date: datetim
     elif end_date:
         period_str = f"Until {end_date.strftime('%Y-%m-%d')}"
 
-    context = f"""
+    parts = [
+        f"""
 === PHARMACEUTICAL PLANT DATA - PARACETAMOL 500mg ===
 Analysis Period: {period_str}
 
@@ -73,64 +396,38 @@ GLOBAL STATISTICS:
 - Total batches produced: {total_batches:,}
 - Average yield: {avg_yield:.1f}%
 - Average hardness: {avg_hardness:.1f} kp
-- Customer complaints: {len(complaints)} ({len([c for c in complaints if c.status == 'open'])} open)
-- CAPAs: {len(capas)} ({len([c for c in capas if c.status == 'open'])} open)
+- Customer complaints: {complaints_total} ({complaints_open_exact} open)
+- CAPAs: {capas_total} ({capas_open_exact} open)
 
-RECENT BATCHES (last {len(batches)}):
+RECENT BATCHES (last {min(total_batches, 50)}):
 """
-    for b in batches[:15]:
-        date_str = (
-            b.manufacturing_date.strftime("%Y-%m-%d") if b.manufacturing_date else "N/A"
-        )
-        context += f"- {b.batch_id}: {date_str}, Press: {b.tablet_press_id or 'N/A'}, Hardness: {b.hardness or 0:.1f}kp, Yield: {b.yield_percent or 0:.1f}%\n"
-
-    if qc_results:
-        context += f"\nRECENT QC RESULTS ({len(qc_results)} tests):\n"
-        for qc in qc_results[:15]:
-            context += f"- {qc.batch_id}: Assay={qc.assay_percent or 0:.1f}%, Dissolution={qc.dissolution_mean or 0:.1f}%, Result: {qc.overall_result}\n"
-
-    if complaints:
-        context += f"\nCUSTOMER COMPLAINTS ({len(complaints)} total):\n"
-        open_complaints = [
-            c for c in complaints if c.status and c.status.lower() == "open"
-        ]
-        context += f"   Open: {len(open_complaints)}\n"
-        by_category = {}
-        for c in complaints:
-            cat = c.category or "Other"
-            by_category[cat] = by_category.get(cat, 0) + 1
-        for cat, count in sorted(by_category.items(), key=lambda x: -x[1])[:5]:
-            context += f"   - {cat}: {count}\n"
-        by_severity = {}
-        for c in complaints:
-            sev = c.severity or "Unknown"
-            by_severity[sev] = by_severity.get(sev, 0) + 1
-        context += f"   By severity: {by_severity}\n"
-
-    if capas:
-        context += f"\nCAPAS ({len(capas)} total):\n"
-        open_capas = [c for c in capas if c.status and "closed" not in c.status.lower()]
-        context += f"   Open: {len(open_capas)}\n"
-        by_source = {}
-        for c in capas:
-            src = c.source or "Other"
-            by_source[src] = by_source.get(src, 0) + 1
-        for src, count in sorted(by_source.items(), key=lambda x: -x[1])[:5]:
-            context += f"   - Source {src}: {count}\n"
-        critical = [c for c in capas if c.risk_score == "Critical"]
-        context += f"   Critical CAPAs: {len(critical)}\n"
-
-    if equipment:
-        context += f"\nEQUIPMENT (recent calibrations):\n"
-        failures = [e for e in equipment if e.result == "Fail"]
-        context += f"   Calibration failures: {len(failures)}\n"
-        by_type = {}
-        for e in equipment:
-            t = e.equipment_type or "Other"
-            by_type[t] = by_type.get(t, 0) + 1
-        context += f"   By type: {by_type}\n"
+    ]
+    parts.append(recent_batches)
 
-    return context
+    if qc_total:
+        parts.append(f"\nRECENT QC RESULTS ({min(qc_total, 50)} tests):\n")
+        parts.append(recent_qc)
+
+    if complaints_total:
+        parts.append(f"\nCUSTOMER COMPLAINTS ({complaints_total} total):\n")
+        parts.append(f"   Open: {complaints_open}\n")
+        for cat, count in by_category.most_common(5):
+            parts.append(f"   - {cat}: {count}\n")
+        parts.append(f"   By severity: {dict(by_severity.most_common())}\n")
+
+    if capas_total:
+        parts.append(f"\nCAPAS ({capas_total} total):\n")
+        parts.append(f"   Open: {capas_open}\n")
+        for src, count in by_source.most_common(5):
+            parts.append(f"   - Source {src}: {count}\n")
+        parts.append(f"   Critical CAPAs: {capas_critical}\n")
+
+    if equipment_total:
+        parts.append("\nEQUIPMENT (recent calibrations):\n")
+        parts.append(f"   Calibration failures: {equipment_failures}\n")
+        parts.append(f"   By type: {dict(by_type.most_common())}\n")
+
+    return "".join(parts)
 
 
 SYSTEM_PROMPT = """You are NYOS, an AI assistant expert in pharmaceutical quality and APR (Annual Product Review) analysis.
@@ -160,224 +457,31 @@ Rules:
 """
 
 
-async def chat_with_gemini(message: str, db: Session) -> str:
-    try:
-        context = get_data_context(db)
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-
-        full_prompt = f"""{SYSTEM_PROMPT}
-
-DATA CONTEXT:
-{context}
+# Prompt scaffolds are built once at import; requests only fill the slots
+_CHAT_PROMPT = Template(
+    """DATA CONTEXT:
+${context}
 
 USER QUESTION:
-{message}
+${message}
 
 RESPONSE:"""
+)
 
-        response = model.generate_content(full_prompt)
-        return response.text
-    except Exception as e:
-        return f"Gemini connection error: {str(e)}. Check your API key."
-
-
-async def analyze_trends(db: Session, parameter: str = "hardness", days: int = 30):
-    batches = db.query(models.Batch).order_by(models.Batch.manufacturing_date).all()
-
-    if not batches:
-        return {"error": "Not enough data", "dates": [], "values": []}
-
-    max_date = max(b.manufacturing_date for b in batches if b.manufacturing_date)
-    cutoff = max_date - timedelta(days=days)
-
-    filtered = [
-        b for b in batches if b.manufacturing_date and b.manufacturing_date >= cutoff
-    ]
-
-    if len(filtered) < 2:
-        return {
-            "error": "Not enough data for this period",
-            "dates": [],
-            "values": [],
-        }
-
-    values = [
-        getattr(b, parameter, 0)
-        for b in filtered
-        if getattr(b, parameter, None) is not None
-    ]
-    dates = [
-        b.manufacturing_date.strftime("%Y-%m-%d")
-        for b in filtered
-        if getattr(b, parameter, None) is not None
-    ]
-
-    if len(values) < 2:
-        return {"error": "Not enough data", "dates": [], "values": []}
-
-    trend = "stable"
-    alert = False
-    if len(values) >= 5:
-        mid = len(values) // 2
-        first_avg = sum(values[:mid]) / mid
-        last_avg = sum(values[mid:]) / (len(values) - mid)
-        change = ((last_avg - first_avg) / first_avg) * 100 if first_avg else 0
-
-        if change > 5:
-            trend = "up"
-            alert = True
-        elif change < -5:
-            trend = "down"
-            alert = True
-
-    return {
-        "dates": dates,
-        "values": values,
-        "parameter": parameter,
-        "trend_direction": trend,
-        "alert": alert,
-        "average": round(sum(values) / len(values), 2) if values else 0,
-        "min": round(min(values), 2) if values else 0,
-        "max": round(max(values), 2) if values else 0,
-        "count": len(values),
-    }
-
-
-def get_full_stats(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
-    from sqlalchemy import func
-
-    # Base queries with optional date filters
-    batch_query = db.query(models.Batch)
-    qc_query = db.query(models.QCResult)
-    complaint_query = db.query(models.Complaint)
-    capa_query = db.query(models.CAPA)
-    equipment_query = db.query(models.Equipment)
-    
-    if start_date:
-        batch_query = batch_query.filter(models.Batch.manufacturing_date >= start_date)
-        qc_query = qc_query.filter(models.QCResult.test_date >= start_date)
-        complaint_query = complaint_query.filter(models.Complaint.complaint_date >= start_date)
-        capa_query = capa_query.filter(models.CAPA.open_date >= start_date)
-        equipment_query = equipment_query.filter(models.Equipment.actual_date >= start_date)
-    
-    if end_date:
-        batch_query = batch_query.filter(models.Batch.manufacturing_date <= end_date)
-        qc_query = qc_query.filter(models.QCResult.test_date <= end_date)
-        complaint_query = complaint_query.filter(models.Complaint.complaint_date <= end_date)
-        capa_query = capa_query.filter(models.CAPA.open_date <= end_date)
-        equipment_query = equipment_query.filter(models.Equipment.actual_date <= end_date)
-
-    batches = batch_query.all()
-    qc_results = qc_query.all()
-    complaints = complaint_query.all()
-    capas = capa_query.all()
-    equipment = equipment_query.all()
-
-    # Calculate QC pass rate based on actual pharmaceutical specifications
-    # Specs: Assay 95-105%, Dissolution >80%
-    qc_pass_count = len(
-        [
-            q
-            for q in qc_results
-            if q.assay_percent
-            and q.dissolution_mean
-            and 95 <= q.assay_percent <= 105
-            and q.dissolution_mean >= 80
-        ]
-    )
-
-    stats = {
-        "total_batches": len(batches),
-        "avg_hardness": (
-            round(
-                sum(b.hardness for b in batches if b.hardness)
-                / max(len([b for b in batches if b.hardness]), 1),
-                2,
-            )
-            if batches
-            else 0
-        ),
-        "avg_yield": (
-            round(
-                sum(b.yield_percent for b in batches if b.yield_percent)
-                / max(len([b for b in batches if b.yield_percent]), 1),
-                2,
-            )
-            if batches
-            else 0
-        ),
-        "machines": {},
-        "qc_pass_rate": (
-            round(qc_pass_count / max(len(qc_results), 1) * 100, 1) if qc_results else 0
-        ),
-        "qc_total": len(qc_results),
-        "qc_failed": len(qc_results) - qc_pass_count,
-        "complaints_by_category": {},
-        "complaints_total": len(complaints),
-        "complaints_open": len(
-            [c for c in complaints if c.status and c.status.lower() == "open"]
-        ),
-        "complaints_closed": len(
-            [c for c in complaints if c.status and c.status.lower() == "closed"]
-        ),
-        "capas_total": len(capas),
-        "capas_open": len(
-            [c for c in capas if c.status and "closed" not in c.status.lower()]
-        ),
-        "capas_closed": len(
-            [c for c in capas if c.status and "closed" in c.status.lower()]
-        ),
-        "equipment_due": len([e for e in equipment if e.result == "Fail"]),
-        "equipment_total": len(equipment),
-    }
-
-    for b in batches:
-        machine = b.tablet_press_id or "Unknown"
-        if machine not in stats["machines"]:
-            stats["machines"][machine] = {
-                "count": 0,
-                "hardness_sum": 0,
-                "yield_sum": 0,
-            }
-        stats["machines"][machine]["count"] += 1
-        stats["machines"][machine]["hardness_sum"] += b.hardness or 0
-        stats["machines"][machine]["yield_sum"] += b.yield_percent or 0
-
-    for m, data in stats["machines"].items():
-        if data["count"] > 0:
-            data["avg_hardness"] = round(data["hardness_sum"] / data["count"], 2)
-            data["avg_yield"] = round(data["yield_sum"] / data["count"], 2)
-
-    for c in complaints:
-        cat = c.category or "Unknown"
-        stats["complaints_by_category"][cat] = (
-            stats["complaints_by_category"].get(cat, 0) + 1
-        )
-
-    return stats
-
-
-async def generate_summary_stream(db: Session):
-    try:
-        context = get_data_context(db)
-        stats = get_full_stats(db)
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-
-        prompt = f"""{SYSTEM_PROMPT}
-
-DATA CONTEXT:
-{context}
+_SUMMARY_PROMPT = Template(
+    """DATA CONTEXT:
+${context}
 
 STATISTICS:
-- Total batches: {stats['total_batches']}
-- Average hardness: {stats['avg_hardness']}N
-- Average yield: {stats['avg_yield']}%
-- QC compliance rate: {stats['qc_pass_rate']}%
-- Open complaints: {stats['complaints_open']}
-- Open CAPAs: {stats['capas_open']}
-- Equipment requiring calibration: {stats['equipment_due']}
-- Complaints by category: {stats['complaints_by_category']}
-- Performance by machine: {stats['machines']}
+- Total batches: ${total_batches}
+- Average hardness: ${avg_hardness}N
+- Average yield: ${avg_yield}%
+- QC compliance rate: ${qc_pass_rate}%
+- Open complaints: ${complaints_open}
+- Open CAPAs: ${capas_open}
+- Equipment requiring calibration: ${equipment_due}
+- Complaints by category: ${complaints_by_category}
+- Performance by machine: ${machines}
 
 Generate a detailed executive summary of the plant status.
 Structure your response with:
@@ -390,36 +494,9 @@ Structure your response with:
 Use bullet points and **bold** text for important points.
 
 SUMMARY:"""
+)
 
-        response = model.generate_content(prompt, stream=True)
-        for chunk in response:
-            if chunk.text:
-                yield f"data: {json.dumps({'text': chunk.text})}\n\n"
-        yield f"data: {json.dumps({'done': True})}\n\n"
-    except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-
-async def generate_report(db: Session, start_date: datetime = None, end_date: datetime = None, title: str = None) -> dict:
-    """Generate APR report with optional date filtering and return both report and metadata"""
-    try:
-        context = get_data_context(db, start_date, end_date)
-        stats = get_full_stats(db, start_date, end_date)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-
-        # Build period string for the report
-        if start_date and end_date:
-            period_str = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
-            year_str = f"{start_date.year}" if start_date.year == end_date.year else f"{start_date.year}-{end_date.year}"
-            doc_id = f"APR-PARA-500mg-{start_date.year}-{end_date.year}-V1.0"
-        else:
-            period_str = "January 1, 2025 to January 31, 2026"
-            year_str = "2025"
-            doc_id = "APR-PARA-500mg-2025-2026-V1.0"
-
-        current_date = datetime.now().strftime("%B %d, %Y")
-        
-        prompt = f"""You are a senior pharmaceutical quality expert at NYOS PharmaCo Global. Generate a COMPLETE and PROFESSIONAL Annual Product Review (APR) report.
+_REPORT_PROMPT = Template("""You are a senior pharmaceutical quality expert at NYOS PharmaCo Global. Generate a COMPLETE and PROFESSIONAL Annual Product Review (APR) report.
 
 IMPORTANT INSTRUCTIONS:
 1. DO NOT use placeholder text like "[Plant Name]" - use ACTUAL data provided
@@ -430,24 +507,24 @@ IMPORTANT INSTRUCTIONS:
 ACTUAL PLANT DATA:
 Manufacturing Site: NYOS PharmaCo Global, Dublin Facility
 Product: Paracetamol 500mg Tablets (PARA-500-TAB)
-Document ID: {doc_id}
-Analysis Period: {period_str}
-Date Prepared: {current_date}
+Document ID: ${doc_id}
+Analysis Period: ${period_str}
+Date Prepared: ${current_date}
 Prepared By: Quality Assurance Department
 
 ACTUAL STATISTICS FROM DATABASE:
-- Total batches manufactured: {stats['total_batches']}
-- Average batch hardness: {stats['avg_hardness']}N
-- Average batch yield: {stats['avg_yield']}%
-- QC pass rate (annual): {stats['qc_pass_rate']}%
-- Total complaints received: {stats['complaints_open'] + stats.get('complaints_closed', 0)} ({stats['complaints_open']} still open)
-- Total CAPAs: {stats['capas_open'] + stats.get('capas_closed', 0)} ({stats['capas_open']} still open)
-- Equipment requiring calibration: {stats['equipment_due']}
-- Complaints breakdown: {stats['complaints_by_category']}
-- Machine performance data: {stats['machines']}
+- Total batches manufactured: ${total_batches}
+- Average batch hardness: ${avg_hardness}N
+- Average batch yield: ${avg_yield}%
+- QC pass rate (annual): ${qc_pass_rate}%
+- Total complaints received: ${complaints_count} (${complaints_open} still open)
+- Total CAPAs: ${capas_count} (${capas_open} still open)
+- Equipment requiring calibration: ${equipment_due}
+- Complaints breakdown: ${complaints_by_category}
+- Machine performance data: ${machines}
 
 RAW DATA CONTEXT:
-{context}
+${context}
 
 Generate the report with this EXACT structure. Fill all sections with REAL data and analysis:
 
@@ -457,15 +534,15 @@ Generate the report with this EXACT structure. Fill all sections with REAL data
 
 **Paracetamol 500mg Tablets**
 
-**Period:** {period_str}
+**Period:** ${period_str}
 
 ---
 
-**Document ID:** {doc_id}
+**Document ID:** ${doc_id}
 **Product:** Paracetamol 500mg Tablets (PARA-500-TAB)
 **Manufacturing Site:** NYOS PharmaCo Global, Dublin Facility
-**Analysis Period:** {period_str}
-**Date Prepared:** {current_date}
+**Analysis Period:** ${period_str}
+**Date Prepared:** ${current_date}
 **Prepared By:** Quality Assurance Department
 
 ---
@@ -473,10 +550,10 @@ Generate the report with this EXACT structure. Fill all sections with REAL data
 ## 1. EXECUTIVE SUMMARY
 
 Write a comprehensive executive summary including:
-- Total batches produced ({stats['total_batches']}) and production volume assessment
-- Overall yield performance ({stats['avg_yield']}%)
-- Quality metrics summary (QC pass rate: {stats['qc_pass_rate']}%)
-- Average hardness ({stats['avg_hardness']}N)
+- Total batches produced (${total_batches}) and production volume assessment
+- Overall yield performance (${avg_yield}%)
+- Quality metrics summary (QC pass rate: ${qc_pass_rate}%)
+- Average hardness (${avg_hardness}N)
 - Highlight any critical trends or issues found in the data
 - Key conclusions about product quality and process control
 
@@ -491,19 +568,19 @@ If there are open complaints or CAPAs, mention the backlog.
 - Assess production consistency
 
 ### 2.2 Yield Analysis
-- Average yield: {stats['avg_yield']}%
+- Average yield: ${avg_yield}%
 - Analyze yield trends by machine if available
 - Identify any batches with yield below 95%
 
 ### 2.3 Equipment Utilization
-Analyze the machine performance data: {stats['machines']}
+Analyze the machine performance data: ${machines}
 - Compare performance across tablet presses
 - Identify best and worst performing equipment
 
 ## 3. QUALITY CONTROL RESULTS
 
 ### 3.1 In-Process Controls
-- Tablet hardness: {stats['avg_hardness']}N (target: 10-15 kp)
+- Tablet hardness: ${avg_hardness}N (target: 10-15 kp)
 - Friability results
 - Weight variation
 
@@ -511,7 +588,7 @@ Analyze the machine performance data: {stats['machines']}
 - Assay results (target: 95-105%)
 - Dissolution performance
 - Content uniformity
-- QC pass rate: {stats['qc_pass_rate']}%
+- QC pass rate: ${qc_pass_rate}%
 
 Calculate how many batches failed QC based on the pass rate.
 
@@ -521,9 +598,9 @@ List any OOS events and their root causes.
 ## 4. CUSTOMER COMPLAINTS
 
 ### 4.1 Complaint Summary
-- Total complaints: {stats['complaints_open'] + stats.get('complaints_closed', 0)}
-- Open complaints: {stats['complaints_open']}
-- By category: {stats['complaints_by_category']}
+- Total complaints: ${complaints_count}
+- Open complaints: ${complaints_open}
+- By category: ${complaints_by_category}
 
 ### 4.2 Complaint Analysis
 Analyze the complaint categories and identify the most frequent issue.
@@ -535,8 +612,8 @@ Compare to industry standards (~0.5-1% complaint rate).
 ## 5. CAPA MANAGEMENT
 
 ### 5.1 CAPA Summary
-- Total CAPAs: {stats['capas_open'] + stats.get('capas_closed', 0)}
-- Open CAPAs: {stats['capas_open']}
+- Total CAPAs: ${capas_count}
+- Open CAPAs: ${capas_open}
 
 ### 5.2 CAPA Sources
 Analyze CAPA origins (deviations, complaints, audits).
@@ -547,7 +624,7 @@ Comment on closure rate and effectiveness verification.
 ## 6. EQUIPMENT STATUS
 
 ### 6.1 Calibration Status
-- Equipment requiring calibration: {stats['equipment_due']}
+- Equipment requiring calibration: ${equipment_due}
 - Flag overdue calibrations as quality risks
 
 ### 6.2 Preventive Maintenance
@@ -582,7 +659,7 @@ List specific, actionable recommendations:
 **Report Approval:**
 
 Prepared by: Quality Assurance Department
-Date: {current_date}
+Date: ${current_date}
 
 Reviewed by: _____________________
 Date: _________
@@ -592,21 +669,377 @@ Date: _________
 
 ---
 
-Remember: Use ACTUAL numbers from the statistics. Do not use placeholder text. Be specific and data-driven."""
+Remember: Use ACTUAL numbers from the statistics. Do not use placeholder text. Be specific and data-driven.""")
 
-        response = model.generate_content(prompt)
-        report_content = response.text
-        
-        # Return both report and metadata
-        return {
-            "report": report_content,
-            "metadata": {
-                "title": title or f"APR Report - Paracetamol 500mg - {year_str}",
-                "period_start": start_date.isoformat() if start_date else None,
-                "period_end": end_date.isoformat() if end_date else None,
-                "stats": stats,
-                "generated_at": datetime.now().isoformat()
+
+async def chat_with_gemini(message: str, db: Session) -> str:
+    context = await run_in_threadpool(get_data_context, db)
+    context = await run_in_threadpool(
+        compress_context, trim_context_for_question(context, message)
+    )
+    full_prompt = _CHAT_PROMPT.substitute(context=context, message=message)
+
+    try:
+        # SYSTEM_PROMPT rides along as the model's system instruction
+        response = await get_model(LITE_MODEL, SYSTEM_PROMPT).generate_content_async(
+            full_prompt, request_options=request_options()
+        )
+        return response.text
+    except gemini_errors() as e:
+        return f"Gemini connection error: {str(e)}. Check your API key."
+
+
+# Trend detection: rolling-mean change (%) for the direction, and Page's
+# CUSUM on daily means for drifts. CUSUM's threshold grows with the number
+# of days so a stationary series of any length alarms at most
+# CUSUM_FALSE_ALARM of the time
+TREND_CHANGE_PERCENT = 5
+CUSUM_K = 0.5
+CUSUM_FALSE_ALARM = 0.01
+CUSUM_MIN_DAYS = 10
+
+
+def _cusum(deviations: np.ndarray) -> np.ndarray:
+    """One-sided Page CUSUM S_n = max(0, S_{n-1} + d_n), without a Python loop"""
+    csum = np.cumsum(deviations)
+    return csum - np.minimum(np.minimum.accumulate(csum), 0)
+
+
+def _cusum_threshold(n: int) -> float:
+    """Decision interval h (in sigmas) for a two-sided CUSUM over n points
+
+    Siegmund's approximation gives the in-control run length for k = 0.5 as
+    ARL0 = 2 (e^b - b - 1) with b = h + 1.166; each side must last
+    2n / CUSUM_FALSE_ALARM points on average.
+    """
+    arl = 2 * n / CUSUM_FALSE_ALARM
+    b = np.log(arl / 2 + 1)
+    for _ in range(20):  # fixed point of b = ln(ARL0 / 2 + b + 1)
+        b = np.log(arl / 2 + b + 1)
+    return float(b - 1.166)
+
+
+def _detect_drift(arr: np.ndarray, dates: list):
+    """(trend_direction, alert, drift_index) for a time-ordered series
+
+    The first and last rolling means (window = a quarter of the series,
+    from one cumulative sum) give the overall direction. A two-sided CUSUM
+    over the daily means, standardized by their median and moving-range
+    sigma, catches gradual drifts the averages smooth over; drift_index is
+    the first batch of the day the drift started.
+    """
+    n = len(arr)
+    if n < 5:
+        return "stable", False, None
+
+    w = max(n // 4, 2)
+    csum = np.cumsum(np.insert(arr, 0, 0.0))
+    rolling = (csum[w:] - csum[:-w]) / w
+    baseline, recent = rolling[0], rolling[-1]
+    change = (recent - baseline) / baseline * 100 if baseline else 0
+
+    trend = "stable"
+    if change > TREND_CHANGE_PERCENT:
+        trend = "up"
+    elif change < -TREND_CHANGE_PERCENT:
+        trend = "down"
+
+    # Batches within a day are not independent draws of the process level:
+    # monitor one mean per day (dates are sorted, so first_batch is too)
+    _, first_batch, day = np.unique(
+        np.asarray(dates), return_index=True, return_inverse=True
+    )
+    days = len(first_batch)
+    if days < CUSUM_MIN_DAYS:
+        return trend, trend != "stable", None
+
+    daily = np.bincount(day, weights=arr) / np.bincount(day)
+    sigma = np.abs(np.diff(daily)).mean() / 1.128  # robust to the drift itself
+    if not sigma:
+        return trend, trend != "stable", None
+
+    z = (daily - np.median(daily)) / sigma
+    h = _cusum_threshold(days)
+    for s in (_cusum(z - CUSUM_K), _cusum(-z - CUSUM_K)):
+        alarms = np.flatnonzero(s > h)
+        if alarms.size:
+            # The drift starts just after the last reset before the first alarm
+            resets = np.flatnonzero(s[: alarms[0]] == 0)
+            drift_day = int(resets[-1]) + 1 if resets.size else 0
+            return trend, True, int(first_batch[drift_day])
+
+    return trend, trend != "stable", None
+
+
+def analyze_trends(db: Session, parameter: str = "hardness", days: int = 30):
+    column = getattr(models.Batch, parameter, None)
+    max_date = analytics_cache.get_max_date_sync(db)
+
+    if column is None or max_date is None:
+        return {"error": "Not enough data", "dates": [], "values": []}
+
+    cutoff = max_date - timedelta(days=days)
+    rows = (
+        db.query(models.Batch.manufacturing_date, column)
+        .filter(models.Batch.manufacturing_date >= cutoff, column.isnot(None))
+        .order_by(models.Batch.manufacturing_date)
+        .all()
+    )
+
+    if len(rows) < 2:
+        # Distinguish an empty window from one where the parameter is unset
+        window_batches = (
+            db.query(func.count(models.Batch.id))
+            .filter(models.Batch.manufacturing_date >= cutoff)
+            .scalar()
+        )
+        if window_batches < 2:
+            return {
+                "error": "Not enough data for this period",
+                "dates": [],
+                "values": [],
             }
+        return {"error": "Not enough data", "dates": [], "values": []}
+
+    values = [value for _, value in rows]
+    dates = [date.strftime("%Y-%m-%d") for date, _ in rows]
+    arr = np.fromiter(values, dtype=np.float64, count=len(values))
+
+    trend, alert, drift_index = _detect_drift(arr, dates)
+
+    return {
+        "dates": dates,
+        "values": values,
+        "parameter": parameter,
+        "trend_direction": trend,
+        "alert": alert,
+        "drift_index": drift_index,
+        "drift_start": dates[drift_index] if drift_index is not None else None,
+        "average": round(float(arr.mean()), 2),
+        "min": round(float(arr.min()), 2),
+        "max": round(float(arr.max()), 2),
+        "count": len(values),
+    }
+
+
+def get_full_stats(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
+    """Headline statistics for the summary/report prompts
+
+    The unfiltered stats are read from mv_full_stats, refreshed with the
+    other summary tables after every import; date-filtered stats are
+    computed on demand.
+    """
+    if start_date is None and end_date is None:
+        payload = db.query(models.FullStats.payload).scalar()
+        if payload:
+            return json.loads(payload)
+    return compute_full_stats(db, start_date, end_date)
+
+
+def compute_full_stats(db: Session, start_date: datetime = None, end_date: datetime = None) -> dict:
+    """Headline statistics for the summary prompt, aggregated in SQL"""
+    batch_filter = _period_filter(models.Batch.manufacturing_date, start_date, end_date)
+    qc_filter = _period_filter(models.QCResult.test_date, start_date, end_date)
+    complaint_filter = _period_filter(
+        models.Complaint.complaint_date, start_date, end_date
+    )
+    capa_filter = _period_filter(models.CAPA.open_date, start_date, end_date)
+    equipment_filter = _period_filter(models.Equipment.actual_date, start_date, end_date)
+
+    # Averages skip missing/zero readings, like the old truthiness filter
+    total_batches, avg_hardness, avg_yield = (
+        db.query(
+            func.count(models.Batch.id),
+            func.avg(func.nullif(models.Batch.hardness, 0)),
+            func.avg(func.nullif(models.Batch.yield_percent, 0)),
+        )
+        .filter(*batch_filter)
+        .one()
+    )
+
+    # Calculate QC pass rate based on actual pharmaceutical specifications
+    # Specs: Assay 95-105%, Dissolution >80%
+    qc_total, qc_pass_count = (
+        db.query(
+            func.count(models.QCResult.id),
+            func.count().filter(
+                and_(
+                    models.QCResult.assay_percent.between(95, 105),
+                    models.QCResult.dissolution_mean >= 80,
+                )
+            ),
+        )
+        .filter(*qc_filter)
+        .one()
+    )
+
+    complaints_total, complaints_open, complaints_closed = (
+        db.query(
+            func.count(models.Complaint.id),
+            func.count().filter(models.Complaint.status_norm == "open"),
+            func.count().filter(models.Complaint.status_norm == "closed"),
+        )
+        .filter(*complaint_filter)
+        .one()
+    )
+
+    capas_total, capas_open, capas_closed = (
+        db.query(
+            func.count(models.CAPA.id),
+            func.count().filter(_CAPA_OPEN),
+            func.count().filter(models.CAPA.status_norm == "closed"),
+        )
+        .filter(*capa_filter)
+        .one()
+    )
+
+    equipment_total, equipment_due = (
+        db.query(
+            func.count(models.Equipment.id),
+            func.count().filter(models.Equipment.result == "Fail"),
+        )
+        .filter(*equipment_filter)
+        .one()
+    )
+
+    stats = {
+        "total_batches": total_batches,
+        "avg_hardness": round(avg_hardness or 0, 2),
+        "avg_yield": round(avg_yield or 0, 2),
+        "machines": {},
+        "qc_pass_rate": (
+            round(qc_pass_count / qc_total * 100, 1) if qc_total else 0
+        ),
+        "qc_total": qc_total,
+        "qc_failed": qc_total - qc_pass_count,
+        "complaints_by_category": _grouped_counts(
+            db, _label_or(models.Complaint.category, "Unknown"), *complaint_filter
+        ),
+        "complaints_total": complaints_total,
+        "complaints_open": complaints_open,
+        "complaints_closed": complaints_closed,
+        "capas_total": capas_total,
+        "capas_open": capas_open,
+        "capas_closed": capas_closed,
+        "equipment_due": equipment_due,
+        "equipment_total": equipment_total,
+    }
+
+    machine = _label_or(models.Batch.tablet_press_id, "Unknown")
+    per_machine = (
+        db.query(
+            machine,
+            func.count(models.Batch.id),
+            func.coalesce(func.sum(models.Batch.hardness), 0),
+            func.coalesce(func.sum(models.Batch.yield_percent), 0),
+        )
+        .filter(*batch_filter)
+        .group_by(machine)
+        .order_by(machine)
+        .all()
+    )
+    for name, count, hardness_sum, yield_sum in per_machine:
+        stats["machines"][name] = {
+            "count": count,
+            "hardness_sum": hardness_sum,
+            "yield_sum": yield_sum,
+            "avg_hardness": round(hardness_sum / count, 2),
+            "avg_yield": round(yield_sum / count, 2),
         }
-    except Exception as e:
+
+    return stats
+
+
+def _full_stats_in_new_session(start_date: datetime = None, end_date: datetime = None) -> dict:
+    db = SessionLocal()
+    try:
+        return get_full_stats(db, start_date, end_date)
+    finally:
+        db.close()
+
+
+def _compressed_data_context(db: Session, start_date: datetime = None, end_date: datetime = None) -> str:
+    return compress_context(get_data_context(db, start_date, end_date))
+
+
+async def _context_and_stats(db: Session, start_date: datetime = None, end_date: datetime = None):
+    """Build the data context and the stats concurrently in the threadpool
+
+    A Session is not thread-safe, so the stats query runs on its own session.
+    """
+    return await asyncio.gather(
+        run_in_threadpool(_compressed_data_context, db, start_date, end_date),
+        run_in_threadpool(_full_stats_in_new_session, start_date, end_date),
+    )
+
+
+# Server-sent event framing, pre-encoded; each event is one JSON object
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_DONE = _SSE_PREFIX + orjson.dumps({"done": True}) + _SSE_SUFFIX
+
+
+async def generate_summary_stream(db: Session):
+    context, stats = await _context_and_stats(db)
+    prompt = _SUMMARY_PROMPT.substitute(stats, context=context)
+
+    try:
+        # Retries only cover opening the stream; chunks already sent can't be replayed
+        response = await get_model(LITE_MODEL, SYSTEM_PROMPT).generate_content_async(
+            prompt, stream=True, request_options=request_options()
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield _SSE_PREFIX + orjson.dumps({"text": chunk.text}) + _SSE_SUFFIX
+        yield _SSE_DONE
+    except gemini_errors() as e:
+        yield _SSE_PREFIX + orjson.dumps({"error": str(e)}) + _SSE_SUFFIX
+
+
+async def generate_report(db: Session, start_date: datetime = None, end_date: datetime = None, title: str = None) -> dict:
+    """Generate APR report with optional date filtering and return both report and metadata"""
+    context, stats = await _context_and_stats(db, start_date, end_date)
+
+    # Build period string for the report
+    if start_date and end_date:
+        period_str = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
+        year_str = f"{start_date.year}" if start_date.year == end_date.year else f"{start_date.year}-{end_date.year}"
+        doc_id = f"APR-PARA-500mg-{start_date.year}-{end_date.year}-V1.0"
+    else:
+        period_str = "January 1, 2025 to January 31, 2026"
+        year_str = "2025"
+        doc_id = "APR-PARA-500mg-2025-2026-V1.0"
+
+    current_date = datetime.now().strftime("%B %d, %Y")
+    
+    prompt = _REPORT_PROMPT.substitute(
+        stats,
+        context=context,
+        doc_id=doc_id,
+        period_str=period_str,
+        current_date=current_date,
+        complaints_count=stats["complaints_open"] + stats.get("complaints_closed", 0),
+        capas_count=stats["capas_open"] + stats.get("capas_closed", 0),
+    )
+
+    try:
+        # The APR report prompt carries its own persona, so no system instruction
+        response = await get_model(FULL_MODEL).generate_content_async(
+            prompt, request_options=request_options()
+        )
+        report_content = response.text
+    except gemini_errors() as e:
         return {"report": f"Error generating report: {str(e)}", "metadata": None}
+    
+    # Return both report and metadata
+    return {
+        "report": report_content,
+        "metadata": {
+            "title": title or f"APR Report - Paracetamol 500mg - {year_str}",
+            "period_start": start_date.isoformat() if start_date else None,
+            "period_end": end_date.isoformat() if end_date else None,
+            "stats": stats,
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
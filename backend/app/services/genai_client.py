@@ -0,0 +1,72 @@
+"""
+NYOS Gemini Client
+
+google.generativeai (with grpc and protobuf) takes most of a second to
+import, so it is only loaded and configured the first time a model is
+needed. Model handles and the retry policy are built once and shared.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Optional
+from app.config import GOOGLE_API_KEY
+
+LITE_MODEL = "gemini-2.5-flash-lite"
+FULL_MODEL = "gemini-2.5-flash"
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """The configured google.generativeai module, imported on first use"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=GOOGLE_API_KEY)
+                _genai = genai
+    return _genai
+
+
+@lru_cache(maxsize=None)
+def get_model(name: str, system_instruction: Optional[str] = None):
+    """Shared GenerativeModel handle per (model name, system instruction)"""
+    return get_genai().GenerativeModel(name, system_instruction=system_instruction)
+
+
+@lru_cache(maxsize=1)
+def request_options() -> dict:
+    """Retry transient failures (overload, rate limiting, timeouts) with
+    exponential backoff; auth and invalid-request errors fail fast"""
+    from google.api_core import exceptions
+    from google.api_core.retry import if_exception_type
+    from google.api_core.retry_async import AsyncRetry
+
+    transient = (
+        exceptions.ServiceUnavailable,
+        exceptions.DeadlineExceeded,
+        exceptions.TooManyRequests,
+        exceptions.InternalServerError,
+    )
+    return {
+        "retry": AsyncRetry(
+            predicate=if_exception_type(*transient),
+            initial=0.5,
+            multiplier=2,
+            maximum=4,
+            timeout=60,
+        )
+    }
+
+
+@lru_cache(maxsize=1)
+def gemini_errors() -> tuple:
+    """Errors reported back to the user; anything else (e.g. a bug in the
+    context or stats builders) propagates instead of being rendered as text"""
+    from google.api_core.exceptions import GoogleAPIError
+    from google.auth.exceptions import GoogleAuthError
+
+    return (GoogleAPIError, GoogleAuthError, ValueError)
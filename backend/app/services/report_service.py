@@ -10,11 +10,10 @@ The architecture allows incremental report building:
 Upload File → FileReport → MonthlyReport → APRReport
 """
 
-import google.generativeai as genai
-from app.config import GOOGLE_API_KEY
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from app import models
+from app.services.genai_client import FULL_MODEL, LITE_MODEL, get_model
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import json
@@ -22,8 +21,6 @@ import pandas as pd
 import io
 from enum import Enum
 
-genai.configure(api_key=GOOGLE_API_KEY)
-
 
 class ReportStatus(str, Enum):
     PENDING = "pending"
@@ -324,7 +321,7 @@ async def generate_file_report(
         db.refresh(file_report)
         
         # Generate AI summary
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
+        model = get_model(LITE_MODEL)
         
         prompt = f"""You are a pharmaceutical quality expert analyzing data from a {data_type} file.
 
@@ -453,7 +450,7 @@ async def generate_monthly_report(
     db.refresh(monthly_report)
     
     # Generate comprehensive monthly analysis using AI
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    model = get_model(FULL_MODEL)
     month_names = ["January", "February", "March", "April", "May", "June", 
                    "July", "August", "September", "October", "November", "December"]
     month_name = month_names[month - 1]
@@ -747,33 +744,33 @@ async def generate_apr_report(
         # Stability data from batches (no separate StabilityResult model)
         db_stability = []  # Stability data not available in current schema
     
-    total_batches = db.query(models.Batch).filter(
+    total_batches = db.query(func.count(models.Batch.id)).filter(
         and_(models.Batch.manufacturing_date >= start_date, models.Batch.manufacturing_date <= end_date)
-    ).count()
+    ).scalar()
     
-    total_complaints = db.query(models.Complaint).filter(
+    total_complaints = db.query(func.count(models.Complaint.id)).filter(
         and_(models.Complaint.complaint_date >= start_date, models.Complaint.complaint_date <= end_date)
-    ).count()
+    ).scalar()
     
-    total_capas = db.query(models.CAPA).filter(
+    total_capas = db.query(func.count(models.CAPA.id)).filter(
         and_(models.CAPA.open_date >= start_date, models.CAPA.open_date <= end_date)
-    ).count()
+    ).scalar()
     
     avg_yield = db.query(func.avg(models.Batch.yield_percent)).filter(
         and_(models.Batch.manufacturing_date >= start_date, models.Batch.manufacturing_date <= end_date)
     ).scalar() or 0
     
-    qc_total = db.query(models.QCResult).filter(
+    qc_total = db.query(func.count(models.QCResult.id)).filter(
         and_(models.QCResult.test_date >= start_date, models.QCResult.test_date <= end_date)
-    ).count()
+    ).scalar()
     
-    qc_pass = db.query(models.QCResult).filter(
+    qc_pass = db.query(func.count(models.QCResult.id)).filter(
         and_(
             models.QCResult.test_date >= start_date,
             models.QCResult.test_date <= end_date,
             models.QCResult.overall_result == "Pass"
         )
-    ).count()
+    ).scalar()
     
     qc_pass_rate = (qc_pass / qc_total * 100) if qc_total > 0 else 0
     
@@ -805,7 +802,7 @@ async def generate_apr_report(
                        "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
         monthly_summaries.append(f"**{month_names[mr.month-1]}**: {mr.executive_summary[:300] if mr.executive_summary else 'No data'}")
     
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    model = get_model(FULL_MODEL)
     
     # Build data context based on source
     if direct_from_db:
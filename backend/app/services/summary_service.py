@@ -0,0 +1,343 @@
+"""
+NYOS Dashboard Summary Tables
+
+The dashboard endpoints aggregate over the full history tables, which only
+change when data is imported. The rollups are stored in the mv_* tables and
+refreshed after every import (and periodically when the source tables
+changed behind this process's back), so the analytics read path is a
+handful of small SELECTs.
+"""
+
+import asyncio
+import json
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, extract, and_, select
+from starlette.concurrency import run_in_threadpool
+from app.db import SessionLocal
+from app import models, analytics_cache
+from app.services.gemini_service import compute_full_stats, bust_context_cache
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 300
+
+# Tables the summaries are computed from
+SOURCE_MODELS = (
+    models.Batch,
+    models.QCResult,
+    models.Complaint,
+    models.CAPA,
+    models.Equipment,
+    models.RawMaterial,
+)
+
+# Source fingerprint the mv_* tables were last computed from in this process
+_refreshed_fingerprint = None
+
+
+def calculate_quality_score(
+    qc_pass_rate, avg_yield, open_complaints, open_capas, failed_calibrations
+):
+    """Calculate overall quality score 0-100
+
+    Weights optimized for pharmaceutical manufacturing:
+    - QC pass rate: most important (40%)
+    - Yield: important for efficiency (25%)
+    - Complaints/CAPAs: normalized for long-term data (20%)
+    - Equipment calibration: safety critical (15%)
+    """
+    score = 100
+
+    # QC pass rate impact (max -40) - most critical
+    if qc_pass_rate < 100:
+        score -= (100 - qc_pass_rate) * 4  # 4 points per %
+
+    # Yield impact (max -25)
+    if avg_yield < 98:
+        score -= (98 - avg_yield) * 5  # 5 points per % below 98
+
+    # Open complaints impact (max -10) - scaled for realistic numbers
+    # Typical pharma: <10 open complaints is good, >50 is concerning
+    complaint_penalty = min(open_complaints / 5, 10)
+    score -= complaint_penalty
+
+    # Open CAPAs impact (max -10) - scaled for realistic numbers
+    # Having some CAPAs open is normal; >100 is concerning
+    capa_penalty = min(open_capas / 25, 10)
+    score -= capa_penalty
+
+    # Failed calibrations impact (max -15)
+    score -= min(failed_calibrations, 15)
+
+    return max(0, min(100, round(score, 1)))
+
+
+def _compute_global_kpis(db: Session, refreshed_at: datetime) -> models.GlobalKPIs:
+    """Dashboard counters, one aggregate query per source table"""
+
+    # Date range first: the recent-month bucket is relative to the latest batch
+    min_date, max_date = db.query(
+        func.min(models.Batch.manufacturing_date),
+        func.max(models.Batch.manufacturing_date),
+    ).one()
+
+    kpis = models.GlobalKPIs(
+        id=1, min_date=min_date, max_date=max_date, refreshed_at=refreshed_at
+    )
+    if not max_date:
+        return kpis
+
+    month_ago = max_date - timedelta(days=30)
+    is_recent = models.Batch.manufacturing_date >= month_ago
+
+    # Production - one pass over batches (global + recent month stats)
+    (
+        kpis.total_batches,
+        kpis.avg_yield,
+        kpis.min_yield,
+        kpis.max_yield,
+        kpis.recent_batches,
+        kpis.recent_yield,
+    ) = db.query(
+        func.count(models.Batch.id),
+        func.avg(models.Batch.yield_percent),
+        func.min(models.Batch.yield_percent),
+        func.max(models.Batch.yield_percent),
+        func.sum(case((is_recent, 1), else_=0)),
+        func.avg(case((is_recent, models.Batch.yield_percent))),
+    ).one()
+
+    # Quality metrics - use actual specs not overall_result field
+    # Pharma specs: Assay 95-105%, Dissolution >80%
+    kpis.total_qc, kpis.qc_pass_count = db.query(
+        func.count(models.QCResult.id),
+        func.sum(
+            case(
+                (
+                    and_(
+                        models.QCResult.assay_percent >= 95,
+                        models.QCResult.assay_percent <= 105,
+                        models.QCResult.dissolution_mean >= 80,
+                    ),
+                    1,
+                ),
+                else_=0,
+            )
+        ),
+    ).one()
+
+    # Complaints - totals, open and critical in one pass
+    (
+        kpis.total_complaints,
+        kpis.open_complaints,
+        kpis.critical_complaints,
+    ) = db.query(
+        func.count(models.Complaint.id),
+        func.sum(case((models.Complaint.status_norm == "open", 1), else_=0)),
+        func.sum(case((models.Complaint.severity_norm == "critical", 1), else_=0)),
+    ).one()
+
+    # CAPAs - count all non-closed as open
+    kpis.total_capas, kpis.open_capas, kpis.overdue_capas = db.query(
+        func.count(models.CAPA.id),
+        func.sum(case((models.CAPA.status_norm != "closed", 1), else_=0)),
+        func.sum(case((models.CAPA.status_norm == "overdue", 1), else_=0)),
+    ).one()
+
+    # Equipment
+    kpis.total_calibrations, kpis.failed_calibrations = db.query(
+        func.count(models.Equipment.id),
+        func.sum(case((models.Equipment.result == "Fail", 1), else_=0)),
+    ).one()
+
+    total_qc = kpis.total_qc or 0
+    qc_pass_rate = ((kpis.qc_pass_count or 0) / total_qc * 100) if total_qc > 0 else 0
+    kpis.quality_score = calculate_quality_score(
+        qc_pass_rate,
+        kpis.avg_yield or 0,
+        kpis.open_complaints or 0,
+        kpis.open_capas or 0,
+        kpis.failed_calibrations or 0,
+    )
+
+    return kpis
+
+
+def _compute_yearly_stats(db: Session, refreshed_at: datetime) -> list:
+    batches = (
+        db.query(
+            extract("year", models.Batch.manufacturing_date).label("year"),
+            func.count(models.Batch.id).label("batch_count"),
+            func.avg(models.Batch.yield_percent).label("avg_yield"),
+            func.avg(models.Batch.hardness).label("avg_hardness"),
+        )
+        .group_by(extract("year", models.Batch.manufacturing_date))
+        .all()
+    )
+
+    complaints_by_year = (
+        db.query(
+            extract("year", models.Complaint.complaint_date).label("year"),
+            func.count(models.Complaint.id).label("count"),
+        )
+        .group_by(extract("year", models.Complaint.complaint_date))
+        .all()
+    )
+
+    complaints_dict = {int(c.year): c.count for c in complaints_by_year if c.year}
+
+    return [
+        models.YearlyBatchStats(
+            year=int(b.year),
+            batch_count=b.batch_count,
+            avg_yield=b.avg_yield,
+            avg_hardness=b.avg_hardness,
+            complaints=complaints_dict.get(int(b.year), 0),
+            refreshed_at=refreshed_at,
+        )
+        for b in batches
+        if b.year
+    ]
+
+
+def _compute_supplier_stats(db: Session, refreshed_at: datetime) -> list:
+    suppliers = (
+        db.query(
+            models.RawMaterial.supplier_id,
+            models.RawMaterial.supplier_name,
+            func.count(models.RawMaterial.id).label("deliveries"),
+            func.sum(
+                case((models.RawMaterial.disposition.like("Released%"), 1), else_=0)
+            ).label("approved"),
+            func.sum(
+                case((models.RawMaterial.disposition == "Rejected", 1), else_=0)
+            ).label("rejected"),
+            func.sum(
+                case((models.RawMaterial.disposition.like("Pending%"), 1), else_=0)
+            ).label("pending"),
+        )
+        .group_by(models.RawMaterial.supplier_id, models.RawMaterial.supplier_name)
+        .all()
+    )
+
+    return [
+        models.SupplierStats(
+            supplier_id=s.supplier_id,
+            supplier_name=s.supplier_name,
+            deliveries=s.deliveries,
+            approved=s.approved,
+            rejected=s.rejected,
+            pending=s.pending,
+            refreshed_at=refreshed_at,
+        )
+        for s in suppliers
+    ]
+
+
+def _compute_press_stats(db: Session, refreshed_at: datetime) -> list:
+    # SQLite has no STDDEV: collect the raw hardness moments in the same
+    # grouped pass (COUNT/SUM ignore NULL hardness values)
+    presses = (
+        db.query(
+            models.Batch.tablet_press_id,
+            func.count(models.Batch.id).label("batch_count"),
+            func.avg(models.Batch.yield_percent).label("avg_yield"),
+            func.avg(models.Batch.hardness).label("avg_hardness"),
+            func.count(models.Batch.hardness).label("hardness_n"),
+            func.sum(models.Batch.hardness).label("hardness_sum"),
+            func.sum(models.Batch.hardness * models.Batch.hardness).label(
+                "hardness_sq_sum"
+            ),
+        )
+        .group_by(models.Batch.tablet_press_id)
+        .all()
+    )
+
+    return [
+        models.PressStats(
+            tablet_press_id=p.tablet_press_id,
+            batches=p.batch_count,
+            avg_yield=p.avg_yield,
+            avg_hardness=p.avg_hardness,
+            hardness_n=p.hardness_n,
+            hardness_sum=p.hardness_sum or 0,
+            hardness_sq_sum=p.hardness_sq_sum or 0,
+            refreshed_at=refreshed_at,
+        )
+        for p in presses
+        if p.tablet_press_id
+    ]
+
+
+def _source_fingerprint(db: Session) -> tuple:
+    """One-round-trip signature (row count, max id) of every source table"""
+    columns = []
+    for model in SOURCE_MODELS:
+        columns.append(select(func.count(model.id)).scalar_subquery())
+        columns.append(select(func.max(model.id)).scalar_subquery())
+    return tuple(db.execute(select(*columns)).one())
+
+
+def refresh_summary_tables(db: Session) -> datetime:
+    """Recompute every mv_* table in a single transaction"""
+    global _refreshed_fingerprint
+    refreshed_at = datetime.utcnow()
+    fingerprint = _source_fingerprint(db)
+
+    kpis = _compute_global_kpis(db, refreshed_at)
+    yearly = _compute_yearly_stats(db, refreshed_at)
+    suppliers = _compute_supplier_stats(db, refreshed_at)
+    presses = _compute_press_stats(db, refreshed_at)
+    full_stats = models.FullStats(
+        payload=json.dumps(compute_full_stats(db)), refreshed_at=refreshed_at
+    )
+
+    for model in (
+        models.GlobalKPIs,
+        models.YearlyBatchStats,
+        models.SupplierStats,
+        models.PressStats,
+        models.FullStats,
+    ):
+        db.query(model).delete()
+
+    db.add_all([kpis, full_stats])
+    db.add_all(yearly + suppliers + presses)
+    db.commit()
+    _refreshed_fingerprint = fingerprint
+
+    return refreshed_at
+
+
+def _refresh_with_new_session(force: bool = True):
+    """Refresh the mv_* tables and invalidate the caches built on them
+
+    With force=False nothing happens unless the source tables changed since
+    this process last refreshed (e.g. data imported by another worker).
+    """
+    db = SessionLocal()
+    try:
+        if not force and _source_fingerprint(db) == _refreshed_fingerprint:
+            return
+        refresh_summary_tables(db)
+    finally:
+        db.close()
+    analytics_cache.bump()
+    bust_context_cache()
+
+
+async def run_summary_refresh_loop(interval: int = REFRESH_INTERVAL_SECONDS):
+    """Periodic safety net for data landing outside this process's upload endpoint"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_refresh_with_new_session, False)
+        except Exception:
+            logger.exception("Error refreshing summary tables")
+
+
+async def refresh_summary_tables_async():
+    """Refresh from an async context without blocking the event loop"""
+    await run_in_threadpool(_refresh_with_new_session)
@@ -0,0 +1,7 @@
+#!/bin/sh
+# Apply pending schema migrations, then start the API
+set -e
+
+alembic upgrade head
+
+exec uvicorn app.main:app --host "${HOST:-0.0.0.0}" --port "${PORT:-8080}"
@@ -0,0 +1,58 @@
+"""normalized status columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 22:44:05.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('capas', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status_norm', sa.String(length=20), nullable=True))
+
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status_norm', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('severity_norm', sa.String(length=20), nullable=True))
+
+    # Backfill rows imported before the columns existed; mirrors the
+    # models' @validates hooks (every "Closed - ..." CAPA collapses to "closed")
+    op.execute(
+        "UPDATE complaints SET status_norm = lower(trim(status)), "
+        "severity_norm = lower(trim(severity))"
+    )
+    op.execute(
+        "UPDATE capas SET status_norm = CASE "
+        "WHEN lower(status) LIKE '%closed%' THEN 'closed' "
+        "ELSE lower(trim(status)) END"
+    )
+
+    with op.batch_alter_table('capas', schema=None) as batch_op:
+        batch_op.create_index('ix_capa_status', ['status_norm'], unique=False)
+
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_complaints_severity_norm'), ['severity_norm'], unique=False)
+        batch_op.create_index(batch_op.f('ix_complaints_status_norm'), ['status_norm'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_complaints_status_norm'))
+        batch_op.drop_index(batch_op.f('ix_complaints_severity_norm'))
+        batch_op.drop_column('severity_norm')
+        batch_op.drop_column('status_norm')
+
+    with op.batch_alter_table('capas', schema=None) as batch_op:
+        batch_op.drop_index('ix_capa_status')
+        batch_op.drop_column('status_norm')
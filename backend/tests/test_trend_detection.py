@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from app.services.gemini_service import CUSUM_FALSE_ALARM, _detect_drift
+
+BATCHES_PER_DAY = 20
+
+
+def _series(rng, days, shift=0.0, shift_from=None):
+    """Per-batch readings with batch-to-batch noise, a level per day, optional step"""
+    dates = pd.date_range("2025-01-01", periods=days).strftime("%Y-%m-%d")
+    levels = 120 + rng.normal(0, 2, days)
+    if shift_from is not None:
+        levels[shift_from:] += shift
+    values = np.repeat(levels, BATCHES_PER_DAY) + rng.normal(
+        0, 10, days * BATCHES_PER_DAY
+    )
+    return values, list(np.repeat(dates, BATCHES_PER_DAY))
+
+
+def test_stationary_noise_does_not_alarm():
+    rng = np.random.default_rng(0)
+    for days in (30, 90, 365, 2190):
+        alerts = [_detect_drift(*_series(rng, days))[1] for _ in range(200)]
+        assert np.mean(alerts) <= 3 * CUSUM_FALSE_ALARM, days
+
+
+def test_stationary_noise_keeps_direction_stable():
+    rng = np.random.default_rng(1)
+    trend, _, drift_index = _detect_drift(*_series(rng, 365))
+    assert trend == "stable"
+    assert drift_index is None
+
+
+def test_step_shift_alarms_near_its_start():
+    rng = np.random.default_rng(2)
+    values, dates = _series(rng, 180, shift=4.0, shift_from=120)
+    trend, alert, drift_index = _detect_drift(values, dates)
+    assert alert
+    assert trend == "stable"  # +3% stays under the rolling-mean threshold
+    lag = pd.Timestamp(dates[drift_index]) - pd.Timestamp(dates[120 * BATCHES_PER_DAY])
+    assert abs(lag) <= pd.Timedelta(days=5)
@@ -23,7 +23,7 @@ Date: January 2026
 import subprocess
 import sys
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -42,20 +42,59 @@ THEMES = {
     "release": ["batch_release"],
 }
 
-# Generator scripts in order of execution (dependencies matter!)
-GENERATORS = [
-    "generate_comprehensive_apr_data.py",  # Manufacturing - must be first
-    "generate_qc_data.py",  # QC data - depends on manufacturing
-    "generate_stability_data.py",  # Stability
-    "generate_environmental_data.py",  # Environmental
-    "generate_complaints_data.py",  # Complaints - depends on manufacturing
-    "generate_capa_data.py",  # CAPAs - depends on complaints
-    "generate_raw_materials_data.py",  # Raw materials
-    "generate_equipment_data.py",  # Equipment
-    "generate_batch_release_data.py",  # Batch release - depends on manufacturing & QC
-    "generate_master_summary.py",  # Summary and KPIs - depends on all
-]
+# Generator scripts and the generators whose output they need (dependencies matter!)
+GENERATORS = {
+    "generate_comprehensive_apr_data.py": [],  # Manufacturing - must be first
+    "generate_qc_data.py": [  # QC data - depends on manufacturing
+        "generate_comprehensive_apr_data.py",
+    ],
+    "generate_stability_data.py": [  # Stability - samples manufactured batches
+        "generate_comprehensive_apr_data.py",
+    ],
+    "generate_environmental_data.py": [],  # Environmental
+    "generate_complaints_data.py": [  # Complaints - depends on manufacturing
+        "generate_comprehensive_apr_data.py",
+    ],
+    "generate_capa_data.py": [  # CAPAs - depends on complaints
+        "generate_complaints_data.py",
+    ],
+    "generate_raw_materials_data.py": [],  # Raw materials
+    "generate_equipment_data.py": [],  # Equipment
+    "generate_batch_release_data.py": [  # Batch release - depends on manufacturing & QC
+        "generate_comprehensive_apr_data.py",
+        "generate_qc_data.py",
+    ],
+    "generate_master_summary.py": [  # Summary and KPIs - depends on all
+        "generate_qc_data.py",
+        "generate_stability_data.py",
+        "generate_environmental_data.py",
+        "generate_capa_data.py",
+        "generate_raw_materials_data.py",
+        "generate_equipment_data.py",
+        "generate_batch_release_data.py",
+    ],
+}
+
+# Per-script stdout/stderr, so parallel generators don't interleave output
+LOG_DIR = APR_DATA_DIR / "logs"
+
+
+def dependency_layers(generators: dict) -> list:
+    """Group generators into layers whose members only depend on earlier layers."""
+    remaining = {script: set(deps) for script, deps in generators.items()}
+    done = set()
+    layers = []
+
+    while remaining:
+        layer = [script for script, deps in remaining.items() if deps <= done]
+        if not layer:
+            raise ValueError(f"Circular generator dependencies: {sorted(remaining)}")
+        layers.append(layer)
+        done.update(layer)
+        for script in layer:
+            del remaining[script]
 
+    return layers
 
 
 def create_directory_structure():
@@ -73,29 +112,30 @@ def create_directory_structure():
 
 
 def run_generator(script_name: str) -> bool:
-    """Run a single generator script."""
+    """Run a single generator script, logging its output to LOG_DIR."""
     script_path = SCRIPT_DIR / script_name
 
     if not script_path.exists():
         print(f"     Script not found: {script_name}")
         return False
 
-    print(f"\n Running: {script_name}")
-    print("-" * 50)
+    log_path = LOG_DIR / f"{script_path.stem}.log"
 
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            cwd=str(SCRIPT_DIR),
-            capture_output=False,
-            text=True,
-        )
+        with open(log_path, "w") as log:
+            result = subprocess.run(
+                [sys.executable, str(script_path)],
+                cwd=str(SCRIPT_DIR),
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
 
         if result.returncode == 0:
             print(f"    {script_name} completed successfully")
             return True
         else:
-            print(f"    {script_name} failed with code {result.returncode}")
+            print(f"    {script_name} failed with code {result.returncode} (see {log_path})")
             return False
 
     except Exception as e:
@@ -108,17 +148,25 @@ def organize_files_by_theme():
     print("\n📦 Organizing files by theme...")
 
     moved_count = 0
-
-    for theme, prefixes in THEMES.items():
-        theme_dir = APR_DATA_DIR / theme
-
-        for prefix in prefixes:
-            for csv_file in APR_DATA_DIR.glob(f"{prefix}*.csv"):
-                if csv_file.parent == APR_DATA_DIR:  
-                    dest = theme_dir / csv_file.name
-                    shutil.move(str(csv_file), str(dest))
-                    moved_count += 1
-                    print(f"   {csv_file.name} → {theme}/")
+    prefix_to_theme = {
+        prefix: theme for theme, prefixes in THEMES.items() for prefix in prefixes
+    }
+
+    # One directory read; files stay on the same filesystem, so a rename suffices
+    with os.scandir(APR_DATA_DIR) as entries:
+        data_files = [
+            e for e in entries if e.is_file() and e.name.endswith((".csv", ".parquet"))
+        ]
+
+    for entry in data_files:
+        theme = next(
+            (t for prefix, t in prefix_to_theme.items() if entry.name.startswith(prefix)),
+            None,
+        )
+        if theme:
+            os.replace(entry.path, os.path.join(APR_DATA_DIR, theme, entry.name))
+            moved_count += 1
+            print(f"   {entry.name} → {theme}/")
 
     summary_files = ["_apr_kpis.csv", "_data_index.csv", "_hidden_scenarios.csv"]
     for sf in summary_files:
@@ -136,11 +184,16 @@ def main():
     create_directory_structure()
 
     print("\n Starting data generation...")
+    LOG_DIR.mkdir(exist_ok=True)
     success_count = 0
 
-    for script in GENERATORS:
-        if run_generator(script):
-            success_count += 1
+    # Generators in a layer are independent subprocesses: run them side by
+    # side so wall time follows the critical path, not the sum of all scripts
+    for i, layer in enumerate(dependency_layers(GENERATORS), start=1):
+        print(f"\n Layer {i}: {', '.join(layer)}")
+        print("-" * 50)
+        with ThreadPoolExecutor(max_workers=len(layer)) as executor:
+            success_count += sum(executor.map(run_generator, layer))
 
     print(f"\n Completed {success_count}/{len(GENERATORS)} generators")
 
@@ -6,15 +6,18 @@ QP release decisions, batch review checklist, disposition tracking.
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
+import pyarrow.parquet as pq
 import os
 
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from generator_common import (
+    year_rng,
+    category_dtypes,
+    random_days,
+    date_strings,
+    numbered,
+    map_years,
+    write_combined_parquet,
+)
 
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
 OUTPUT_DIR = (
@@ -31,25 +34,67 @@ QP_NAMES = {
     "QP-005": "Dr. Lisa Martinez",
 }
 
-RELEASE_CHECKLISTS = [
-    "Batch record review complete",
-    "All IPC results within specification",
-    "QC testing complete and approved",
-    "Deviation review complete",
-    "Change control review complete",
-    "Environmental monitoring acceptable",
-    "Equipment calibration verified",
-    "Raw material documentation verified",
-    "Stability protocol assigned",
-    "Label reconciliation complete",
-    "Yield within acceptable limits",
-    "Packaging integrity verified",
+# Checklist item -> output column
+RELEASE_CHECKLISTS = {
+    "Batch record review complete": "checklist_batch_record",
+    "All IPC results within specification": "checklist_ipc",
+    "QC testing complete and approved": "checklist_qc_complete",
+    "Deviation review complete": "checklist_deviation",
+    "Change control review complete": "checklist_change_control",
+    "Environmental monitoring acceptable": "checklist_environmental",
+    "Equipment calibration verified": "checklist_calibration",
+    "Raw material documentation verified": "checklist_raw_materials",
+    "Stability protocol assigned": "checklist_stability",
+    "Label reconciliation complete": "checklist_label",
+    "Yield within acceptable limits": "checklist_yield",
+    "Packaging integrity verified": "checklist_packaging",
+}
+
+# Manufacturing columns used here; the yield and batch size fall back to
+# defaults when a file doesn't carry them
+MFG_DTYPES = {
+    "batch_id": str,
+    "actual_yield_pct": "float64",
+    "batch_size_kg": "float64",
+}
+
+# Checklist answers; rejected batches get a random pick of the first three
+CHECKLIST_ANSWERS = ["Yes", "No", "N/A", "Pending"]
+YES, PENDING = 0, 3
+
+MARKETS = np.array(["Domestic", "Export - EU", "Export - US", "Export - RoW"])
+MARKET_WEIGHTS = [0.5, 0.2, 0.2, 0.1]
+# Upper bounds of each market's share of [0, 1), for picking from a uniform
+MARKET_THRESHOLDS = np.cumsum(MARKET_WEIGHTS)[:-1]
+REGULATED_MARKETS = ["Export - EU", "Export - US"]
+
+DEVIATION_CLASSES = np.array(["Major", "Minor"])
+STABILITY_STATIONS = np.array(["Long-term", "Accelerated", "Both"])
+WAREHOUSE_AREAS = np.array(["FG-A-", "FG-B-", "FG-C-"])
+
+CATEGORY_COLUMNS = [
+    "product_code",
+    "product_name",
+    "qp_id",
+    "qp_name",
+    "disposition",
+    "market_destination",
+    "regulatory_clearance",
+    "clearance_status",
+    "stability_station",
+    *RELEASE_CHECKLISTS.values(),
 ]
 
 
+def _column(df: pd.DataFrame, name: str, default: float) -> pd.Series:
+    """Column of df, or a constant series when the file doesn't have it"""
+    return df[name] if name in df else pd.Series(default, index=df.index)
+
+
 def generate_batch_release_data(year: int):
     """Generate batch release and disposition records."""
     print(f"\n📋 Generating Batch Release Data for {year}...")
+    rng = year_rng(year)
 
     # Load manufacturing data to get batch info
     mfg_file = f"{OUTPUT_DIR}manufacturing_extended_{year}.csv"
@@ -57,219 +102,161 @@ def generate_batch_release_data(year: int):
         print(f"   ⚠️  Manufacturing file not found")
         return None
 
-    mfg_df = pd.read_csv(mfg_file)
-
-    # Load QC data for test results
-    qc_file = f"{OUTPUT_DIR}qc_extended_{year}.csv"
-    qc_df = pd.read_csv(qc_file) if os.path.exists(qc_file) else None
-
-    records = []
-
-    for _, batch in mfg_df.iterrows():
-        batch_id = batch["batch_id"]
-        mfg_date = datetime.strptime(batch["manufacturing_date"], "%Y-%m-%d")
-
-        # Batch review initiation
-        review_start = mfg_date + timedelta(days=random.randint(1, 3))
-
-        # QC testing duration
-        qc_complete_date = review_start + timedelta(days=random.randint(5, 14))
-
-        # Batch review duration
-        batch_review_complete = qc_complete_date + timedelta(days=random.randint(1, 3))
-
-        # QP review and release
-        qp_review_date = batch_review_complete + timedelta(days=random.randint(1, 2))
-
-        # Determine disposition based on various factors
-        yield_value = batch.get("actual_yield_pct", 98.0)
-
-        # Check for deviations (simulated)
-        has_deviation = random.random() < 0.08
-        deviation_critical = random.random() < 0.1 if has_deviation else False
-
-        # Check for OOS (simulated from QC data)
-        has_oos = random.random() < 0.03
-
-        # Determine hold reasons
-        hold_reasons = []
-        if has_deviation:
-            hold_reasons.append("Deviation pending closure")
-        if has_oos:
-            hold_reasons.append("OOS investigation pending")
-        if yield_value < 95:
-            hold_reasons.append("Low yield investigation")
-
-        # Disposition decision
-        if deviation_critical or (has_oos and random.random() > 0.7):
-            disposition = "Rejected"
-            release_date = None
-            days_to_release = None
-        elif hold_reasons:
-            if random.random() > 0.3:
-                disposition = "Released"
-                release_date = qp_review_date + timedelta(days=random.randint(1, 14))
-                days_to_release = (release_date - mfg_date).days
-            else:
-                disposition = "On Hold"
-                release_date = None
-                days_to_release = None
-        else:
-            disposition = "Released"
-            release_date = qp_review_date
-            days_to_release = (release_date - mfg_date).days
-
-        # Assigned QP
-        qp_id = random.choice(QUALIFIED_PERSONS)
-
-        # Checklist completion
-        checklist_items = {}
-        for item in RELEASE_CHECKLISTS:
-            if disposition == "Released":
-                checklist_items[item] = "Yes"
-            elif disposition == "On Hold":
-                if "Deviation" in item or "OOS" in str(hold_reasons):
-                    checklist_items[item] = "Pending"
-                else:
-                    checklist_items[item] = "Yes"
-            else:
-                checklist_items[item] = random.choice(["Yes", "No", "N/A"])
-
-        # Expiry date calculation (3 years from manufacture)
-        expiry_date = mfg_date + timedelta(days=365 * 3)
-
-        # Market destination
-        markets = ["Domestic", "Export - EU", "Export - US", "Export - RoW"]
-        market_weights = [0.5, 0.2, 0.2, 0.1]
-        market_destination = random.choices(markets, weights=market_weights)[0]
-
-        # Regulatory submission status
-        if market_destination in ["Export - EU", "Export - US"]:
-            regulatory_clearance = "Required"
-            clearance_status = "Approved" if disposition == "Released" else "Pending"
-        else:
-            regulatory_clearance = "Not Required"
-            clearance_status = "N/A"
-
-        records.append(
-            {
-                "batch_id": batch_id,
-                "product_code": "PARA-500-TAB",
-                "product_name": "Paracetamol 500mg Tablets",
-                "batch_size_kg": batch.get("batch_size_kg", 200),
-                "manufacturing_date": mfg_date.strftime("%Y-%m-%d"),
-                "packaging_complete_date": (
-                    mfg_date + timedelta(days=random.randint(1, 3))
-                ).strftime("%Y-%m-%d"),
-                "batch_review_start": review_start.strftime("%Y-%m-%d"),
-                "qc_testing_complete": qc_complete_date.strftime("%Y-%m-%d"),
-                "batch_review_complete": batch_review_complete.strftime("%Y-%m-%d"),
-                "qp_id": qp_id,
-                "qp_name": QP_NAMES[qp_id],
-                "qp_review_date": qp_review_date.strftime("%Y-%m-%d"),
-                "actual_yield_pct": yield_value,
-                "theoretical_tablets": int(
-                    batch.get("batch_size_kg", 200) * 1000 / 0.6
-                ),
-                "actual_tablets": int(
-                    batch.get("batch_size_kg", 200) * 1000 / 0.6 * yield_value / 100
-                ),
-                "has_deviation": "Yes" if has_deviation else "No",
-                "deviation_reference": (
-                    f"DEV-{year}-{random.randint(1, 500):04d}" if has_deviation else ""
-                ),
-                "deviation_classification": (
-                    random.choice(["Major", "Minor"]) if has_deviation else ""
-                ),
-                "deviation_closed": (
-                    "Yes"
-                    if has_deviation and disposition == "Released"
-                    else ("No" if has_deviation else "")
-                ),
-                "has_oos": "Yes" if has_oos else "No",
-                "oos_reference": (
-                    f"OOS-{year}-{random.randint(1, 100):04d}" if has_oos else ""
-                ),
-                "oos_resolved": (
-                    "Yes"
-                    if has_oos and disposition == "Released"
-                    else ("No" if has_oos else "")
-                ),
-                "change_control_applicable": "Yes" if random.random() < 0.1 else "No",
-                "change_control_reference": (
-                    f"CC-{year}-{random.randint(1, 50):03d}"
-                    if random.random() < 0.1
-                    else ""
-                ),
-                "checklist_batch_record": checklist_items.get(
-                    "Batch record review complete", "Yes"
-                ),
-                "checklist_ipc": checklist_items.get(
-                    "All IPC results within specification", "Yes"
-                ),
-                "checklist_qc_complete": checklist_items.get(
-                    "QC testing complete and approved", "Yes"
-                ),
-                "checklist_deviation": checklist_items.get(
-                    "Deviation review complete", "Yes"
-                ),
-                "checklist_change_control": checklist_items.get(
-                    "Change control review complete", "Yes"
-                ),
-                "checklist_environmental": checklist_items.get(
-                    "Environmental monitoring acceptable", "Yes"
-                ),
-                "checklist_calibration": checklist_items.get(
-                    "Equipment calibration verified", "Yes"
-                ),
-                "checklist_raw_materials": checklist_items.get(
-                    "Raw material documentation verified", "Yes"
-                ),
-                "checklist_stability": checklist_items.get(
-                    "Stability protocol assigned", "Yes"
-                ),
-                "checklist_label": checklist_items.get(
-                    "Label reconciliation complete", "Yes"
-                ),
-                "checklist_yield": checklist_items.get(
-                    "Yield within acceptable limits", "Yes"
-                ),
-                "checklist_packaging": checklist_items.get(
-                    "Packaging integrity verified", "Yes"
-                ),
-                "disposition": disposition,
-                "disposition_date": (
-                    release_date.strftime("%Y-%m-%d") if release_date else ""
-                ),
-                "hold_reason": "; ".join(hold_reasons) if hold_reasons else "",
-                "rejection_reason": (
-                    "Quality failure" if disposition == "Rejected" else ""
-                ),
-                "days_to_release": days_to_release,
-                "expedited_release": (
-                    "Yes" if days_to_release and days_to_release < 10 else "No"
-                ),
-                "expiry_date": expiry_date.strftime("%Y-%m-%d"),
-                "shelf_life_months": 36,
-                "retest_date": (mfg_date + timedelta(days=365 * 2)).strftime(
-                    "%Y-%m-%d"
-                ),
-                "market_destination": market_destination,
-                "regulatory_clearance": regulatory_clearance,
-                "clearance_status": clearance_status,
-                "stability_protocol": f"STAB-{year}-{random.randint(1, 50):03d}",
-                "stability_station": random.choice(
-                    ["Long-term", "Accelerated", "Both"]
-                ),
-                "warehouse_location": f"FG-{random.choice(['A', 'B', 'C'])}-{random.randint(1, 100):03d}",
-                "shipped_quantity_pct": (
-                    random.randint(0, 100) if disposition == "Released" else 0
-                ),
-                "comments": "",
-            }
-        )
-
-    df = pd.DataFrame(records)
+    # Only the columns used are parsed, with known types, and dates once for
+    # the whole column in a known format
+    mfg_df = pd.read_csv(
+        mfg_file,
+        usecols=lambda column: column in MFG_DTYPES or column == "manufacturing_date",
+        dtype=MFG_DTYPES,
+        parse_dates=["manufacturing_date"],
+        date_format="%Y-%m-%d",
+    )
+    n = len(mfg_df)
+    mfg_date = mfg_df["manufacturing_date"]
+
+    # Review timeline: review start, QC testing, batch review, QP review
+    review_start = mfg_date + random_days(rng, 1, 3, n)
+    qc_complete_date = review_start + random_days(rng, 5, 14, n)
+    batch_review_complete = qc_complete_date + random_days(rng, 1, 3, n)
+    qp_review_date = batch_review_complete + random_days(rng, 1, 2, n)
+
+    yield_value = _column(mfg_df, "actual_yield_pct", 98.0)
+    batch_size_kg = _column(mfg_df, "batch_size_kg", 200)
+
+    # Deviations and OOS results (simulated)
+    # One block of uniforms covers every weighted yes/no draw below, a row each
+    (
+        u_deviation,
+        u_critical,
+        u_oos,
+        u_reject,
+        u_hold,
+        u_change_control,
+        u_change_control_ref,
+        u_market,
+    ) = rng.random((8, n))
+
+    has_deviation = u_deviation < 0.08
+    deviation_critical = has_deviation & (u_critical < 0.1)
+    has_oos = u_oos < 0.03
+    low_yield = (yield_value < 95).to_numpy()
+    has_hold_reason = has_deviation | has_oos | low_yield
+
+    hold_reason = (
+        pd.Series(np.where(has_deviation, "Deviation pending closure; ", ""))
+        + np.where(has_oos, "OOS investigation pending; ", "")
+        + np.where(low_yield, "Low yield investigation; ", "")
+    ).str.removesuffix("; ")
+
+    # Disposition decision: batches with open issues are mostly released
+    # late once they're closed, otherwise kept on hold
+    rejected = deviation_critical | (has_oos & (u_reject > 0.7))
+    on_hold = ~rejected & has_hold_reason & (u_hold <= 0.3)
+    released_late = ~rejected & has_hold_reason & ~on_hold
+    released = ~rejected & ~on_hold
+    disposition = np.select(
+        [rejected, on_hold], ["Rejected", "On Hold"], default="Released"
+    )
+
+    release_delay = pd.to_timedelta(
+        np.where(released_late, rng.integers(1, 15, n), 0), unit="D"
+    )
+    release_date = (qp_review_date + release_delay).where(released)
+    days_to_release = (release_date - mfg_date).dt.days
+
+    # Assigned QP; id and name share one set of codes
+    qp = pd.Categorical.from_codes(
+        rng.integers(0, len(QUALIFIED_PERSONS), n), QUALIFIED_PERSONS
+    )
+
+    # Checklist completion, as answer codes: released batches tick every
+    # item; on hold, an open OOS leaves every item pending and an open
+    # deviation its own review; rejected batches are a mix
+    held_answers = np.where(on_hold & has_oos, PENDING, YES)
+    held_deviation_answers = np.where(on_hold, PENDING, YES)
+    checklist = {}
+    for item, column in RELEASE_CHECKLISTS.items():
+        answers = held_deviation_answers if "Deviation" in item else held_answers
+        codes = np.where(rejected, rng.integers(0, 3, n), answers)
+        checklist[column] = pd.Categorical.from_codes(codes, CHECKLIST_ANSWERS)
+
+    # Market destination and regulatory submission status
+    market_destination = MARKETS[
+        np.searchsorted(MARKET_THRESHOLDS, u_market, side="right")
+    ]
+    regulated = np.isin(market_destination, REGULATED_MARKETS)
+
+    theoretical_tablets = batch_size_kg * 1000 / 0.6
+    change_control = u_change_control < 0.1
+
+    df = pd.DataFrame(
+        {
+            "batch_id": mfg_df["batch_id"],
+            "product_code": "PARA-500-TAB",
+            "product_name": "Paracetamol 500mg Tablets",
+            "batch_size_kg": batch_size_kg,
+            "manufacturing_date": date_strings(mfg_date),
+            "packaging_complete_date": date_strings(
+                mfg_date + random_days(rng, 1, 3, n)
+            ),
+            "batch_review_start": date_strings(review_start),
+            "qc_testing_complete": date_strings(qc_complete_date),
+            "batch_review_complete": date_strings(batch_review_complete),
+            "qp_id": qp,
+            "qp_name": qp.rename_categories(QP_NAMES),
+            "qp_review_date": date_strings(qp_review_date),
+            "actual_yield_pct": yield_value,
+            "theoretical_tablets": theoretical_tablets.astype(int),
+            "actual_tablets": (theoretical_tablets * yield_value / 100).astype(int),
+            "has_deviation": np.where(has_deviation, "Yes", "No"),
+            "deviation_reference": np.where(
+                has_deviation, numbered(rng, f"DEV-{year}-", 500, 4, n), ""
+            ),
+            "deviation_classification": np.where(
+                has_deviation, rng.choice(DEVIATION_CLASSES, n), ""
+            ),
+            "deviation_closed": np.select(
+                [has_deviation & released, has_deviation], ["Yes", "No"], default=""
+            ),
+            "has_oos": np.where(has_oos, "Yes", "No"),
+            "oos_reference": np.where(
+                has_oos, numbered(rng, f"OOS-{year}-", 100, 4, n), ""
+            ),
+            "oos_resolved": np.select(
+                [has_oos & released, has_oos], ["Yes", "No"], default=""
+            ),
+            "change_control_applicable": np.where(change_control, "Yes", "No"),
+            "change_control_reference": np.where(
+                u_change_control_ref < 0.1, numbered(rng, f"CC-{year}-", 50, 3, n), ""
+            ),
+            **checklist,
+            "disposition": disposition,
+            "disposition_date": date_strings(release_date),
+            "hold_reason": hold_reason,
+            "rejection_reason": np.where(rejected, "Quality failure", ""),
+            "days_to_release": days_to_release,
+            "expedited_release": np.where(days_to_release < 10, "Yes", "No"),
+            # Expiry 3 years from manufacture, retest after 2
+            "expiry_date": date_strings(mfg_date + pd.Timedelta(days=365 * 3)),
+            "shelf_life_months": 36,
+            "retest_date": date_strings(mfg_date + pd.Timedelta(days=365 * 2)),
+            "market_destination": market_destination,
+            "regulatory_clearance": np.where(regulated, "Required", "Not Required"),
+            "clearance_status": np.select(
+                [regulated & released, regulated],
+                ["Approved", "Pending"],
+                default="N/A",
+            ),
+            "stability_protocol": numbered(rng, f"STAB-{year}-", 50, 3, n),
+            "stability_station": rng.choice(STABILITY_STATIONS, n),
+            "warehouse_location": numbered(
+                rng, rng.choice(WAREHOUSE_AREAS, n), 100, 3, n
+            ),
+            "shipped_quantity_pct": np.where(released, rng.integers(0, 101, n), 0),
+            "comments": "",
+        }
+    )
+    df = df.astype(category_dtypes(CATEGORY_COLUMNS))
     df.to_csv(f"{OUTPUT_DIR}batch_release_{year}.csv", index=False)
     print(f"   ✓ Generated {len(df):,} batch release records")
 
@@ -288,21 +275,21 @@ if __name__ == "__main__":
     print("Batch Release & Disposition")
     print("=" * 70)
 
-    all_release = []
+    path = f"{OUTPUT_DIR}batch_release_ALL.parquet"
+    total = write_combined_parquet(map_years(generate_batch_release_data, YEARS), path)
 
-    for year in YEARS:
-        df = generate_batch_release_data(year)
-        if df is not None:
-            all_release.append(df)
-
-    if all_release:
-        combined = pd.concat(all_release, ignore_index=True)
-        combined.to_csv(f"{OUTPUT_DIR}batch_release_ALL.csv", index=False)
-        print(f"\n✅ Combined file: batch_release_ALL.csv ({len(combined):,} records)")
+    if total:
+        print(f"\n✅ Combined file: batch_release_ALL.parquet ({total:,} records)")
+        dispositions = (
+            pq.read_table(path, columns=["disposition"])
+            .column("disposition")
+            .to_pandas()
+            .value_counts()
+        )
 
         # Overall summary
         print("\n📊 Overall Summary:")
-        print(f"   Total batches: {len(combined):,}")
-        print(f"   Released: {len(combined[combined['disposition'] == 'Released']):,}")
-        print(f"   On Hold: {len(combined[combined['disposition'] == 'On Hold']):,}")
-        print(f"   Rejected: {len(combined[combined['disposition'] == 'Rejected']):,}")
+        print(f"   Total batches: {total:,}")
+        print(f"   Released: {dispositions.get('Released', 0):,}")
+        print(f"   On Hold: {dispositions.get('On Hold', 0):,}")
+        print(f"   Rejected: {dispositions.get('Rejected', 0):,}")
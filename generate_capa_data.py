@@ -7,15 +7,18 @@ Linked to deviations, complaints, audit findings, and OOS investigations.
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
 import os
 
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from generator_common import (
+    year_rng,
+    category_dtypes,
+    random_days,
+    date_strings,
+    reference,
+    numbered,
+    map_years,
+    write_combined_parquet,
+)
 
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
 OUTPUT_DIR = (
@@ -34,6 +37,29 @@ CAPA_SOURCES = {
     "Self-Identified": 0.05,
 }
 
+# Arrays for the per-year draws, so rng.choice doesn't rebuild them each call
+SOURCE_NAMES = np.array(list(CAPA_SOURCES))
+SOURCE_WEIGHTS = np.array(list(CAPA_SOURCES.values()))
+
+CAPA_TYPES = np.array(["Corrective", "Preventive", "Corrective & Preventive"])
+
+PROBLEM_CATEGORIES = np.array(
+    [
+        "Documentation",
+        "Equipment",
+        "Process",
+        "Training",
+        "Material",
+        "Environmental Control",
+        "System/Software",
+        "Supplier/Vendor",
+    ]
+)
+
+RCA_METHODS = np.array(
+    ["5-Why", "Fishbone Diagram", "Fault Tree Analysis", "FMEA", "Is/Is-Not Analysis"]
+)
+
 ROOT_CAUSE_CATEGORIES = [
     "Procedure not followed",
     "Procedure inadequate",
@@ -56,6 +82,36 @@ DEPARTMENTS = [
     "Packaging",
 ]
 
+# CAPA owner ids start with the department's first three letters
+OWNER_PREFIXES = np.array([f"{dept[:3].upper()}-" for dept in DEPARTMENTS])
+
+ACTION_TYPES = np.array(
+    [
+        "Update SOP",
+        "Retrain personnel",
+        "Implement process control",
+        "Install equipment monitoring",
+        "Qualify new supplier",
+        "Revise specification",
+        "Add IPC checkpoint",
+        "Implement automation",
+    ]
+)
+
+CONTRIBUTING_FACTORS = np.array(
+    ["Workload", "Shift change", "New personnel", "Equipment age", "None identified"]
+)
+
+EXTENSION_REASONS = np.array(
+    [
+        "Resource constraint",
+        "Additional investigation required",
+        "Pending supplier response",
+        "Equipment lead time",
+        "Regulatory guidance awaited",
+    ]
+)
+
 EFFECTIVENESS_CHECK_METHODS = [
     "Re-audit",
     "Trend monitoring",
@@ -64,6 +120,54 @@ EFFECTIVENESS_CHECK_METHODS = [
     "KPI review",
 ]
 
+CATEGORY_COLUMNS = [
+    "capa_type",
+    "source",
+    "problem_category",
+    "risk_probability",
+    "risk_severity",
+    "risk_score",
+    "rca_method",
+    "root_cause_category",
+    "responsible_department",
+    "status",
+    "effectiveness_check_method",
+    "effectiveness_verified",
+    "recurrence",
+]
+
+# Source -> reference prefix, highest number, digits; other sources are
+# management review items
+SOURCE_REFERENCES = {
+    "Deviation": ("DEV", 500, 4),
+    "Customer Complaint": ("COMP", 100, 5),
+    "OOS Investigation": ("OOS", 50, 4),
+    "Internal Audit": ("IA", 20, 3),
+    "External Audit": ("EA", 5, 3),
+}
+
+# Risk score by probability (rows) and severity (columns)
+RISK_PROBABILITIES = np.array(["High", "Medium", "Low"])
+RISK_SEVERITIES = np.array(["Critical", "Major", "Minor"])
+RISK_MATRIX = np.array(
+    [
+        ["Critical", "High", "Medium"],
+        ["High", "Medium", "Low"],
+        ["Medium", "Low", "Low"],
+    ]
+)
+TARGET_DAYS = {"Critical": 30, "High": 60, "Medium": 90, "Low": 120}
+RISK_TARGET_DAYS = np.vectorize(TARGET_DAYS.get)(RISK_MATRIX)
+
+# Status options and weights, from CAPAs more than a month past target down
+# to those less than halfway to it
+STATUS_TIERS = [
+    (["Closed - Effective", "Closed - Not Effective", "Overdue"], [0.7, 0.1, 0.2]),
+    (["Closed - Effective", "In Progress", "Overdue"], [0.5, 0.3, 0.2]),
+    (["Closed - Effective", "In Progress", "On Hold"], [0.3, 0.6, 0.1]),
+    (["In Progress", "Investigation", "Planning"], [0.4, 0.3, 0.3]),
+]
+
 
 def generate_capa_data(year: int):
     """
@@ -74,9 +178,10 @@ def generate_capa_data(year: int):
     - Effectiveness verification
     """
     print(f"\n🔧 Generating CAPA Data for {year}...")
+    rng = year_rng(year)
 
     # Base number of CAPAs per year
-    num_capas = random.randint(80, 120)
+    num_capas = int(rng.integers(80, 121))
 
     # More CAPAs in problematic years
     if year == 2022:
@@ -84,248 +189,170 @@ def generate_capa_data(year: int):
     if year == 2025:
         num_capas = int(num_capas * 1.15)  # API supplier change
 
-    records = []
-
-    for i in range(num_capas):
-        capa_open_date = datetime(year, random.randint(1, 12), random.randint(1, 28))
-
-        # Source determination
-        source = np.random.choice(
-            list(CAPA_SOURCES.keys()), p=list(CAPA_SOURCES.values())
-        )
-
-        # Source reference
-        if source == "Deviation":
-            source_ref = f"DEV-{year}-{random.randint(1, 500):04d}"
-        elif source == "Customer Complaint":
-            source_ref = f"COMP-{year}-{random.randint(1, 100):05d}"
-        elif source == "OOS Investigation":
-            source_ref = f"OOS-{year}-{random.randint(1, 50):04d}"
-        elif source == "Internal Audit":
-            source_ref = f"IA-{year}-{random.randint(1, 20):03d}"
-        elif source == "External Audit":
-            source_ref = f"EA-{year}-{random.randint(1, 5):03d}"
-        else:
-            source_ref = f"MR-{year}-{random.randint(1, 12):02d}"
-
-        # CAPA type
-        capa_type = random.choice(
-            ["Corrective", "Preventive", "Corrective & Preventive"]
-        )
-
-        # Problem classification
-        problem_category = random.choice(
-            [
-                "Documentation",
-                "Equipment",
-                "Process",
-                "Training",
-                "Material",
-                "Environmental Control",
-                "System/Software",
-                "Supplier/Vendor",
-            ]
-        )
-
-        # Risk assessment
-        probability = random.choice(["High", "Medium", "Low"])
-        severity = random.choice(["Critical", "Major", "Minor"])
-        risk_score = {
-            ("High", "Critical"): "Critical",
-            ("High", "Major"): "High",
-            ("High", "Minor"): "Medium",
-            ("Medium", "Critical"): "High",
-            ("Medium", "Major"): "Medium",
-            ("Medium", "Minor"): "Low",
-            ("Low", "Critical"): "Medium",
-            ("Low", "Major"): "Low",
-            ("Low", "Minor"): "Low",
-        }[(probability, severity)]
-
-        # Root cause analysis
-        rca_method = random.choice(
-            [
-                "5-Why",
-                "Fishbone Diagram",
-                "Fault Tree Analysis",
-                "FMEA",
-                "Is/Is-Not Analysis",
-            ]
-        )
-        root_cause = random.choice(ROOT_CAUSE_CATEGORIES)
-
-        # Department assignment
-        responsible_dept = random.choice(DEPARTMENTS)
-        owner = f"{responsible_dept[:3].upper()}-{random.randint(1, 30):02d}"
-
-        # Action planning
-        num_actions = random.randint(1, 5)
-        action_descriptions = []
-        for j in range(num_actions):
-            action_type = random.choice(
-                [
-                    "Update SOP",
-                    "Retrain personnel",
-                    "Implement process control",
-                    "Install equipment monitoring",
-                    "Qualify new supplier",
-                    "Revise specification",
-                    "Add IPC checkpoint",
-                    "Implement automation",
-                ]
-            )
-            action_descriptions.append(action_type)
-
-        # Timeline
-        target_days = {"Critical": 30, "High": 60, "Medium": 90, "Low": 120}[risk_score]
-
-        target_date = capa_open_date + timedelta(days=target_days)
-
-        # Completion status
-        days_since_open = (datetime(year, 12, 31) - capa_open_date).days
-
-        if days_since_open > target_days + 30:
-            status = random.choices(
-                ["Closed - Effective", "Closed - Not Effective", "Overdue"],
-                weights=[0.7, 0.1, 0.2],
-            )[0]
-        elif days_since_open > target_days:
-            status = random.choices(
-                ["Closed - Effective", "In Progress", "Overdue"],
-                weights=[0.5, 0.3, 0.2],
-            )[0]
-        elif days_since_open > target_days * 0.5:
-            status = random.choices(
-                ["Closed - Effective", "In Progress", "On Hold"],
-                weights=[0.3, 0.6, 0.1],
-            )[0]
-        else:
-            status = random.choices(
-                ["In Progress", "Investigation", "Planning"], weights=[0.4, 0.3, 0.3]
-            )[0]
-
-        # Completion dates based on status
-        if "Closed" in status:
-            actual_completion = capa_open_date + timedelta(
-                days=random.randint(target_days - 15, target_days + 30)
-            )
-            days_late = max(0, (actual_completion - target_date).days)
-        else:
-            actual_completion = None
-            days_late = None
-
-        # Effectiveness verification
-        if status == "Closed - Effective":
-            effectiveness_verified = "Yes"
-            effectiveness_date = actual_completion + timedelta(
-                days=random.randint(30, 90)
-            )
-            effectiveness_method = random.choice(EFFECTIVENESS_CHECK_METHODS)
-            recurrence = "No"
-        elif status == "Closed - Not Effective":
-            effectiveness_verified = "Yes"
-            effectiveness_date = actual_completion + timedelta(
-                days=random.randint(30, 90)
-            )
-            effectiveness_method = random.choice(EFFECTIVENESS_CHECK_METHODS)
-            recurrence = "Yes"
-        else:
-            effectiveness_verified = "Pending"
-            effectiveness_date = None
-            effectiveness_method = random.choice(EFFECTIVENESS_CHECK_METHODS)
-            recurrence = "N/A"
-
-        # Extensions
-        num_extensions = random.choices([0, 1, 2], weights=[0.7, 0.25, 0.05])[0]
-        if num_extensions > 0:
-            extension_reason = random.choice(
-                [
-                    "Resource constraint",
-                    "Additional investigation required",
-                    "Pending supplier response",
-                    "Equipment lead time",
-                    "Regulatory guidance awaited",
-                ]
-            )
-        else:
-            extension_reason = ""
-
-        records.append(
+    n = num_capas
+    capa_open_date = pd.to_datetime(
+        pd.DataFrame(
             {
-                "capa_id": f"CAPA-{year}-{i+1:04d}",
-                "capa_type": capa_type,
-                "source": source,
-                "source_reference": source_ref,
-                "open_date": capa_open_date.strftime("%Y-%m-%d"),
-                "problem_statement": f"Issue identified through {source.lower()} requiring {capa_type.lower()} action",
-                "problem_category": problem_category,
-                "product_affected": (
-                    "PARA-500-TAB" if random.random() > 0.2 else "Multiple Products"
-                ),
-                "batch_affected": (
-                    f"PARA-{str(year)[-2:]}-{random.randint(1, 7000):04d}"
-                    if source in ["Deviation", "OOS Investigation"]
-                    else "N/A"
-                ),
-                "risk_probability": probability,
-                "risk_severity": severity,
-                "risk_score": risk_score,
-                "rca_method": rca_method,
-                "root_cause_category": root_cause,
-                "root_cause_description": f"Root cause determined using {rca_method}: {root_cause}",
-                "contributing_factors": random.choice(
-                    [
-                        "Workload",
-                        "Shift change",
-                        "New personnel",
-                        "Equipment age",
-                        "None identified",
-                    ]
-                ),
-                "responsible_department": responsible_dept,
-                "capa_owner": owner,
-                "approver": f"QA-MGR-{random.randint(1, 5):02d}",
-                "num_actions": num_actions,
-                "action_summary": "; ".join(action_descriptions),
-                "target_date": target_date.strftime("%Y-%m-%d"),
-                "actual_completion_date": (
-                    actual_completion.strftime("%Y-%m-%d") if actual_completion else ""
-                ),
-                "days_to_close": (
-                    (actual_completion - capa_open_date).days
-                    if actual_completion
-                    else None
-                ),
-                "days_late": days_late,
-                "status": status,
-                "num_extensions": num_extensions,
-                "extension_reason": extension_reason,
-                "effectiveness_check_method": effectiveness_method,
-                "effectiveness_verified": effectiveness_verified,
-                "effectiveness_date": (
-                    effectiveness_date.strftime("%Y-%m-%d")
-                    if effectiveness_date
-                    else ""
-                ),
-                "recurrence": recurrence,
-                "linked_capas": (
-                    f"CAPA-{year}-{random.randint(1, i+1):04d}"
-                    if random.random() < 0.1 and i > 0
-                    else ""
-                ),
-                "regulatory_impact": "Yes" if risk_score == "Critical" else "No",
-                "cost_estimate_usd": (
-                    random.randint(500, 50000) if status != "Planning" else None
-                ),
-                "created_by": f"QA-{random.randint(1, 15):02d}",
-                "last_updated": (
-                    capa_open_date + timedelta(days=random.randint(1, 30))
-                ).strftime("%Y-%m-%d"),
-                "comments": "",
+                "year": year,
+                "month": rng.integers(1, 13, n),
+                "day": rng.integers(1, 29, n),
             }
         )
+    )
+
+    # Source determination and reference
+    source = pd.Series(rng.choice(SOURCE_NAMES, n, p=SOURCE_WEIGHTS))
+    source_ref = pd.Series("", index=source.index)
+    for name in CAPA_SOURCES:
+        prefix, high, width = SOURCE_REFERENCES.get(name, ("MR", 12, 2))
+        is_source = source == name
+        source_ref[is_source] = numbered(
+            rng, f"{prefix}-{year}-", high, width, is_source.sum()
+        )
 
-    df = pd.DataFrame(records)
+    # CAPA type
+    capa_type = pd.Series(rng.choice(CAPA_TYPES, n))
+
+    # Problem classification
+    problem_category = rng.choice(PROBLEM_CATEGORIES, n)
+
+    # Risk assessment
+    probability_idx = rng.integers(0, 3, n)
+    severity_idx = rng.integers(0, 3, n)
+    risk_score = pd.Series(RISK_MATRIX[probability_idx, severity_idx])
+
+    # Root cause analysis
+    rca_method = pd.Series(rng.choice(RCA_METHODS, n))
+    root_cause = pd.Series(rng.choice(ROOT_CAUSE_CATEGORIES, n))
+
+    # Department assignment
+    department_idx = rng.integers(0, len(DEPARTMENTS), n)
+    responsible_dept = np.array(DEPARTMENTS)[department_idx]
+    owner = numbered(rng, OWNER_PREFIXES[department_idx], 30, 2, n)
+
+    # Action planning
+    num_actions = rng.integers(1, 6, n)
+    actions = rng.choice(ACTION_TYPES, (n, 5))
+    action_summary = [
+        "; ".join(row[:count]) for row, count in zip(actions, num_actions)
+    ]
+
+    # Timeline
+    target_days = RISK_TARGET_DAYS[probability_idx, severity_idx]
+    target_date = capa_open_date + pd.to_timedelta(target_days, unit="D")
+
+    # Completion status, by how far past its target the CAPA is at year end
+    days_since_open = (pd.Timestamp(year, 12, 31) - capa_open_date).dt.days
+    status_tier = np.select(
+        [
+            days_since_open > target_days + 30,
+            days_since_open > target_days,
+            days_since_open > target_days * 0.5,
+        ],
+        [0, 1, 2],
+        default=3,
+    )
+    status = pd.Series(
+        np.choose(
+            status_tier,
+            [rng.choice(choices, n, p=weights) for choices, weights in STATUS_TIERS],
+        )
+    )
+
+    # Completion dates based on status
+    closed = status.str.startswith("Closed")
+    actual_completion = (
+        capa_open_date + random_days(rng, target_days - 15, target_days + 30, n)
+    ).where(closed)
+    days_late = (actual_completion - target_date).dt.days.clip(lower=0)
+
+    # Effectiveness verification
+    effectiveness_date = actual_completion + random_days(rng, 30, 90, n)
+    recurrence = np.select(
+        [status == "Closed - Effective", status == "Closed - Not Effective"],
+        ["No", "Yes"],
+        default="N/A",
+    )
+
+    # Extensions
+    num_extensions = rng.choice([0, 1, 2], n, p=[0.7, 0.25, 0.05])
+    extension_reason = np.where(
+        num_extensions > 0,
+        rng.choice(EXTENSION_REASONS, n),
+        "",
+    )
+
+    # Uniforms for the remaining weighted draws, a row each
+    u_product, u_linked, u_link_target = rng.random((3, n))
+
+    # Links back to an earlier CAPA of the same year
+    position = np.arange(n)
+    linked_capa = reference(
+        f"CAPA-{year}-", (u_link_target * (position + 1)).astype(int) + 1, 4
+    )
+
+    df = pd.DataFrame(
+        {
+            "capa_id": reference(f"CAPA-{year}-", position + 1, 4),
+            "capa_type": capa_type,
+            "source": source,
+            "source_reference": source_ref,
+            "open_date": date_strings(capa_open_date),
+            "problem_statement": "Issue identified through "
+            + source.str.lower()
+            + " requiring "
+            + capa_type.str.lower()
+            + " action",
+            "problem_category": problem_category,
+            "product_affected": np.where(
+                u_product > 0.2, "PARA-500-TAB", "Multiple Products"
+            ),
+            "batch_affected": np.where(
+                source.isin(["Deviation", "OOS Investigation"]),
+                numbered(rng, f"PARA-{str(year)[-2:]}-", 7000, 4, n),
+                "N/A",
+            ),
+            "risk_probability": RISK_PROBABILITIES[probability_idx],
+            "risk_severity": RISK_SEVERITIES[severity_idx],
+            "risk_score": risk_score,
+            "rca_method": rca_method,
+            "root_cause_category": root_cause,
+            "root_cause_description": "Root cause determined using "
+            + rca_method
+            + ": "
+            + root_cause,
+            "contributing_factors": rng.choice(CONTRIBUTING_FACTORS, n),
+            "responsible_department": responsible_dept,
+            "capa_owner": owner,
+            "approver": numbered(rng, "QA-MGR-", 5, 2, n),
+            "num_actions": num_actions,
+            "action_summary": action_summary,
+            "target_date": date_strings(target_date),
+            "actual_completion_date": date_strings(actual_completion),
+            "days_to_close": (actual_completion - capa_open_date).dt.days,
+            "days_late": days_late,
+            "status": status,
+            "num_extensions": num_extensions,
+            "extension_reason": extension_reason,
+            "effectiveness_check_method": rng.choice(EFFECTIVENESS_CHECK_METHODS, n),
+            "effectiveness_verified": np.where(closed, "Yes", "Pending"),
+            "effectiveness_date": date_strings(effectiveness_date),
+            "recurrence": recurrence,
+            "linked_capas": np.where(
+                (u_linked < 0.1) & (position > 0),
+                linked_capa,
+                "",
+            ),
+            "regulatory_impact": np.where(risk_score == "Critical", "Yes", "No"),
+            "cost_estimate_usd": pd.Series(rng.integers(500, 50001, n)).where(
+                status != "Planning"
+            ),
+            "created_by": numbered(rng, "QA-", 15, 2, n),
+            "last_updated": date_strings(capa_open_date + random_days(rng, 1, 30, n)),
+            "comments": "",
+        }
+    )
+    df = df.astype(category_dtypes(CATEGORY_COLUMNS))
     df.to_csv(f"{OUTPUT_DIR}capa_records_{year}.csv", index=False)
     print(f"   ✓ Generated {len(df):,} CAPA records")
     return df
@@ -337,13 +364,9 @@ if __name__ == "__main__":
     print("CAPA (Corrective and Preventive Action) Records")
     print("=" * 70)
 
-    all_capa = []
-    for year in YEARS:
-        df = generate_capa_data(year)
-        if df is not None:
-            all_capa.append(df)
+    total = write_combined_parquet(
+        map_years(generate_capa_data, YEARS), f"{OUTPUT_DIR}capa_records_ALL.parquet"
+    )
 
-    if all_capa:
-        combined = pd.concat(all_capa, ignore_index=True)
-        combined.to_csv(f"{OUTPUT_DIR}capa_records_ALL.csv", index=False)
-        print(f"\n✅ Combined file: capa_records_ALL.csv ({len(combined):,} records)")
+    if total:
+        print(f"\n✅ Combined file: capa_records_ALL.parquet ({total:,} records)")
@@ -6,15 +6,19 @@ Product complaints, adverse events, and market returns.
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
+import pyarrow.csv as pv
 import os
 
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from generator_common import (
+    year_rng,
+    category_dtypes,
+    random_days,
+    date_strings,
+    reference,
+    numbered,
+    map_years,
+    write_combined_parquet,
+)
 
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
 OUTPUT_DIR = (
@@ -66,6 +70,70 @@ MARKETS = [
     "Mexico",
 ]
 DISTRIBUTION_CHANNELS = ["Retail Pharmacy", "Hospital", "Online Pharmacy", "Wholesaler"]
+REPORTER_TYPES = ["Patient", "Healthcare Professional", "Pharmacist", "Distributor"]
+SEVERITIES = ["Critical", "Major", "Minor"]
+SEVERITY_WEIGHTS = {
+    "Adverse Event": [0.1, 0.4, 0.5],
+    "Product Quality": [0.05, 0.35, 0.6],
+}
+DEFAULT_SEVERITY_WEIGHTS = [0.02, 0.28, 0.7]
+ROOT_CAUSES = [
+    "Manufacturing process variation",
+    "Handling during distribution",
+    "Storage conditions",
+    "Raw material variation",
+    "No defect confirmed - customer handling",
+    "Packaging material defect",
+    "Equipment issue",
+    "Not determined",
+]
+INVESTIGATION_OUTCOMES = [
+    "Confirmed - batch specific",
+    "Confirmed - systemic issue",
+    "Not confirmed - no defect found",
+    "Inconclusive - sample not available",
+]
+SATISFACTION_LEVELS = ["Satisfied", "Neutral", "Dissatisfied"]
+HANDLERS = [f"QA-{i:02d}" for i in range(1, 11)]
+
+# Reporter contact emails are assembled from these (name + number @ domain)
+EMAIL_NAMES = [
+    "james",
+    "mary",
+    "robert",
+    "patricia",
+    "john",
+    "jennifer",
+    "michael",
+    "linda",
+    "david",
+    "elizabeth",
+    "william",
+    "susan",
+    "richard",
+    "jessica",
+    "thomas",
+    "sarah",
+]
+EMAIL_DOMAINS = ["@example.com", "@example.org", "@example.net"]
+
+CATEGORY_COLUMNS = [
+    "category",
+    "description",
+    "severity",
+    "market",
+    "distribution_channel",
+    "reporter_type",
+    "investigation_required",
+    "root_cause",
+    "investigation_outcome",
+    "regulatory_reportable",
+    "report_submitted",
+    "batch_recall_required",
+    "customer_satisfaction",
+    "complaint_status",
+    "handled_by",
+]
 
 
 def generate_complaints_data(year: int):
@@ -77,6 +145,7 @@ def generate_complaints_data(year: int):
     - Regulatory reporting status
     """
     print(f"\n📞 Generating Customer Complaints Data for {year}...")
+    rng = year_rng(year)
 
     # Load manufacturing data to link complaints to batches
     mfg_file = f"{OUTPUT_DIR}manufacturing_extended_{year}.csv"
@@ -84,183 +153,159 @@ def generate_complaints_data(year: int):
         print(f"   ⚠️  Manufacturing file not found")
         return None
 
-    mfg_df = pd.read_csv(mfg_file)
-    batch_ids = mfg_df["batch_id"].tolist()
+    # Only the batch ids are needed: Arrow's reader skips converting the rest
+    batch_ids = (
+        pv.read_csv(
+            mfg_file, convert_options=pv.ConvertOptions(include_columns=["batch_id"])
+        )
+        .column("batch_id")
+        .to_numpy()
+    )
 
     # Complaint rate: ~0.5-1% of batches receive complaints
-    num_complaints = int(len(batch_ids) * np.random.uniform(0.005, 0.01))
+    num_complaints = int(len(batch_ids) * rng.uniform(0.005, 0.01))
 
     # Add more complaints during problem periods
     if year == 2025:
         num_complaints = int(
             num_complaints * 1.3
         )  # More complaints during supplier issue
+    n = num_complaints
 
-    records = []
-
-    for i in range(num_complaints):
-        complaint_date = datetime(year, random.randint(1, 12), random.randint(1, 28))
-
-        # Select batch (could be from previous year too)
-        if random.random() > 0.1:
-            batch_id = random.choice(batch_ids)
-        else:
-            batch_id = f"PARA-{str(year-1)[-2:]}-{random.randint(1, 7000):04d}"
-
-        category = random.choice(list(COMPLAINT_CATEGORIES.keys()))
-        description = random.choice(COMPLAINT_CATEGORIES[category])
-
-        # Severity classification
-        if category == "Adverse Event":
-            severity = random.choices(
-                ["Critical", "Major", "Minor"], weights=[0.1, 0.4, 0.5]
-            )[0]
-        elif category == "Product Quality":
-            severity = random.choices(
-                ["Critical", "Major", "Minor"], weights=[0.05, 0.35, 0.6]
-            )[0]
-        else:
-            severity = random.choices(
-                ["Critical", "Major", "Minor"], weights=[0.02, 0.28, 0.7]
-            )[0]
-
-        # Reporter information
-        reporter_type = random.choice(
-            ["Patient", "Healthcare Professional", "Pharmacist", "Distributor"]
+    complaint_date = pd.Series(
+        pd.to_datetime(
+            {
+                "year": np.full(n, year),
+                "month": rng.integers(1, 13, n),
+                "day": rng.integers(1, 29, n),
+            }
         )
+    )
 
-        # Investigation
-        investigation_required = (
-            "Yes" if severity in ["Critical", "Major"] else random.choice(["Yes", "No"])
-        )
+    # Select batch (could be from previous year too)
+    previous_year_batch = numbered(rng, f"PARA-{str(year-1)[-2:]}-", 7000, 4, n)
+    batch_id = np.where(
+        rng.random(n) > 0.1, rng.choice(batch_ids, n), previous_year_batch
+    )
 
-        if investigation_required == "Yes":
-            investigation_start = complaint_date + timedelta(days=random.randint(1, 3))
-            investigation_days = (
-                random.randint(5, 30)
-                if severity == "Critical"
-                else random.randint(10, 45)
-            )
-            investigation_complete = investigation_start + timedelta(
-                days=investigation_days
-            )
+    # Category, then description and severity drawn per category
+    category = rng.choice(list(COMPLAINT_CATEGORIES), n)
+    description = np.empty(n, dtype=object)
+    severity = np.empty(n, dtype=object)
+    for name, descriptions in COMPLAINT_CATEGORIES.items():
+        in_category = category == name
+        k = in_category.sum()
+        description[in_category] = rng.choice(descriptions, k)
+        severity[in_category] = rng.choice(
+            SEVERITIES, k, p=SEVERITY_WEIGHTS.get(name, DEFAULT_SEVERITY_WEIGHTS)
+        )
+    serious = np.isin(severity, ["Critical", "Major"])
 
-            root_cause = random.choice(
-                [
-                    "Manufacturing process variation",
-                    "Handling during distribution",
-                    "Storage conditions",
-                    "Raw material variation",
-                    "No defect confirmed - customer handling",
-                    "Packaging material defect",
-                    "Equipment issue",
-                    "Not determined",
-                ]
-            )
+    # Reporter information
+    reporter_type = rng.choice(REPORTER_TYPES, n)
+    email = np.strings.add(
+        np.strings.add(
+            rng.choice(EMAIL_NAMES, n), rng.integers(1, 100, n).astype(np.str_)
+        ),
+        rng.choice(EMAIL_DOMAINS, n),
+    )
+    reporter_contact = np.where(reporter_type == "Patient", "Anonymous", email)
 
-            investigation_outcome = random.choice(
-                [
-                    "Confirmed - batch specific",
-                    "Confirmed - systemic issue",
-                    "Not confirmed - no defect found",
-                    "Inconclusive - sample not available",
-                ]
-            )
-        else:
-            investigation_start = None
-            investigation_complete = None
-            root_cause = "N/A - No investigation required"
-            investigation_outcome = "N/A"
+    # Investigation
+    investigated = serious | (rng.random(n) < 0.5)
+    investigation_start = (complaint_date + random_days(rng, 1, 3, n)).where(
+        investigated
+    )
+    investigation_days = np.where(
+        severity == "Critical",
+        rng.integers(5, 31, n),
+        rng.integers(10, 46, n),
+    )
+    investigation_complete = investigation_start + pd.to_timedelta(
+        investigation_days, unit="D"
+    )
+    root_cause = np.where(
+        investigated,
+        rng.choice(ROOT_CAUSES, n),
+        "N/A - No investigation required",
+    )
+    investigation_outcome = np.where(
+        investigated, rng.choice(INVESTIGATION_OUTCOMES, n), "N/A"
+    )
 
-        # Regulatory reporting (for adverse events)
-        if category == "Adverse Event" and severity in ["Critical", "Major"]:
-            regulatory_reportable = "Yes"
-            report_submitted = "Yes" if random.random() > 0.1 else "Pending"
-            report_date = (
-                complaint_date + timedelta(days=random.randint(1, 15))
-                if report_submitted == "Yes"
-                else None
-            )
-        else:
-            regulatory_reportable = "No"
-            report_submitted = "N/A"
-            report_date = None
+    # Regulatory reporting (for adverse events)
+    reportable = (category == "Adverse Event") & serious
+    report_submitted = np.where(
+        reportable, np.where(rng.random(n) > 0.1, "Yes", "Pending"), "N/A"
+    )
+    report_date = complaint_date + random_days(rng, 1, 15, n)
+    report_date = report_date.where(report_submitted == "Yes")
 
-        # CAPA reference (for confirmed issues)
-        if investigation_outcome in [
-            "Confirmed - batch specific",
-            "Confirmed - systemic issue",
-        ]:
-            capa_reference = f"CAPA-{year}-{random.randint(1, 200):04d}"
-        else:
-            capa_reference = "N/A"
+    # CAPA reference (for confirmed issues)
+    confirmed = np.isin(investigation_outcome, INVESTIGATION_OUTCOMES[:2])
+    capa_reference = np.where(
+        confirmed, numbered(rng, f"CAPA-{year}-", 200, 4, n), "N/A"
+    )
 
-        # Customer response
-        response_date = complaint_date + timedelta(days=random.randint(1, 5))
-        customer_satisfaction = (
-            random.choice(["Satisfied", "Neutral", "Dissatisfied"])
-            if investigation_outcome != "N/A"
-            else "Pending"
-        )
+    # Customer response
+    response_date = complaint_date + random_days(rng, 1, 5, n)
+    customer_satisfaction = np.where(
+        investigation_outcome != "N/A", rng.choice(SATISFACTION_LEVELS, n), "Pending"
+    )
 
-        records.append(
-            {
-                "complaint_id": f"COMP-{year}-{i+1:05d}",
-                "complaint_date": complaint_date.strftime("%Y-%m-%d"),
-                "batch_id": batch_id,
-                "category": category,
-                "description": description,
-                "severity": severity,
-                "market": random.choice(MARKETS),
-                "distribution_channel": random.choice(DISTRIBUTION_CHANNELS),
-                "reporter_type": reporter_type,
-                "reporter_contact": (
-                    fake.email() if reporter_type != "Patient" else "Anonymous"
-                ),
-                "quantity_affected": (
-                    random.randint(1, 100) if category == "Product Quality" else 1
-                ),
-                # Investigation
-                "investigation_required": investigation_required,
-                "investigation_start_date": (
-                    investigation_start.strftime("%Y-%m-%d")
-                    if investigation_start
-                    else ""
-                ),
-                "investigation_complete_date": (
-                    investigation_complete.strftime("%Y-%m-%d")
-                    if investigation_complete
-                    else ""
-                ),
-                "root_cause": root_cause,
-                "investigation_outcome": investigation_outcome,
-                # Regulatory
-                "regulatory_reportable": regulatory_reportable,
-                "report_submitted": report_submitted,
-                "report_date": report_date.strftime("%Y-%m-%d") if report_date else "",
-                # Actions
-                "capa_reference": capa_reference,
-                "batch_recall_required": (
-                    "Yes"
-                    if severity == "Critical"
-                    and investigation_outcome == "Confirmed - systemic issue"
-                    else "No"
-                ),
-                # Response
-                "initial_response_date": response_date.strftime("%Y-%m-%d"),
-                "customer_satisfaction": customer_satisfaction,
-                "complaint_status": (
-                    "Closed"
-                    if investigation_outcome != "N/A"
-                    and investigation_outcome != "Inconclusive - sample not available"
-                    else "Open"
-                ),
-                "handled_by": random.choice([f"QA-{i:02d}" for i in range(1, 11)]),
-                "comments": "",
-            }
-        )
+    df = pd.DataFrame(
+        {
+            "complaint_id": reference(f"COMP-{year}-", np.arange(1, n + 1), 5),
+            "complaint_date": date_strings(complaint_date),
+            "batch_id": batch_id,
+            "category": category,
+            "description": description,
+            "severity": severity,
+            "market": rng.choice(MARKETS, n),
+            "distribution_channel": rng.choice(DISTRIBUTION_CHANNELS, n),
+            "reporter_type": reporter_type,
+            "reporter_contact": reporter_contact,
+            "quantity_affected": np.where(
+                category == "Product Quality", rng.integers(1, 101, n), 1
+            ),
+            # Investigation
+            "investigation_required": np.where(investigated, "Yes", "No"),
+            "investigation_start_date": date_strings(investigation_start),
+            "investigation_complete_date": date_strings(investigation_complete),
+            "root_cause": root_cause,
+            "investigation_outcome": investigation_outcome,
+            # Regulatory
+            "regulatory_reportable": np.where(reportable, "Yes", "No"),
+            "report_submitted": report_submitted,
+            "report_date": date_strings(report_date),
+            # Actions
+            "capa_reference": capa_reference,
+            "batch_recall_required": np.where(
+                (severity == "Critical")
+                & (investigation_outcome == "Confirmed - systemic issue"),
+                "Yes",
+                "No",
+            ),
+            # Response
+            "initial_response_date": date_strings(response_date),
+            "customer_satisfaction": customer_satisfaction,
+            "complaint_status": np.where(
+                (investigation_outcome != "N/A")
+                & (investigation_outcome != "Inconclusive - sample not available"),
+                "Closed",
+                "Open",
+            ),
+            "handled_by": rng.choice(HANDLERS, n),
+            "comments": "",
+        }
+    )
 
-    df = pd.DataFrame(records)
+    df = df.astype(
+        {
+            **category_dtypes(CATEGORY_COLUMNS),
+            "quantity_affected": "int32",
+        }
+    )
     df.to_csv(f"{OUTPUT_DIR}customer_complaints_{year}.csv", index=False)
     print(f"   ✓ Generated {len(df):,} customer complaint records")
     return df
@@ -272,15 +317,12 @@ if __name__ == "__main__":
     print("Customer Complaints & Market Feedback")
     print("=" * 70)
 
-    all_comp = []
-    for year in YEARS:
-        df = generate_complaints_data(year)
-        if df is not None:
-            all_comp.append(df)
+    total = write_combined_parquet(
+        map_years(generate_complaints_data, YEARS),
+        f"{OUTPUT_DIR}customer_complaints_ALL.parquet",
+    )
 
-    if all_comp:
-        combined = pd.concat(all_comp, ignore_index=True)
-        combined.to_csv(f"{OUTPUT_DIR}customer_complaints_ALL.csv", index=False)
+    if total:
         print(
-            f"\n✅ Combined file: customer_complaints_ALL.csv ({len(combined):,} records)"
+            f"\n✅ Combined file: customer_complaints_ALL.parquet ({total:,} records)"
         )
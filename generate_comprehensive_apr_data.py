@@ -22,16 +22,16 @@ Date: January 2026
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
+import pyarrow.parquet as pq
 import os
 
-# Set seeds for reproducibility
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from generator_common import (
+    year_rng,
+    category_dtypes,
+    date_strings,
+    map_years,
+    write_combined_parquet,
+)
 
 # =============================================================================
 # CONFIGURATION
@@ -44,6 +44,54 @@ GRANULATORS = ["Gran-01", "Gran-02"]
 DRYERS = ["FBD-01", "FBD-02", "FBD-03"]
 BLENDERS = ["Blend-01", "Blend-02"]
 COATING_MACHINES = ["Coat-01", "Coat-02"]
+# Shift -> (share of batches, possible start hours)
+SHIFTS = {
+    "Day": (0.5, range(6, 14)),
+    "Evening": (0.35, range(14, 22)),
+    "Night": (0.15, [22, 23, 0, 1, 2, 3, 4, 5]),
+}
+# Every (shift, start hour) slot, hours equally likely within a shift, so
+# both are picked with a single draw
+SHIFT_SLOTS = np.array([shift for shift, (_, hours) in SHIFTS.items() for _ in hours])
+SLOT_START_HOURS = np.array([hour for _, hours in SHIFTS.values() for hour in hours])
+SLOT_WEIGHTS = np.array(
+    [weight / len(hours) for weight, hours in SHIFTS.values() for _ in hours]
+)
+
+# Scenario windows: Press-A drift builds up from 2021-09-01, Press-B drifts
+# over 2025-08-01..15
+PRESS_A_DRIFT_START = pd.Timestamp(2021, 9, 1)
+PRESS_B_DRIFT_START = pd.Timestamp(2025, 8, 1)
+PRESS_B_DRIFT_END = pd.Timestamp(2025, 8, 15)
+REJECT_REASONS = ["Weight", "Capping", "Sticking", "Chipping", "None"]
+DOWNTIME_REASONS = [
+    "Equipment adjustment",
+    "Tool change",
+    "Material shortage",
+    "Cleaning",
+]
+
+# IPC check results, indexed by whether the check passed
+IPC_RESULTS = ["Fail", "Pass"]
+
+CATEGORY_COLUMNS = [
+    "product_name",
+    "product_code",
+    "shift",
+    "operator_primary",
+    "operator_secondary",
+    "granulator_id",
+    "dryer_id",
+    "blender_id",
+    "tablet_press_id",
+    "ipc_weight_check",
+    "ipc_hardness_check",
+    "ipc_thickness_check",
+    "ipc_friability_check",
+    "ipc_disintegration_check",
+    "reject_reason",
+    "downtime_reason",
+]
 
 OUTPUT_DIR = (
     os.path.join(os.path.dirname(os.path.abspath(__file__)), "apr_data") + os.sep
@@ -54,6 +102,24 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # =============================================================================
 # PART 1: EXTENDED MANUFACTURING DATA
 # =============================================================================
+def _normal(
+    rng: np.random.Generator, mean: float, std: float, n: int, decimals: int
+) -> np.ndarray:
+    """n normal draws rounded to the recorded precision"""
+    return rng.normal(mean, std, n).round(decimals)
+
+
+def _pass_fail(passed: np.ndarray) -> pd.Categorical:
+    """Pass/Fail labels for a boolean check, as category codes"""
+    return pd.Categorical.from_codes(passed.astype(np.int8), IPC_RESULTS)
+
+
+def _time_strings(times) -> np.ndarray:
+    """HH:MM strings for a datetime column, cut from its ISO form"""
+    minutes = np.asarray(times, dtype="datetime64[m]").astype(np.str_)
+    return np.strings.slice(minutes, 11, 16)
+
+
 def generate_extended_manufacturing_data(year: int):
     """
     Generate comprehensive batch manufacturing records with:
@@ -62,290 +128,266 @@ def generate_extended_manufacturing_data(year: int):
     - Equipment used
     - In-process controls
     - Timing data
+
+    Every parameter is drawn for the whole year at once, one array per column.
     """
     print(f"\n📦 Generating Extended Manufacturing Data for {year}...")
+    rng = year_rng(year)
+
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+
+    # Reduced batches during COVID (2020 March-May)
+    daily_batches = np.full(len(days), BATCHES_PER_DAY)
+    if year == 2020:
+        covid = days.month.isin([3, 4, 5])
+        daily_batches[covid] = rng.integers(12, 17, covid.sum())
+
+    # One entry per batch from here on
+    batch_day = pd.Series(days.repeat(daily_batches))
+    n = len(batch_day)
+    month = batch_day.dt.month.to_numpy()
+    batch_number = np.strings.zfill(np.arange(1, n + 1).astype(np.str_), 4)
+    batch_id = np.strings.add(f"PARA-{str(year)[-2:]}-", batch_number)
+
+    # Shift assignment (Day: 6-14, Evening: 14-22, Night: 22-6)
+    slot = rng.choice(len(SHIFT_SLOTS), n, p=SLOT_WEIGHTS)
+    shift = SHIFT_SLOTS[slot]
+    start_hour = SLOT_START_HOURS[slot]
+    mfg_start = (
+        batch_day
+        + pd.to_timedelta(start_hour, unit="h")
+        + pd.to_timedelta(rng.integers(0, 60, n), unit="min")
+    )
 
-    start_date = datetime(year, 1, 1)
-    end_date = datetime(year, 12, 31)
-    total_days = (end_date - start_date).days + 1
-
-    records = []
-    batch_index = 1
-
-    for day_offset in range(total_days):
-        current_date = start_date + timedelta(days=day_offset)
-        current_month = current_date.month
-
-        # Reduced batches during COVID (2020 March-May)
-        if year == 2020 and current_month in [3, 4, 5]:
-            daily_batches = random.randint(12, 16)
-        else:
-            daily_batches = BATCHES_PER_DAY
-
-        for _ in range(daily_batches):
-            batch_id = f"PARA-{str(year)[-2:]}-{batch_index:04d}"
-
-            # Shift assignment (Day: 6-14, Evening: 14-22, Night: 22-6)
-            shift = random.choices(
-                ["Day", "Evening", "Night"], weights=[0.5, 0.35, 0.15]
-            )[0]
-            if shift == "Day":
-                start_hour = random.randint(6, 13)
-            elif shift == "Evening":
-                start_hour = random.randint(14, 21)
-            else:
-                start_hour = random.choice([22, 23, 0, 1, 2, 3, 4, 5])
-
-            mfg_start = current_date.replace(
-                hour=start_hour, minute=random.randint(0, 59)
-            )
-
-            # Equipment assignment
-            tablet_press = random.choice(MACHINES)
-            granulator = random.choice(GRANULATORS)
-            dryer = random.choice(DRYERS)
-            blender = random.choice(BLENDERS)
-
-            # Operator assignment
-            operator_primary = random.choice(OPERATORS)
-            operator_secondary = random.choice(
-                [op for op in OPERATORS if op != operator_primary]
-            )
-
-            # =====================================================
-            # DISPENSING PARAMETERS
-            # =====================================================
-            api_weight_kg = round(np.random.normal(50.0, 0.5), 3)  # Target: 50kg
-            excipient_weight_kg = round(np.random.normal(45.0, 0.4), 3)
-
-            # =====================================================
-            # GRANULATION PARAMETERS (Wet Granulation)
-            # =====================================================
-            granulation_mixing_time_min = round(np.random.normal(15.0, 1.0), 2)
-            binder_solution_volume_ml = round(np.random.normal(2500, 100), 1)
-            binder_addition_rate_ml_min = round(np.random.normal(50, 5), 2)
-            impeller_speed_rpm = round(np.random.normal(150, 10), 0)
-            chopper_speed_rpm = round(np.random.normal(1500, 100), 0)
-            granulation_endpoint_power_kw = round(np.random.normal(2.5, 0.3), 2)
-            granulation_temperature_c = round(np.random.normal(28, 2), 1)
-
-            # =====================================================
-            # DRYING PARAMETERS (Fluid Bed Dryer)
-            # =====================================================
-            inlet_air_temp_c = round(np.random.normal(60, 2), 1)
-            outlet_air_temp_c = round(np.random.normal(40, 2), 1)
-            drying_time_min = round(np.random.normal(45, 5), 1)
-            final_moisture_content_percent = round(np.random.normal(2.0, 0.3), 2)
-            airflow_rate_cfm = round(np.random.normal(800, 50), 0)
-
-            # 2024 Summer scenario - higher drying temps
-            if year == 2024 and current_month in [7, 8]:
-                inlet_air_temp_c = round(np.random.normal(63, 3), 1)
-                outlet_air_temp_c = round(np.random.normal(43, 2), 1)
-
-            # =====================================================
-            # MILLING PARAMETERS
-            # =====================================================
-            mill_screen_size_mm = random.choice([0.8, 1.0, 1.5])
-            mill_speed_rpm = round(np.random.normal(1200, 100), 0)
-            milling_time_min = round(np.random.normal(20, 3), 1)
-
-            # =====================================================
-            # BLENDING PARAMETERS
-            # =====================================================
-            blending_time_min = round(np.random.normal(20, 2), 1)
-            blender_speed_rpm = round(np.random.normal(12, 1), 1)
-            lubricant_blending_time_min = round(np.random.normal(3, 0.3), 2)
-            blend_uniformity_rsd_percent = round(np.random.normal(2.5, 0.5), 2)
-
-            # =====================================================
-            # COMPRESSION PARAMETERS
-            # =====================================================
-            compression_force_main_kn = round(np.random.normal(18.0, 1.5), 2)
-            compression_force_pre_kn = round(np.random.normal(3.0, 0.3), 2)
-            turret_speed_rpm = round(np.random.normal(45, 3), 1)
-            feeder_speed_rpm = round(np.random.normal(25, 2), 1)
-            tablet_weight_mg = round(np.random.normal(500, 5), 1)
-            tablet_thickness_mm = round(np.random.normal(4.5, 0.1), 2)
-            tablet_hardness_n = round(np.random.normal(120, 10), 1)
-            friability_percent = round(np.random.exponential(0.3), 3)
-            disintegration_time_min = round(np.random.normal(8, 2), 1)
-
-            # 2021 Press-A drift scenario
-            if (
-                year == 2021
-                and current_month in [9, 10, 11]
-                and tablet_press == "Press-A"
-            ):
-                day_in_period = (current_date - datetime(2021, 9, 1)).days
-                force_increase = min(day_in_period * 0.03, 3.0)
-                compression_force_main_kn = round(
-                    np.random.normal(18.0 + force_increase, 1.5), 2
-                )
-
-            # 2025 Press-B drift (August 1-15)
-            if (
-                year == 2025
-                and current_date >= datetime(2025, 8, 1)
-                and current_date <= datetime(2025, 8, 15)
-                and tablet_press == "Press-B"
-            ):
-                compression_force_main_kn = round(np.random.normal(22.0, 1.0), 2)
-
-            # =====================================================
-            # IN-PROCESS CONTROLS (IPC)
-            # =====================================================
-            ipc_weight_check_pass = (
-                "Pass" if abs(tablet_weight_mg - 500) < 25 else "Fail"
-            )
-            ipc_hardness_check_pass = (
-                "Pass" if 100 <= tablet_hardness_n <= 150 else "Fail"
-            )
-            ipc_thickness_check_pass = (
-                "Pass" if 4.2 <= tablet_thickness_mm <= 4.8 else "Fail"
-            )
-            ipc_friability_check_pass = "Pass" if friability_percent < 1.0 else "Fail"
-            ipc_disintegration_check_pass = (
-                "Pass" if disintegration_time_min < 15 else "Fail"
-            )
-
-            # =====================================================
-            # YIELD CALCULATIONS
-            # =====================================================
-            theoretical_yield_tablets = int(
-                (api_weight_kg * 1000) / 500 * 1000
-            )  # 500mg tablets
-            actual_yield_tablets = int(
-                theoretical_yield_tablets * np.random.normal(0.985, 0.01)
-            )
-            yield_percent = round(
-                (actual_yield_tablets / theoretical_yield_tablets) * 100, 2
-            )
-            yield_percent = max(90.0, min(100.0, yield_percent))
-
-            # Rejects during compression
-            reject_count = int(np.random.exponential(50))
-            reject_reason = random.choice(
-                ["Weight", "Capping", "Sticking", "Chipping", "None"]
-            )
-            if reject_count < 10:
-                reject_reason = "None"
-
-            # =====================================================
-            # TIMING DATA
-            # =====================================================
-            total_process_time_hours = round(np.random.normal(8, 1), 2)
-            mfg_end = mfg_start + timedelta(hours=total_process_time_hours)
-
-            # Downtime events
-            downtime_minutes = (
-                round(np.random.exponential(15), 1) if random.random() < 0.2 else 0
-            )
-            downtime_reason = (
-                random.choice(
-                    [
-                        "Equipment adjustment",
-                        "Tool change",
-                        "Material shortage",
-                        "Cleaning",
-                    ]
-                )
-                if downtime_minutes > 0
-                else "None"
-            )
-
-            # =====================================================
-            # ENVIRONMENTAL CONDITIONS
-            # =====================================================
-            room_temperature_c = round(np.random.normal(22, 1), 1)
-            room_humidity_percent = round(np.random.normal(45, 5), 1)
-            differential_pressure_pa = round(np.random.normal(15, 2), 1)
-
-            # =====================================================
-            # BUILD RECORD
-            # =====================================================
-            records.append(
-                {
-                    # Identifiers
-                    "batch_id": batch_id,
-                    "product_name": "Paracetamol 500mg Tablets",
-                    "product_code": "PARA-500-TAB",
-                    "batch_size_kg": round(api_weight_kg + excipient_weight_kg, 3),
-                    # Timing
-                    "manufacturing_date": mfg_start.strftime("%Y-%m-%d"),
-                    "manufacturing_start_time": mfg_start.strftime("%H:%M"),
-                    "manufacturing_end_time": mfg_end.strftime("%H:%M"),
-                    "shift": shift,
-                    "total_process_time_hours": total_process_time_hours,
-                    # Personnel
-                    "operator_primary": operator_primary,
-                    "operator_secondary": operator_secondary,
-                    # Equipment
-                    "granulator_id": granulator,
-                    "dryer_id": dryer,
-                    "blender_id": blender,
-                    "tablet_press_id": tablet_press,
-                    # Dispensing
-                    "api_weight_kg": api_weight_kg,
-                    "excipient_weight_kg": excipient_weight_kg,
-                    # Granulation
-                    "granulation_mixing_time_min": granulation_mixing_time_min,
-                    "binder_solution_volume_ml": binder_solution_volume_ml,
-                    "binder_addition_rate_ml_min": binder_addition_rate_ml_min,
-                    "impeller_speed_rpm": impeller_speed_rpm,
-                    "chopper_speed_rpm": chopper_speed_rpm,
-                    "granulation_endpoint_power_kw": granulation_endpoint_power_kw,
-                    "granulation_temperature_c": granulation_temperature_c,
-                    # Drying
-                    "inlet_air_temp_c": inlet_air_temp_c,
-                    "outlet_air_temp_c": outlet_air_temp_c,
-                    "drying_time_min": drying_time_min,
-                    "final_moisture_content_percent": final_moisture_content_percent,
-                    "airflow_rate_cfm": airflow_rate_cfm,
-                    # Milling
-                    "mill_screen_size_mm": mill_screen_size_mm,
-                    "mill_speed_rpm": mill_speed_rpm,
-                    "milling_time_min": milling_time_min,
-                    # Blending
-                    "blending_time_min": blending_time_min,
-                    "blender_speed_rpm": blender_speed_rpm,
-                    "lubricant_blending_time_min": lubricant_blending_time_min,
-                    "blend_uniformity_rsd_percent": blend_uniformity_rsd_percent,
-                    # Compression
-                    "compression_force_main_kn": compression_force_main_kn,
-                    "compression_force_pre_kn": compression_force_pre_kn,
-                    "turret_speed_rpm": turret_speed_rpm,
-                    "feeder_speed_rpm": feeder_speed_rpm,
-                    "tablet_weight_mg": tablet_weight_mg,
-                    "tablet_thickness_mm": tablet_thickness_mm,
-                    "tablet_hardness_n": tablet_hardness_n,
-                    "friability_percent": friability_percent,
-                    "disintegration_time_min": disintegration_time_min,
-                    # IPC Results
-                    "ipc_weight_check": ipc_weight_check_pass,
-                    "ipc_hardness_check": ipc_hardness_check_pass,
-                    "ipc_thickness_check": ipc_thickness_check_pass,
-                    "ipc_friability_check": ipc_friability_check_pass,
-                    "ipc_disintegration_check": ipc_disintegration_check_pass,
-                    # Yield
-                    "theoretical_yield_tablets": theoretical_yield_tablets,
-                    "actual_yield_tablets": actual_yield_tablets,
-                    "yield_percent": yield_percent,
-                    "reject_count": reject_count,
-                    "reject_reason": reject_reason,
-                    # Downtime
-                    "downtime_minutes": downtime_minutes,
-                    "downtime_reason": downtime_reason,
-                    # Environment
-                    "room_temperature_c": room_temperature_c,
-                    "room_humidity_percent": room_humidity_percent,
-                    "differential_pressure_pa": differential_pressure_pa,
-                }
-            )
-
-            batch_index += 1
-
-    df = pd.DataFrame(records)
+    # Equipment assignment
+    tablet_press = rng.choice(MACHINES, n)
+    granulator = rng.choice(GRANULATORS, n)
+    dryer = rng.choice(DRYERS, n)
+    blender = rng.choice(BLENDERS, n)
+
+    # Operator assignment: the secondary is any operator but the primary
+    primary_idx = rng.integers(0, len(OPERATORS), n)
+    secondary_idx = rng.integers(0, len(OPERATORS) - 1, n)
+    secondary_idx += secondary_idx >= primary_idx
+    operators = np.array(OPERATORS)
+
+    # =====================================================
+    # DISPENSING PARAMETERS
+    # =====================================================
+    api_weight_kg = _normal(rng, 50.0, 0.5, n, 3)  # Target: 50kg
+    excipient_weight_kg = _normal(rng, 45.0, 0.4, n, 3)
+
+    # =====================================================
+    # GRANULATION PARAMETERS (Wet Granulation)
+    # =====================================================
+    granulation_mixing_time_min = _normal(rng, 15.0, 1.0, n, 2)
+    binder_solution_volume_ml = _normal(rng, 2500, 100, n, 1)
+    binder_addition_rate_ml_min = _normal(rng, 50, 5, n, 2)
+    impeller_speed_rpm = _normal(rng, 150, 10, n, 0)
+    chopper_speed_rpm = _normal(rng, 1500, 100, n, 0)
+    granulation_endpoint_power_kw = _normal(rng, 2.5, 0.3, n, 2)
+    granulation_temperature_c = _normal(rng, 28, 2, n, 1)
+
+    # =====================================================
+    # DRYING PARAMETERS (Fluid Bed Dryer)
+    # =====================================================
+    inlet_air_temp_c = _normal(rng, 60, 2, n, 1)
+    outlet_air_temp_c = _normal(rng, 40, 2, n, 1)
+    drying_time_min = _normal(rng, 45, 5, n, 1)
+    final_moisture_content_percent = _normal(rng, 2.0, 0.3, n, 2)
+    airflow_rate_cfm = _normal(rng, 800, 50, n, 0)
+
+    # 2024 Summer scenario - higher drying temps
+    if year == 2024:
+        summer = np.isin(month, [7, 8])
+        inlet_air_temp_c[summer] = _normal(rng, 63, 3, summer.sum(), 1)
+        outlet_air_temp_c[summer] = _normal(rng, 43, 2, summer.sum(), 1)
+
+    # =====================================================
+    # MILLING PARAMETERS
+    # =====================================================
+    mill_screen_size_mm = rng.choice([0.8, 1.0, 1.5], n)
+    mill_speed_rpm = _normal(rng, 1200, 100, n, 0)
+    milling_time_min = _normal(rng, 20, 3, n, 1)
+
+    # =====================================================
+    # BLENDING PARAMETERS
+    # =====================================================
+    blending_time_min = _normal(rng, 20, 2, n, 1)
+    blender_speed_rpm = _normal(rng, 12, 1, n, 1)
+    lubricant_blending_time_min = _normal(rng, 3, 0.3, n, 2)
+    blend_uniformity_rsd_percent = _normal(rng, 2.5, 0.5, n, 2)
+
+    # =====================================================
+    # COMPRESSION PARAMETERS
+    # =====================================================
+    compression_force_main_kn = _normal(rng, 18.0, 1.5, n, 2)
+    compression_force_pre_kn = _normal(rng, 3.0, 0.3, n, 2)
+    turret_speed_rpm = _normal(rng, 45, 3, n, 1)
+    feeder_speed_rpm = _normal(rng, 25, 2, n, 1)
+    tablet_weight_mg = _normal(rng, 500, 5, n, 1)
+    tablet_thickness_mm = _normal(rng, 4.5, 0.1, n, 2)
+    tablet_hardness_n = _normal(rng, 120, 10, n, 1)
+    friability_percent = rng.exponential(0.3, n).round(3)
+    disintegration_time_min = _normal(rng, 8, 2, n, 1)
+
+    # 2021 Press-A drift scenario
+    if year == 2021:
+        drift = np.isin(month, [9, 10, 11]) & (tablet_press == "Press-A")
+        day_in_period = (batch_day[drift] - PRESS_A_DRIFT_START).dt.days.to_numpy()
+        force_increase = np.minimum(day_in_period * 0.03, 3.0)
+        compression_force_main_kn[drift] = rng.normal(
+            18.0 + force_increase, 1.5
+        ).round(2)
+
+    # 2025 Press-B drift (August 1-15)
+    if year == 2025:
+        in_window = batch_day.between(PRESS_B_DRIFT_START, PRESS_B_DRIFT_END)
+        drift = in_window.to_numpy() & (tablet_press == "Press-B")
+        compression_force_main_kn[drift] = _normal(rng, 22.0, 1.0, drift.sum(), 2)
+
+    # =====================================================
+    # IN-PROCESS CONTROLS (IPC)
+    # =====================================================
+    # Kept as booleans; Pass/Fail labels are only attached when the frame is built
+    ipc_weight_check_pass = np.abs(tablet_weight_mg - 500) < 25
+    ipc_hardness_check_pass = (tablet_hardness_n >= 100) & (tablet_hardness_n <= 150)
+    ipc_thickness_check_pass = (tablet_thickness_mm >= 4.2) & (
+        tablet_thickness_mm <= 4.8
+    )
+    ipc_friability_check_pass = friability_percent < 1.0
+    ipc_disintegration_check_pass = disintegration_time_min < 15
+
+    # =====================================================
+    # YIELD CALCULATIONS
+    # =====================================================
+    theoretical_yield_tablets = (
+        (api_weight_kg * 1000) / 500 * 1000
+    ).astype(int)  # 500mg tablets
+    actual_yield_tablets = (
+        theoretical_yield_tablets * rng.normal(0.985, 0.01, n)
+    ).astype(int)
+    yield_percent = np.clip(
+        (actual_yield_tablets / theoretical_yield_tablets * 100).round(2), 90.0, 100.0
+    )
+
+    # Rejects during compression
+    reject_count = rng.exponential(50, n).astype(int)
+    reject_reason = np.where(
+        reject_count < 10, "None", rng.choice(REJECT_REASONS, n)
+    )
+
+    # =====================================================
+    # TIMING DATA
+    # =====================================================
+    total_process_time_hours = _normal(rng, 8, 1, n, 2)
+    mfg_end = mfg_start + pd.to_timedelta(total_process_time_hours, unit="h")
+
+    # Downtime events
+    downtime_minutes = np.where(
+        rng.random(n) < 0.2, rng.exponential(15, n).round(1), 0
+    )
+    downtime_reason = np.where(
+        downtime_minutes > 0, rng.choice(DOWNTIME_REASONS, n), "None"
+    )
+
+    # =====================================================
+    # ENVIRONMENTAL CONDITIONS
+    # =====================================================
+    room_temperature_c = _normal(rng, 22, 1, n, 1)
+    room_humidity_percent = _normal(rng, 45, 5, n, 1)
+    differential_pressure_pa = _normal(rng, 15, 2, n, 1)
+
+    # =====================================================
+    # BUILD RECORDS
+    # =====================================================
+    df = pd.DataFrame(
+        {
+            # Identifiers
+            "batch_id": batch_id,
+            "product_name": "Paracetamol 500mg Tablets",
+            "product_code": "PARA-500-TAB",
+            "batch_size_kg": (api_weight_kg + excipient_weight_kg).round(3),
+            # Timing
+            "manufacturing_date": date_strings(mfg_start),
+            "manufacturing_start_time": _time_strings(mfg_start),
+            "manufacturing_end_time": _time_strings(mfg_end),
+            "shift": shift,
+            "total_process_time_hours": total_process_time_hours,
+            # Personnel
+            "operator_primary": operators[primary_idx],
+            "operator_secondary": operators[secondary_idx],
+            # Equipment
+            "granulator_id": granulator,
+            "dryer_id": dryer,
+            "blender_id": blender,
+            "tablet_press_id": tablet_press,
+            # Dispensing
+            "api_weight_kg": api_weight_kg,
+            "excipient_weight_kg": excipient_weight_kg,
+            # Granulation
+            "granulation_mixing_time_min": granulation_mixing_time_min,
+            "binder_solution_volume_ml": binder_solution_volume_ml,
+            "binder_addition_rate_ml_min": binder_addition_rate_ml_min,
+            "impeller_speed_rpm": impeller_speed_rpm,
+            "chopper_speed_rpm": chopper_speed_rpm,
+            "granulation_endpoint_power_kw": granulation_endpoint_power_kw,
+            "granulation_temperature_c": granulation_temperature_c,
+            # Drying
+            "inlet_air_temp_c": inlet_air_temp_c,
+            "outlet_air_temp_c": outlet_air_temp_c,
+            "drying_time_min": drying_time_min,
+            "final_moisture_content_percent": final_moisture_content_percent,
+            "airflow_rate_cfm": airflow_rate_cfm,
+            # Milling
+            "mill_screen_size_mm": mill_screen_size_mm,
+            "mill_speed_rpm": mill_speed_rpm,
+            "milling_time_min": milling_time_min,
+            # Blending
+            "blending_time_min": blending_time_min,
+            "blender_speed_rpm": blender_speed_rpm,
+            "lubricant_blending_time_min": lubricant_blending_time_min,
+            "blend_uniformity_rsd_percent": blend_uniformity_rsd_percent,
+            # Compression
+            "compression_force_main_kn": compression_force_main_kn,
+            "compression_force_pre_kn": compression_force_pre_kn,
+            "turret_speed_rpm": turret_speed_rpm,
+            "feeder_speed_rpm": feeder_speed_rpm,
+            "tablet_weight_mg": tablet_weight_mg,
+            "tablet_thickness_mm": tablet_thickness_mm,
+            "tablet_hardness_n": tablet_hardness_n,
+            "friability_percent": friability_percent,
+            "disintegration_time_min": disintegration_time_min,
+            # IPC Results
+            "ipc_weight_check": _pass_fail(ipc_weight_check_pass),
+            "ipc_hardness_check": _pass_fail(ipc_hardness_check_pass),
+            "ipc_thickness_check": _pass_fail(ipc_thickness_check_pass),
+            "ipc_friability_check": _pass_fail(ipc_friability_check_pass),
+            "ipc_disintegration_check": _pass_fail(ipc_disintegration_check_pass),
+            # Yield
+            "theoretical_yield_tablets": theoretical_yield_tablets,
+            "actual_yield_tablets": actual_yield_tablets,
+            "yield_percent": yield_percent,
+            "reject_count": reject_count,
+            "reject_reason": reject_reason,
+            # Downtime
+            "downtime_minutes": downtime_minutes,
+            "downtime_reason": downtime_reason,
+            # Environment
+            "room_temperature_c": room_temperature_c,
+            "room_humidity_percent": room_humidity_percent,
+            "differential_pressure_pa": differential_pressure_pa,
+        }
+    )
+    # Measurements are recorded to at most three decimals and counts stay far
+    # below 2**31, so single precision and 32-bit integers hold them as written
+    df = df.astype(
+        {
+            **category_dtypes(CATEGORY_COLUMNS),
+            **{column: "float32" for column in df.select_dtypes("float64")},
+            **{column: "int32" for column in df.select_dtypes("int64")},
+        }
+    )
     df.to_csv(f"{OUTPUT_DIR}manufacturing_extended_{year}.csv", index=False)
     print(
         f"   ✓ Generated {len(df):,} extended manufacturing records ({len(df.columns)} columns)"
@@ -362,15 +404,12 @@ if __name__ == "__main__":
     print("Extended Manufacturing Data")
     print("=" * 70)
 
-    all_mfg = []
-    for year in YEARS:
-        df = generate_extended_manufacturing_data(year)
-        all_mfg.append(df)
+    path = f"{OUTPUT_DIR}manufacturing_extended_ALL.parquet"
+    total = write_combined_parquet(
+        map_years(generate_extended_manufacturing_data, YEARS), path
+    )
 
-    # Combine all years
-    combined = pd.concat(all_mfg, ignore_index=True)
-    combined.to_csv(f"{OUTPUT_DIR}manufacturing_extended_ALL.csv", index=False)
     print(
-        f"\n✅ Combined file: manufacturing_extended_ALL.csv ({len(combined):,} records)"
+        f"\n✅ Combined file: manufacturing_extended_ALL.parquet ({total:,} records)"
     )
-    print(f"   Columns: {len(combined.columns)}")
+    print(f"   Columns: {pq.read_metadata(path).num_columns}")
@@ -6,15 +6,17 @@ Clean room monitoring: viable and non-viable particles, temperature, humidity.
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
+import pyarrow as pa
+import pyarrow.csv as pv
 import os
 
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from generator_common import (
+    year_rng,
+    category_dtypes,
+    date_strings,
+    reference,
+    write_combined_parquet,
+)
 
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
 OUTPUT_DIR = (
@@ -38,6 +40,68 @@ ROOMS = {
 
 # Sampling locations within rooms
 SAMPLING_POINTS = ["SP-01", "SP-02", "SP-03", "SP-04", "SP-05"]
+# Morning and afternoon sampling rounds
+SAMPLE_TIMES = ["09:00", "14:00"]
+
+# ISO class -> limits for 0.5µm and 5.0µm particles (per m³), viable (CFU/m³)
+CLASS_LIMITS = {
+    "ISO 7": (352000, 2930, 10),
+    "ISO 8": (3520000, 29300, 100),
+    "Controlled": (10000000, 100000, 200),
+}
+# The same limits per room, one row per room code in ROOMS order
+ROOM_LIMITS = np.array(
+    [CLASS_LIMITS[info["class"]] for info in ROOMS.values()], dtype=np.int64
+)
+
+TECHNICIANS = [f"ENV-{i:02d}" for i in range(1, 11)]
+
+# Readings are recorded to one decimal; written as this decimal type they
+# keep their trailing .0 in the CSV, as pandas writes them
+READING_TYPE = pa.decimal128(9, 1)
+
+# Check results, indexed by whether the check passed; viable counts are
+# tiered, and a record with any failed check gets an investigation comment
+RESULTS = ["Excursion", "Pass"]
+VIABLE_RESULTS = ["Pass", "Alert", "Action"]
+COMMENTS = ["Investigation initiated", ""]
+
+CATEGORY_COLUMNS = [
+    "temp_spec",
+    "humidity_spec",
+    "pressure_spec",
+]
+
+
+def _coded(codes: np.ndarray, labels: list) -> pd.Categorical:
+    """Labels for an array of codes (or a boolean check), as a categorical"""
+    return pd.Categorical.from_codes(codes.astype(np.int8), labels)
+
+
+def _room_attribute(room_idx: np.ndarray, field: str) -> pd.Categorical:
+    """A ROOMS field for each record, coded over the field's distinct values"""
+    values = [info[field] for info in ROOMS.values()]
+    categories = list(dict.fromkeys(values))
+    codes = np.array([categories.index(value) for value in values])
+    return pd.Categorical.from_codes(codes[room_idx], categories)
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """
+    Write df as CSV with pyarrow's multithreaded writer, byte for byte what
+    df.to_csv(path, index=False) writes: plain header, no quoting (values
+    never contain commas or quotes; the writer raises if one does).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type):
+            table = table.set_column(i, field.name, table[i].cast(READING_TYPE))
+
+    with open(path, "wb") as f:
+        f.write((",".join(df.columns) + "\n").encode())
+        pv.write_csv(
+            table, f, pv.WriteOptions(include_header=False, quoting_style="none")
+        )
 
 
 def generate_environmental_data(year: int):
@@ -47,156 +111,127 @@ def generate_environmental_data(year: int):
     - Viable air sampling (settle plates, active air)
     - Temperature and humidity
     - Differential pressure
+
+    The sampling plan is laid out first; every measurement is then drawn for
+    the whole year at once, one array per column.
     """
     print(f"\n🌡️ Generating Environmental Monitoring Data for {year}...")
-
-    start_date = datetime(year, 1, 1)
-    end_date = datetime(year, 12, 31)
-
-    records = []
-    record_id = 1
-
-    current_date = start_date
-    while current_date <= end_date:
-        # Environmental monitoring typically done during production shifts
-        for room_code, room_info in ROOMS.items():
-            # Number of sampling points per room
-            num_points = random.randint(2, 4)
-            selected_points = random.sample(SAMPLING_POINTS, num_points)
-
-            for sp in selected_points:
-                # Sample time (typically morning and afternoon)
-                sample_times = (
-                    ["09:00", "14:00"] if random.random() > 0.3 else ["09:00"]
-                )
-
-                for sample_time in sample_times:
-                    # ISO class limits
-                    if room_info["class"] == "ISO 7":
-                        limit_05um = 352000
-                        limit_50um = 2930
-                        limit_viable = 10  # CFU/m³
-                    elif room_info["class"] == "ISO 8":
-                        limit_05um = 3520000
-                        limit_50um = 29300
-                        limit_viable = 100
-                    else:  # Controlled
-                        limit_05um = 10000000
-                        limit_50um = 100000
-                        limit_viable = 200
-
-                    # Generate particle counts (particles/m³)
-                    particles_05um = int(
-                        np.random.lognormal(np.log(limit_05um * 0.3), 0.5)
-                    )
-                    particles_50um = int(
-                        np.random.lognormal(np.log(limit_50um * 0.2), 0.5)
-                    )
-
-                    # Viable counts (CFU/m³ for active air, CFU/plate for settle plates)
-                    viable_active_air = int(np.random.exponential(limit_viable * 0.2))
-                    viable_settle_plate = int(np.random.exponential(3))
-
-                    # Temperature (Spec: 18-25°C typically)
-                    base_temp = 22.0
-                    if year == 2024 and current_date.month in [7, 8]:
-                        base_temp = 24.0  # Summer heat impact
-                    temperature_c = round(np.random.normal(base_temp, 1.0), 1)
-
-                    # Humidity (Spec: 30-65% RH typically)
-                    humidity_percent = round(np.random.normal(45, 8), 1)
-
-                    # Differential pressure (Spec: >10 Pa positive)
-                    diff_pressure_pa = round(np.random.normal(15, 2), 1)
-
-                    # Determine results
-                    particle_05_result = (
-                        "Pass" if particles_05um <= limit_05um else "Excursion"
-                    )
-                    particle_50_result = (
-                        "Pass" if particles_50um <= limit_50um else "Excursion"
-                    )
-                    viable_result = (
-                        "Pass"
-                        if viable_active_air <= limit_viable
-                        else (
-                            "Alert"
-                            if viable_active_air <= limit_viable * 1.5
-                            else "Action"
-                        )
-                    )
-                    temp_result = (
-                        "Pass" if 18.0 <= temperature_c <= 25.0 else "Excursion"
-                    )
-                    humidity_result = (
-                        "Pass" if 30.0 <= humidity_percent <= 65.0 else "Excursion"
-                    )
-                    pressure_result = (
-                        "Pass" if diff_pressure_pa >= 10.0 else "Excursion"
-                    )
-
-                    overall = (
-                        "Pass"
-                        if all(
-                            [
-                                particle_05_result == "Pass",
-                                particle_50_result == "Pass",
-                                viable_result == "Pass",
-                                temp_result == "Pass",
-                                humidity_result == "Pass",
-                                pressure_result == "Pass",
-                            ]
-                        )
-                        else "Excursion"
-                    )
-
-                    records.append(
-                        {
-                            "record_id": f"EM-{year}-{record_id:06d}",
-                            "monitoring_date": current_date.strftime("%Y-%m-%d"),
-                            "monitoring_time": sample_time,
-                            "room_code": room_code,
-                            "room_name": room_info["name"],
-                            "room_classification": room_info["class"],
-                            "room_type": room_info["type"],
-                            "sampling_point": sp,
-                            # Non-viable particles
-                            "particles_05um_per_m3": particles_05um,
-                            "particles_05um_limit": limit_05um,
-                            "particles_05um_result": particle_05_result,
-                            "particles_50um_per_m3": particles_50um,
-                            "particles_50um_limit": limit_50um,
-                            "particles_50um_result": particle_50_result,
-                            # Viable monitoring
-                            "viable_active_air_cfu_m3": viable_active_air,
-                            "viable_active_limit": limit_viable,
-                            "viable_settle_plate_cfu": viable_settle_plate,
-                            "viable_result": viable_result,
-                            # Physical parameters
-                            "temperature_c": temperature_c,
-                            "temp_spec": "18.0 - 25.0°C",
-                            "temp_result": temp_result,
-                            "humidity_percent_rh": humidity_percent,
-                            "humidity_spec": "30.0 - 65.0% RH",
-                            "humidity_result": humidity_result,
-                            "differential_pressure_pa": diff_pressure_pa,
-                            "pressure_spec": "≥10.0 Pa",
-                            "pressure_result": pressure_result,
-                            "overall_result": overall,
-                            "technician_id": random.choice(
-                                [f"ENV-{i:02d}" for i in range(1, 11)]
-                            ),
-                            "comments": (
-                                "" if overall == "Pass" else "Investigation initiated"
-                            ),
-                        }
-                    )
-                    record_id += 1
-
-        current_date += timedelta(days=1)
-
-    df = pd.DataFrame(records)
-    df.to_csv(f"{OUTPUT_DIR}environmental_monitoring_{year}.csv", index=False)
+    rng = year_rng(year)
+
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+
+    # Sampling plan: each day every room gets 2-4 of its sampling points,
+    # each sampled in the morning and usually again in the afternoon.
+    # Room-days run day by day, rooms in order; each takes the first
+    # num_points of a random ordering of the points.
+    room_days = len(days) * len(ROOMS)
+    num_points = rng.integers(2, 5, room_days)
+    point_order = np.argsort(rng.random((room_days, len(SAMPLING_POINTS))), axis=1)
+    sampled = np.arange(len(SAMPLING_POINTS)) < num_points[:, None]
+    point_idx = point_order[sampled]
+    point_room_day = np.repeat(np.arange(room_days), num_points)
+
+    # One record per sampling round: morning, plus afternoon 70% of the time
+    num_times = np.where(rng.random(len(point_idx)) > 0.3, 2, 1)
+    record_point = np.repeat(np.arange(len(point_idx)), num_times)
+    n = len(record_point)
+    time_idx = np.arange(n) - np.repeat(np.cumsum(num_times) - num_times, num_times)
+
+    point_idx = point_idx[record_point]
+    day_idx, room_idx = np.divmod(point_room_day[record_point], len(ROOMS))
+    monitoring_date = days[day_idx]
+
+    # ISO class limits for each record's room
+    limit_05um, limit_50um, limit_viable = ROOM_LIMITS[room_idx].T
+
+    # Particle counts (particles/m³)
+    particles_05um = rng.lognormal(np.log(limit_05um * 0.3), 0.5).astype(int)
+    particles_50um = rng.lognormal(np.log(limit_50um * 0.2), 0.5).astype(int)
+
+    # Viable counts (CFU/m³ for active air, CFU/plate for settle plates)
+    viable_active_air = rng.exponential(limit_viable * 0.2).astype(int)
+    viable_settle_plate = rng.exponential(3, n).astype(int)
+
+    # Temperature (Spec: 18-25°C typically)
+    base_temp = np.full(n, 22.0)
+    if year == 2024:
+        base_temp[monitoring_date.month.isin([7, 8])] = 24.0  # Summer heat impact
+    temperature_c = rng.normal(base_temp, 1.0).round(1)
+
+    # Humidity (Spec: 30-65% RH typically)
+    humidity_percent = rng.normal(45, 8, n).round(1)
+
+    # Differential pressure (Spec: >10 Pa positive)
+    diff_pressure_pa = rng.normal(15, 2, n).round(1)
+
+    # Determine results
+    particle_05_pass = particles_05um <= limit_05um
+    particle_50_pass = particles_50um <= limit_50um
+    viable_pass = viable_active_air <= limit_viable
+    viable_tier = np.select(
+        [viable_pass, viable_active_air <= limit_viable * 1.5], [0, 1], default=2
+    )
+    temp_pass = (temperature_c >= 18.0) & (temperature_c <= 25.0)
+    humidity_pass = (humidity_percent >= 30.0) & (humidity_percent <= 65.0)
+    pressure_pass = diff_pressure_pa >= 10.0
+    overall_pass = (
+        particle_05_pass
+        & particle_50_pass
+        & viable_pass
+        & temp_pass
+        & humidity_pass
+        & pressure_pass
+    )
+
+    df = pd.DataFrame(
+        {
+            "record_id": reference(f"EM-{year}-", np.arange(1, n + 1), 6),
+            "monitoring_date": date_strings(monitoring_date),
+            "monitoring_time": pd.Categorical.from_codes(time_idx, SAMPLE_TIMES),
+            "room_code": pd.Categorical.from_codes(room_idx, list(ROOMS)),
+            "room_name": _room_attribute(room_idx, "name"),
+            "room_classification": _room_attribute(room_idx, "class"),
+            "room_type": _room_attribute(room_idx, "type"),
+            "sampling_point": pd.Categorical.from_codes(point_idx, SAMPLING_POINTS),
+            # Non-viable particles
+            "particles_05um_per_m3": particles_05um,
+            "particles_05um_limit": limit_05um,
+            "particles_05um_result": _coded(particle_05_pass, RESULTS),
+            "particles_50um_per_m3": particles_50um,
+            "particles_50um_limit": limit_50um,
+            "particles_50um_result": _coded(particle_50_pass, RESULTS),
+            # Viable monitoring
+            "viable_active_air_cfu_m3": viable_active_air,
+            "viable_active_limit": limit_viable,
+            "viable_settle_plate_cfu": viable_settle_plate,
+            "viable_result": _coded(viable_tier, VIABLE_RESULTS),
+            # Physical parameters
+            "temperature_c": temperature_c,
+            "temp_spec": "18.0 - 25.0°C",
+            "temp_result": _coded(temp_pass, RESULTS),
+            "humidity_percent_rh": humidity_percent,
+            "humidity_spec": "30.0 - 65.0% RH",
+            "humidity_result": _coded(humidity_pass, RESULTS),
+            "differential_pressure_pa": diff_pressure_pa,
+            "pressure_spec": "≥10.0 Pa",
+            "pressure_result": _coded(pressure_pass, RESULTS),
+            "overall_result": _coded(overall_pass, RESULTS),
+            "technician_id": _coded(
+                rng.integers(0, len(TECHNICIANS), n), TECHNICIANS
+            ),
+            "comments": _coded(overall_pass, COMMENTS),
+        }
+    )
+    # Counts stay far below 2**31 and readings carry one decimal, so 32-bit
+    # integers and single precision hold them as written
+    df = df.astype(
+        {
+            **category_dtypes(CATEGORY_COLUMNS),
+            **{column: "float32" for column in df.select_dtypes("float64")},
+            **{column: "int32" for column in df.select_dtypes("int64")},
+        }
+    )
+    _write_csv(df, f"{OUTPUT_DIR}environmental_monitoring_{year}.csv")
     print(f"   ✓ Generated {len(df):,} environmental monitoring records")
     return df
 
@@ -207,15 +242,12 @@ if __name__ == "__main__":
     print("Environmental Monitoring Data")
     print("=" * 70)
 
-    all_env = []
-    for year in YEARS:
-        df = generate_environmental_data(year)
-        if df is not None:
-            all_env.append(df)
+    total = write_combined_parquet(
+        (generate_environmental_data(year) for year in YEARS),
+        f"{OUTPUT_DIR}environmental_monitoring_ALL.parquet",
+    )
 
-    if all_env:
-        combined = pd.concat(all_env, ignore_index=True)
-        combined.to_csv(f"{OUTPUT_DIR}environmental_monitoring_ALL.csv", index=False)
+    if total:
         print(
-            f"\n✅ Combined file: environmental_monitoring_ALL.csv ({len(combined):,} records)"
+            f"\n✅ Combined file: environmental_monitoring_ALL.parquet ({total:,} records)"
         )
@@ -5,6 +5,7 @@ Overview of all generated datasets and hidden scenarios documentation.
 """
 
 import pandas as pd
+import pyarrow.parquet as pq
 import os
 from datetime import datetime
 
@@ -25,8 +26,10 @@ def generate_data_summary():
 
     datasets = []
 
-    # List all CSV files
-    files = sorted([f for f in os.listdir(OUTPUT_DIR) if f.endswith(".csv")])
+    # List all data files: yearly CSVs plus the Parquet/CSV combined files
+    files = sorted(
+        f for f in os.listdir(OUTPUT_DIR) if f.endswith((".csv", ".parquet"))
+    )
 
     total_records = 0
     total_columns = 0
@@ -36,9 +39,14 @@ def generate_data_summary():
 
     for f in files:
         filepath = os.path.join(OUTPUT_DIR, f)
-        df = pd.read_csv(filepath)
-        records = len(df)
-        columns = len(df.columns)
+        if f.endswith(".parquet"):
+            # Row/column counts come from the footer; no data pages are read
+            metadata = pq.read_metadata(filepath)
+            records, columns = metadata.num_rows, metadata.num_columns
+        else:
+            df = pd.read_csv(filepath)
+            records = len(df)
+            columns = len(df.columns)
         size_mb = os.path.getsize(filepath) / (1024 * 1024)
 
         total_records += records
@@ -345,13 +353,14 @@ The data contains embedded scenarios for AI to detect:
 ```python
 import pandas as pd
 
-# Load all data for a specific year
-mfg_2024 = pd.read_csv('apr_data/manufacturing_extended_2024.csv')
-qc_2024 = pd.read_csv('apr_data/qc_extended_2024.csv')
+# Load all data for a specific year (files are grouped by theme)
+mfg_2024 = pd.read_csv('apr_data/manufacturing/manufacturing_extended_2024.csv')
+qc_2024 = pd.read_csv('apr_data/quality/qc_lab_extended_2024.csv')
 
-# Load combined multi-year data
-all_mfg = pd.read_csv('apr_data/manufacturing_extended_ALL.csv')
-all_qc = pd.read_csv('apr_data/qc_extended_ALL.csv')
+# Load combined multi-year data: manufacturing, complaints, CAPA, release and
+# environmental are combined as Parquet, the other datasets as CSV
+all_mfg = pd.read_parquet('apr_data/manufacturing/manufacturing_extended_ALL.parquet')
+all_qc = pd.read_csv('apr_data/quality/qc_lab_extended_ALL.csv')
 ```
 
 ## Generation Date
@@ -0,0 +1,100 @@
+"""
+NYOS APR - Shared Generator Helpers
+===================================
+Building blocks shared by the generate_*_data.py scripts.
+
+Yearly CSVs are what gets imported (and what the downstream generators
+read). The combined multi-year file is only read back for analysis, so it
+is columnar and compressed, and each year is appended as it is generated
+instead of concatenating them all at the end.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+SEED = 42
+
+
+def year_rng(year: int) -> np.random.Generator:
+    """Random generator for one year's records
+
+    Records are drawn a column at a time, one array per field, from a
+    generator seeded per year, so years can be generated in any order (or in
+    parallel) and still come out the same.
+    """
+    return np.random.default_rng(SEED + year)
+
+
+def category_dtypes(columns) -> dict:
+    """astype() mapping that keeps low-cardinality string columns as categories
+
+    Each distinct value is then stored once in memory and dictionary-encoded
+    in the Parquet file.
+    """
+    return {column: "category" for column in columns}
+
+
+def random_days(rng: np.random.Generator, low, high, n: int) -> pd.TimedeltaIndex:
+    """n random whole-day offsets between low and high (inclusive)"""
+    return pd.to_timedelta(rng.integers(low, np.asarray(high) + 1, n), unit="D")
+
+
+def date_strings(dates) -> np.ndarray:
+    """YYYY-MM-DD strings for a datetime column, '' where it is missing"""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    return np.where(np.isnat(days), "", days.astype(np.str_))
+
+
+def reference(prefix, numbers: np.ndarray, width: int) -> np.ndarray:
+    """References like PREFIX-007, built with numpy's vectorized string ops"""
+    padded = np.strings.zfill(numbers.astype(np.str_), width)
+    return np.strings.add(np.asarray(prefix, dtype=np.str_), padded)
+
+
+def numbered(rng: np.random.Generator, prefix, high, width: int, n: int) -> np.ndarray:
+    """n references like PREFIX-007, numbered randomly from 1 to high"""
+    return reference(prefix, rng.integers(1, np.asarray(high) + 1, n), width)
+
+
+def map_years(generate, years):
+    """generate(year) for every year, yielded in year order
+
+    Years are independent (each seeds its own generator), so they are built
+    in parallel processes.
+    """
+    workers = min(len(years), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(generate, years)
+
+
+def write_combined_parquet(frames, path: str) -> int:
+    """Append each yearly frame to one zstd Parquet file; returns the row count
+
+    Years that produced no frame (None) are skipped, and no file is written
+    when none did. Later years are cast to the first year's schema.
+    """
+    writer = None
+    total = 0
+    try:
+        for df in frames:
+            if df is None:
+                continue
+
+            table = pa.Table.from_pandas(
+                df, schema=writer.schema if writer else None, preserve_index=False
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            total += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return total